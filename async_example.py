@@ -0,0 +1,39 @@
+import asyncio
+import logging
+import sys
+import hero.hero as heroes
+import dex.uniswap_v2_pair as pool
+import dex.uniswap_v2_factory as market_place_factory
+from rpc import async_client as rpc_async
+
+
+async def main(rpc_server, logger):
+    # At most 32 requests in flight and 50 requests per second on this endpoint
+    rpc_async.configure(rpc_server, max_concurrency=32, requests_per_second=50)
+
+    hero_ids = range(1, 500)
+    raw_heroes = await asyncio.gather(*[heroes.get_hero_async(hero_id, rpc_server) for hero_id in hero_ids],
+                                      return_exceptions=True)
+    for hero_id, hero in zip(hero_ids, raw_heroes):
+        if isinstance(hero, Exception):
+            logger.info("Failed to fetch hero #" + str(hero_id) + ": " + str(hero))
+        else:
+            logger.info("Hero #" + str(hero_id) + " level " + str(hero['state']['level']))
+
+    liquidity_pool_address = market_place_factory.all_pairs(0, rpc_server)
+    logger.info("Reserves: " + str(await pool.get_reserves_async(liquidity_pool_address, rpc_server)))
+
+    await rpc_async.close()
+
+
+if __name__ == "__main__":
+    log_format = '%(asctime)s|%(name)s|%(levelname)s: %(message)s'
+
+    logger = logging.getLogger("DFK-async")
+    logger.setLevel(logging.DEBUG)
+    logging.basicConfig(level=logging.INFO, format=log_format, stream=sys.stdout)
+
+    rpc_server = 'https://api.harmony.one'
+    logger.info("Using RPC server " + rpc_server)
+
+    asyncio.run(main(rpc_server, logger))
@@ -2,6 +2,9 @@ import logging
 import sys
 import auctions.sale.sale_auctions as sales
 import auctions.rent.rent_auctions as rental
+import auctions.market as market
+import auctions.pricing as pricing
+import auctions.query as query
 
 
 if __name__ == "__main__":
@@ -21,6 +24,11 @@ if __name__ == "__main__":
     for auction in auctions:
         logger.info(str(auction))
 
+    auction_count = 0
+    for auction in sales.iter_open_auctions(graphql):
+        auction_count = auction_count + 1
+    logger.info("Open sale auctions: " + str(auction_count))
+
     # sales.bid_hero(hero_id, ether2wei(100), prv_key, nonce, gas_price_gwei, 30, rpc_server, logger)
 
     logger.info("\n")
@@ -28,3 +36,32 @@ if __name__ == "__main__":
     auctions = rental.get_open_auctions(graphql, 0, 10)
     for auction in auctions:
         logger.info(str(auction))
+
+    stats = {}
+    auction_count = 0
+    for auction in rental.iter_open_auctions_parallel(graphql, workers=4, stats=stats):
+        auction_count = auction_count + 1
+    logger.info("Open rental auctions: " + str(auction_count) + " (" + str(stats['pages']) + " pages, " +
+                str(stats['retries']) + " retries, " + str(round(stats['rowsPerSecond'])) + " rows/s)")
+
+    snapshot = market.MarketSnapshot(graphql)
+    snapshot.sync()
+    logger.info("Market snapshot: " + str(len(snapshot.auctions('sale'))) + " sale and " +
+                str(len(snapshot.auctions('rent'))) + " rental auctions")
+    changes = snapshot.sync()
+    logger.info(str(len(changes)) + " changes since the last sync (" + str(snapshot.stats['rows']) + " rows fetched)")
+
+    book = pricing.PriceBook(snapshot.auctions('sale'))
+    logger.info("Cheapest sale auctions:")
+    for price, auction in book.cheapest(5):
+        logger.info(auction['tokenId']['id'] + ": " + str(sales.wei2ether(price)))
+
+    engine = query.QueryEngine(snapshot.auctions('sale'))
+    q = query.Range('generation', 0, 2) & query.Eq('profession', 'gardening') & query.PriceBelow(sales.ether2wei(500))
+    logger.info("Gen 0-2 gardeners under 500 JEWEL:")
+    for price, auction in engine.select(q, order_by_price=True, limit=5):
+        logger.info(auction['tokenId']['id'] + ": " + str(sales.wei2ether(price)))
+
+    hero_ids = [int(auction['tokenId']['id']) for auction in snapshot.auctions('sale')[:500]]
+    auctions = sales.get_hero_open_auctions(graphql, hero_ids, fields=['startingPrice', 'endingPrice', ('tokenId', ['id'])])
+    logger.info("Open auctions of " + str(len(hero_ids)) + " heroes: " + str(len(auctions)))
@@ -0,0 +1,250 @@
+"""
+Local order book of the open sale and rent auctions, kept up to date from the subgraph with delta queries.
+The first sync loads every open auction. Later syncs only fetch the auctions started since the startedAt high-water
+mark, and the auctions closed (bought or cancelled) since the endedAt high-water mark, so a sync costs in proportion
+to the market churn rather than to the market size. Each sync returns the changes, also sent to the listeners.
+
+    snapshot = market.MarketSnapshot(graphql, path='market.json')
+    snapshot.add_listener(lambda change: logger.info(change['type'] + " " + change['auction']['id']))
+    while True:
+        snapshot.sync()
+        auctions = snapshot.auctions('sale')
+        ...
+"""
+
+import json
+import os
+import threading
+import time
+from .utils import utils as auction_utils
+from .sale import sale_auctions
+from .rent import rent_auctions
+
+SNAPSHOT_VERSION = 1
+
+# market -> (entity, filter type, page query ordered by startedAt desc)
+MARKETS = {
+    'sale': ('saleAuctions', 'SaleAuction_filter', sale_auctions.AUCTIONS_PAGE_GRAPHQL_QUERY),
+    'rent': ('assistingAuctions', 'AssistingAuction_filter', rent_auctions.AUCTIONS_PAGE_GRAPHQL_QUERY),
+}
+
+CLOSED_GRAPHQL_QUERY = """
+                        query ($first: Int!, $skip: Int!, $where: %s) {
+                          %s(first: $first, skip: $skip, orderBy: endedAt, orderDirection: %s, where: $where) {
+                            id
+                            endedAt
+                            open
+                          }
+                        }
+                        """
+
+OPENED = 'opened'
+CLOSED = 'closed'
+
+
+class MarketSnapshot:
+    def __init__(self, graphql_address, markets=('sale', 'rent'), path=None, workers=auction_utils.WORKERS,
+                 page_size=auction_utils.PAGE_SIZE):
+        '''
+        :param graphql_address:
+        :param markets: markets to follow ('sale', 'rent')
+        :param path: JSON file keeping the snapshot between runs, None to keep it in memory only
+        :param workers: concurrent requests of the first load
+        :param page_size:
+        '''
+        self.graphql_address = graphql_address
+        self.markets = list(markets)
+        self.path = path
+        self.workers = workers
+        self.page_size = page_size
+        self._lock = threading.Lock()
+        self.listeners = []
+        # market -> {auction id -> auction}
+        self.books = {market: {} for market in self.markets}
+        # market -> high-water marks, None until the first load
+        self.started_at = {market: None for market in self.markets}
+        self.ended_at = {market: None for market in self.markets}
+        # rows, pages, retries and seconds of the last sync
+        self.stats = {}
+        if path is not None and os.path.exists(path):
+            self.read(path)
+
+    def read(self, path):
+        try:
+            with open(path, 'r') as f:
+                content = json.load(f)
+        except (ValueError, OSError):
+            return
+        if content.get('version') != SNAPSHOT_VERSION or content.get('graphqlAddress') != self.graphql_address:
+            return
+        for market in self.markets:
+            if market in content['books']:
+                self.books[market] = content['books'][market]
+                self.started_at[market] = content['startedAt'][market]
+                self.ended_at[market] = content['endedAt'][market]
+
+    def save(self):
+        if self.path is None:
+            return
+        with self._lock:
+            content = {'version': SNAPSHOT_VERSION, 'graphqlAddress': self.graphql_address, 'books': self.books,
+                       'startedAt': self.started_at, 'endedAt': self.ended_at}
+            directory = os.path.dirname(self.path)
+            if directory != '':
+                os.makedirs(directory, exist_ok=True)
+            tmp_path = self.path + '.' + str(os.getpid()) + '.tmp'
+            with open(tmp_path, 'w') as f:
+                json.dump(content, f)
+            os.replace(tmp_path, self.path)
+
+    def add_listener(self, callback):
+        '''
+        :param callback: function called with each change, a dict with type (OPENED or CLOSED), market and auction
+        '''
+        self.listeners.append(callback)
+
+    def remove_listener(self, callback):
+        self.listeners.remove(callback)
+
+    def auctions(self, market):
+        '''
+        :param market: 'sale' or 'rent'
+        :return: list of the open auctions
+        '''
+        with self._lock:
+            return list(self.books[market].values())
+
+    def get(self, market, auction_id):
+        '''
+        :return: open auction, None if not in the book
+        '''
+        with self._lock:
+            return self.books[market].get(str(auction_id))
+
+    def latest_ended_at(self, market, stats=None):
+        '''
+        :return: endedAt of the last closed auction, 0 if there is none
+        '''
+        entity, filter_type, _ = MARKETS[market]
+        closed = auction_utils.post_graphql(self.graphql_address, CLOSED_GRAPHQL_QUERY % (filter_type, entity, 'desc'),
+                                            {'first': 1, 'skip': 0, 'where': {'open': False, 'endedAt_not': None}},
+                                            stats)[entity]
+        return int(closed[0]['endedAt']) if len(closed) > 0 and closed[0]['endedAt'] is not None else 0
+
+    def fetch_closed(self, market, stats=None):
+        '''
+        :return: auctions closed since the endedAt high-water mark (id, endedAt and open only)
+        '''
+        entity, filter_type, _ = MARKETS[market]
+        query = CLOSED_GRAPHQL_QUERY % (filter_type, entity, 'asc')
+        # Pages are requested with an endedAt cursor (the subgraph rejects a deep skip). skip only steps over the
+        # auctions already returned with the endedAt of the cursor
+        cursor = self.ended_at[market]
+        skip = 0
+        closed = {}
+        while True:
+            where = {'open': False, 'endedAt_gte': str(cursor)}
+            page = auction_utils.post_graphql(self.graphql_address, query,
+                                              {'first': self.page_size, 'skip': skip, 'where': where}, stats)[entity]
+            auction_utils.count(stats, 'pages')
+            for auction in page:
+                closed[auction['id']] = auction
+            if len(page) < self.page_size:
+                return list(closed.values())
+            last_ended_at = int(page[-1]['endedAt'])
+            if last_ended_at == cursor:
+                skip = skip + len(page)
+            else:
+                cursor = last_ended_at
+                skip = sum(1 for auction in page if int(auction['endedAt']) == last_ended_at)
+
+    def load(self, market, stats=None):
+        '''
+        Load every open auction of a market
+        :return: changes from the previous book
+        '''
+        entity, filter_type, query = MARKETS[market]
+        # The closure mark is taken first so that auctions closed during the load are caught by the next sync
+        ended_at = self.latest_ended_at(market, stats)
+        load_stats = {}
+        book = {}
+        for auction in auction_utils.iter_auctions_parallel(self.graphql_address, query, entity, filter_type, {'open': True},
+                                                            self.workers, self.page_size, load_stats):
+            book[auction['id']] = auction
+        for name in ('pages', 'retries'):
+            auction_utils.count(stats, name, load_stats.get(name, 0))
+
+        with self._lock:
+            previous = self.books[market]
+            changes = [{'type': CLOSED, 'market': market, 'auction': auction}
+                       for auction_id, auction in previous.items() if auction_id not in book]
+            changes.extend({'type': OPENED, 'market': market, 'auction': auction}
+                           for auction_id, auction in book.items() if auction_id not in previous)
+            self.books[market] = book
+            self.started_at[market] = max([int(auction['startedAt']) for auction in book.values()], default=0)
+            self.ended_at[market] = ended_at
+        return changes
+
+    def update(self, market, stats=None):
+        '''
+        Apply the auctions opened and closed since the high-water marks of a market
+        :return: changes
+        '''
+        entity, _, query = MARKETS[market]
+        # Auctions started in the same second as the mark may be new: the mark is included and known ids are skipped
+        opened = list(auction_utils.iter_auctions(self.graphql_address, query, entity,
+                                                  {'open': True, 'startedAt_gte': str(self.started_at[market])},
+                                                  self.page_size, False, stats))
+        closed = self.fetch_closed(market, stats)
+        auction_utils.count(stats, 'rows', len(opened) + len(closed))
+
+        changes = []
+        with self._lock:
+            book = self.books[market]
+            for auction in opened:
+                if auction['id'] not in book:
+                    book[auction['id']] = auction
+                    changes.append({'type': OPENED, 'market': market, 'auction': auction})
+                self.started_at[market] = max(self.started_at[market], int(auction['startedAt']))
+            for auction in closed:
+                removed = book.pop(auction['id'], None)
+                if removed is not None:
+                    changes.append({'type': CLOSED, 'market': market, 'auction': removed})
+                if auction['endedAt'] is not None:
+                    self.ended_at[market] = max(self.ended_at[market], int(auction['endedAt']))
+        return changes
+
+    def sync(self):
+        '''
+        Bring every market up to date (full load the first time, delta queries afterwards), notify the listeners and
+        save the snapshot
+        :return: list of changes, dicts with type (OPENED or CLOSED), market and auction
+        '''
+        start = time.perf_counter()
+        stats = {'rows': 0, 'pages': 0, 'retries': 0}
+        changes = []
+        for market in self.markets:
+            if self.started_at[market] is None:
+                market_changes = self.load(market, stats)
+                auction_utils.count(stats, 'rows', len(self.books[market]))
+            else:
+                market_changes = self.update(market, stats)
+            changes.extend(market_changes)
+        stats['seconds'] = time.perf_counter() - start
+        self.stats = stats
+
+        if len(changes) > 0:
+            self.save()
+        for change in changes:
+            for callback in list(self.listeners):
+                callback(change)
+        return changes
+
+    def reset(self, market=None):
+        '''
+        Force a full load of a market (None for all markets) on the next sync
+        '''
+        with self._lock:
+            for m in (self.markets if market is None else [market]):
+                self.started_at[m] = None
+                self.ended_at[m] = None
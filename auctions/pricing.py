@@ -0,0 +1,186 @@
+"""
+Current price of Dutch auctions computed locally, with the integer math of the auction contract
+(ClockAuction._computeCurrentPrice): the price moves linearly from startingPrice to endingPrice over duration seconds
+after startedAt, then stays at endingPrice.
+PriceBook keeps the listings column by column, so the prices of a whole market (or its cheapest heroes matching a filter)
+are computed in one pass, without RPC.
+
+    book = pricing.PriceBook(snapshot.auctions('sale'))
+    for price, auction in book.cheapest(10, lambda auction: auction['tokenId']['mainClass'] == 'Wizard'):
+        ...
+"""
+
+import heapq
+import time
+from array import array
+
+
+def current_price(starting_price, ending_price, duration, started_at, now):
+    '''
+    Price of an auction, as computed by the contract
+    :param starting_price: wei
+    :param ending_price: wei
+    :param duration: seconds
+    :param started_at: unix time
+    :param now: unix time
+    :return: price in wei
+    '''
+    seconds_passed = int(now) - started_at if now > started_at else 0
+    if seconds_passed >= duration:
+        return ending_price
+    total_price_change = ending_price - starting_price
+    # Solidity divides signed integers rounding toward zero
+    current_price_change = abs(total_price_change) * seconds_passed // duration
+    if total_price_change < 0:
+        current_price_change = -current_price_change
+    return starting_price + current_price_change
+
+
+def get_current_price(auction, now=None):
+    '''
+    :param auction: auction of sale_auctions.get_auction or of a GraphQL query
+    :param now: unix time, None for the current time
+    :return: price in wei
+    '''
+    if now is None:
+        now = time.time()
+    return current_price(int(auction['startingPrice']), int(auction['endingPrice']), int(auction['duration']),
+                         int(auction['startedAt']), now)
+
+
+def time_at_price(auction, price):
+    '''
+    :param auction:
+    :param price: wei
+    :return: first unix time at which the auction price is at most price, None if it never is
+    '''
+    starting_price = int(auction['startingPrice'])
+    ending_price = int(auction['endingPrice'])
+    duration = int(auction['duration'])
+    started_at = int(auction['startedAt'])
+    if starting_price <= price:
+        return started_at
+    if ending_price > price:
+        return None
+    # Smallest seconds_passed with (starting_price - ending_price) * seconds_passed // duration >= starting_price - price
+    seconds_passed = -(-(starting_price - price) * duration // (starting_price - ending_price))
+    return started_at + min(seconds_passed, duration)
+
+
+class PriceBook:
+    def __init__(self, auctions=()):
+        '''
+        :param auctions: auctions of a GraphQL query (e.g. market.MarketSnapshot.auctions)
+        '''
+        self.auctions = []
+        self._index = {}
+        # Prices can exceed 64 bits: they are kept as Python integers
+        self._starting = []
+        self._ending = []
+        self._started_at = array('q')
+        self._duration = array('q')
+        for auction in auctions:
+            self.add(auction)
+
+    def __len__(self):
+        return len(self.auctions)
+
+    def __contains__(self, auction_id):
+        return str(auction_id) in self._index
+
+    def add(self, auction):
+        '''
+        Add or replace a listing
+        '''
+        auction_id = str(auction['id'])
+        i = self._index.get(auction_id)
+        if i is None:
+            self._index[auction_id] = len(self.auctions)
+            self.auctions.append(auction)
+            self._starting.append(int(auction['startingPrice']))
+            self._ending.append(int(auction['endingPrice']))
+            self._started_at.append(int(auction['startedAt']))
+            self._duration.append(int(auction['duration']))
+        else:
+            self.auctions[i] = auction
+            self._starting[i] = int(auction['startingPrice'])
+            self._ending[i] = int(auction['endingPrice'])
+            self._started_at[i] = int(auction['startedAt'])
+            self._duration[i] = int(auction['duration'])
+
+    def remove(self, auction_id):
+        '''
+        Remove a listing (the last listing takes its place)
+        '''
+        i = self._index.pop(str(auction_id), None)
+        if i is None:
+            return
+        last = len(self.auctions) - 1
+        if i != last:
+            self.auctions[i] = self.auctions[last]
+            self._starting[i] = self._starting[last]
+            self._ending[i] = self._ending[last]
+            self._started_at[i] = self._started_at[last]
+            self._duration[i] = self._duration[last]
+            self._index[str(self.auctions[i]['id'])] = i
+        self.auctions.pop()
+        self._starting.pop()
+        self._ending.pop()
+        self._started_at.pop()
+        self._duration.pop()
+
+    def apply(self, change):
+        '''
+        Apply a change of market.MarketSnapshot (usable as a listener)
+        '''
+        if change['type'] == 'closed':
+            self.remove(change['auction']['id'])
+        else:
+            self.add(change['auction'])
+
+    def price(self, auction_id, now=None):
+        '''
+        :return: price in wei of a listing, None if not in the book
+        '''
+        i = self._index.get(str(auction_id))
+        if i is None:
+            return None
+        if now is None:
+            now = time.time()
+        return current_price(self._starting[i], self._ending[i], self._duration[i], self._started_at[i], now)
+
+    def prices(self, now=None):
+        '''
+        :param now: unix time, None for the current time
+        :return: prices in wei, in the order of self.auctions
+        '''
+        if now is None:
+            now = time.time()
+        now = int(now)
+        prices = []
+        append = prices.append
+        for starting_price, ending_price, started_at, duration in zip(self._starting, self._ending, self._started_at,
+                                                                      self._duration):
+            seconds_passed = now - started_at if now > started_at else 0
+            if seconds_passed >= duration:
+                append(ending_price)
+            elif ending_price <= starting_price:
+                append(starting_price - (starting_price - ending_price) * seconds_passed // duration)
+            else:
+                append(starting_price + (ending_price - starting_price) * seconds_passed // duration)
+        return prices
+
+    def cheapest(self, count=1, predicate=None, max_price=None, now=None):
+        '''
+        Cheapest listings matching a filter, in one pass over the book
+        :param count: number of listings
+        :param predicate: function of the auction, None for every listing
+        :param max_price: wei, None for no limit
+        :param now: unix time, None for the current time
+        :return: list of (price in wei, auction), cheapest first
+        '''
+        prices = self.prices(now)
+        candidates = ((price, i) for i, price in enumerate(prices)
+                      if (max_price is None or price <= max_price)
+                      and (predicate is None or predicate(self.auctions[i])))
+        return [(price, self.auctions[i]) for price, i in heapq.nsmallest(count, candidates)]
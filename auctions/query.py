@@ -0,0 +1,401 @@
+"""
+In-memory query engine over auction listings (e.g. the open auctions of a market.MarketSnapshot).
+Listings are flattened to records (class, profession gene, rarity, generation, level, stats, ... of the hero), with
+hash indexes on the categorical fields and sorted indexes on the numeric ones. Queries are predicates composed with &,
+| and ~: a conjunction is answered from its most selective indexed predicate, the other predicates only checking the
+remaining candidates.
+
+    engine = query.QueryEngine(snapshot.auctions('sale'))
+    q = (query.Range('generation', 0, 2) & query.Eq('rarity', 'mythic') & query.Eq('mainClass', 'wizard') &
+         query.Eq('profession', 'gardening') & query.PriceBelow(sales.ether2wei(100)))
+    for price, auction in engine.select(q, order_by_price=True):
+        ...
+"""
+
+import time
+from bisect import bisect_left, bisect_right, insort
+from hero.utils import utils as hero_utils
+from . import pricing
+
+# Fields with a hash index (equality) and with a sorted index (ranges)
+HASH_FIELDS = ['mainClass', 'subClass', 'profession', 'rarity', 'generation', 'element']
+RANGE_FIELDS = ['generation', 'level', 'summons', 'maxSummons', 'floorPrice']
+
+
+def _number(value):
+    if isinstance(value, str) and value.isdigit():
+        return int(value)
+    return value
+
+
+def _class_name(value):
+    '''
+    Class as named in hero.utils.utils (e.g. 'darkKnight'), from a class id or a subgraph class name
+    '''
+    value = _number(value)
+    if isinstance(value, int):
+        return hero_utils.parse_class(value)
+    if isinstance(value, str) and len(value) > 0:
+        return value[0].lower() + value[1:]
+    return value
+
+
+def make_record(auction, stat_genes=None):
+    '''
+    Flatten an auction of a GraphQL query
+    :param auction:
+    :param stat_genes: decoded stat genes of the hero (parse_stat_genes format), None to decode them
+    :return: dict of the hero fields (numbers as int) and of the auction prices
+    '''
+    hero = auction['tokenId'] if isinstance(auction.get('tokenId'), dict) else {}
+    record = {key: _number(value) for key, value in hero.items() if not isinstance(value, dict)}
+    record['heroId'] = _number(hero.get('id'))
+    record['mainClass'] = _class_name(hero.get('mainClass'))
+    record['subClass'] = _class_name(hero.get('subClass'))
+    rarity = _number(hero.get('rarity'))
+    record['rarity'] = hero_utils.parse_rarity(rarity) if isinstance(rarity, int) else rarity
+    if stat_genes is None and hero.get('statGenes') is not None:
+        stat_genes = hero_utils.parse_stat_genes_cached(int(hero['statGenes']))
+    if stat_genes is not None:
+        record['profession'] = stat_genes['profession']
+        record['element'] = stat_genes['element']
+    for key in ('startingPrice', 'endingPrice', 'duration', 'startedAt'):
+        record[key] = int(auction[key])
+    record['floorPrice'] = min(record['startingPrice'], record['endingPrice'])
+    record['id'] = str(auction['id'])
+    return record
+
+
+def record_price(record, now):
+    return pricing.current_price(record['startingPrice'], record['endingPrice'], record['duration'],
+                                 record['startedAt'], now)
+
+
+class Predicate:
+    def estimate(self, engine):
+        '''
+        :return: upper bound of the number of matching listings
+        '''
+        return len(engine)
+
+    def rows(self, engine, now):
+        '''
+        :return: set of the rows matching the predicate
+        '''
+        return set(row for row in engine.all_rows() if self.match(engine.records[row], now))
+
+    def index_set(self, engine):
+        '''
+        :return: set of the matching rows kept by an index (not to be modified), None if there is none
+        '''
+        return None
+
+    def match(self, record, now):
+        raise NotImplementedError
+
+    def __and__(self, other):
+        return And([self, other])
+
+    def __or__(self, other):
+        return Or([self, other])
+
+    def __invert__(self):
+        return Not(self)
+
+
+class Eq(Predicate):
+    def __init__(self, field, value):
+        self.field = field
+        self.value = value
+
+    def estimate(self, engine):
+        index = engine.hash_indexes.get(self.field)
+        return len(engine) if index is None else len(index.get(self.value, ()))
+
+    def rows(self, engine, now):
+        index = engine.hash_indexes.get(self.field)
+        if index is None:
+            return Predicate.rows(self, engine, now)
+        return set(index.get(self.value, ()))
+
+    def index_set(self, engine):
+        index = engine.hash_indexes.get(self.field)
+        return None if index is None else index.get(self.value, set())
+
+    def match(self, record, now):
+        return record.get(self.field) == self.value
+
+
+class In(Predicate):
+    def __init__(self, field, values):
+        self.field = field
+        self.values = set(values)
+
+    def estimate(self, engine):
+        index = engine.hash_indexes.get(self.field)
+        return len(engine) if index is None else sum(len(index.get(value, ())) for value in self.values)
+
+    def rows(self, engine, now):
+        index = engine.hash_indexes.get(self.field)
+        if index is None:
+            return Predicate.rows(self, engine, now)
+        rows = set()
+        for value in self.values:
+            rows.update(index.get(value, ()))
+        return rows
+
+    def match(self, record, now):
+        return record.get(self.field) in self.values
+
+
+class Range(Predicate):
+    def __init__(self, field, low=None, high=None):
+        '''
+        :param field:
+        :param low: inclusive, None for no bound
+        :param high: inclusive, None for no bound
+        '''
+        self.field = field
+        self.low = low
+        self.high = high
+
+    def _slice(self, engine):
+        index = engine.range_indexes.get(self.field)
+        if index is None:
+            return None
+        start = 0 if self.low is None else bisect_left(index, (self.low,))
+        end = len(index) if self.high is None else bisect_right(index, (self.high, float('inf')))
+        return index, start, end
+
+    def estimate(self, engine):
+        sliced = self._slice(engine)
+        return len(engine) if sliced is None else max(0, sliced[2] - sliced[1])
+
+    def rows(self, engine, now):
+        sliced = self._slice(engine)
+        if sliced is None:
+            return Predicate.rows(self, engine, now)
+        index, start, end = sliced
+        return set(row for _, row in index[start:end])
+
+    def match(self, record, now):
+        value = record.get(self.field)
+        if value is None:
+            return False
+        return (self.low is None or value >= self.low) and (self.high is None or value <= self.high)
+
+
+class PriceBelow(Predicate):
+    def __init__(self, max_price):
+        '''
+        :param max_price: wei, inclusive
+        '''
+        self.max_price = max_price
+        # A listing never costs less than its floor price
+        self.floor = Range('floorPrice', None, max_price)
+
+    def estimate(self, engine):
+        return self.floor.estimate(engine)
+
+    def rows(self, engine, now):
+        return set(row for row in self.floor.rows(engine, now) if self.match(engine.records[row], now))
+
+    def match(self, record, now):
+        return record['floorPrice'] <= self.max_price and record_price(record, now) <= self.max_price
+
+
+class And(Predicate):
+    def __init__(self, predicates):
+        self.predicates = []
+        for predicate in predicates:
+            self.predicates.extend(predicate.predicates if isinstance(predicate, And) else [predicate])
+
+    def estimate(self, engine):
+        return min(predicate.estimate(engine) for predicate in self.predicates)
+
+    def rows(self, engine, now):
+        # The most selective predicate gives the candidates, intersected with the sets of the hash indexes. The other
+        # predicates are checked on the remaining candidates
+        predicates = sorted(self.predicates, key=lambda predicate: predicate.estimate(engine))
+        rows = predicates[0].rows(engine, now)
+        others = []
+        for predicate in predicates[1:]:
+            index_set = predicate.index_set(engine)
+            if index_set is not None:
+                rows.intersection_update(index_set)
+            else:
+                others.append(predicate)
+        records = engine.records
+        return set(row for row in rows if all(predicate.match(records[row], now) for predicate in others))
+
+    def match(self, record, now):
+        return all(predicate.match(record, now) for predicate in self.predicates)
+
+
+class Or(Predicate):
+    def __init__(self, predicates):
+        self.predicates = []
+        for predicate in predicates:
+            self.predicates.extend(predicate.predicates if isinstance(predicate, Or) else [predicate])
+
+    def estimate(self, engine):
+        return min(len(engine), sum(predicate.estimate(engine) for predicate in self.predicates))
+
+    def rows(self, engine, now):
+        rows = set()
+        for predicate in self.predicates:
+            rows.update(predicate.rows(engine, now))
+        return rows
+
+    def match(self, record, now):
+        return any(predicate.match(record, now) for predicate in self.predicates)
+
+
+class Not(Predicate):
+    def __init__(self, predicate):
+        self.predicate = predicate
+
+    def rows(self, engine, now):
+        return set(engine.all_rows()) - self.predicate.rows(engine, now)
+
+    def match(self, record, now):
+        return not self.predicate.match(record, now)
+
+
+class Where(Predicate):
+    def __init__(self, function):
+        '''
+        :param function: function of the record (see make_record) returning a bool, not indexed
+        '''
+        self.function = function
+
+    def match(self, record, now):
+        return self.function(record)
+
+
+class QueryEngine:
+    def __init__(self, auctions=()):
+        '''
+        :param auctions: auctions of a GraphQL query (e.g. market.MarketSnapshot.auctions)
+        '''
+        # row -> record, None once removed
+        self.records = []
+        self.auctions = []
+        self._rows = {}
+        # rows of removed listings, reused by the next listings added
+        self._free_rows = []
+        # field -> {value -> set of rows}
+        self.hash_indexes = {field: {} for field in HASH_FIELDS}
+        # field -> sorted list of (value, row)
+        self.range_indexes = {field: [] for field in RANGE_FIELDS}
+        self.add_many(auctions)
+
+    def __len__(self):
+        return len(self._rows)
+
+    def all_rows(self):
+        return self._rows.values()
+
+    def add_many(self, auctions):
+        '''
+        Add or replace listings. Stat genes are decoded together, and the sorted indexes sorted once
+        '''
+        # Listings replaced are removed first, while the sorted indexes are still sorted
+        auctions = list({str(auction['id']): auction for auction in auctions}.values())
+        for auction in auctions:
+            self.remove(auction['id'])
+        genes = [auction['tokenId'].get('statGenes') if isinstance(auction.get('tokenId'), dict) else None
+                 for auction in auctions]
+        decoded = hero_utils.parse_stat_genes_many([int(g) for g in genes if g is not None])
+        k = 0
+        for auction, g in zip(auctions, genes):
+            stat_genes = None
+            if g is not None:
+                stat_genes = {'profession': decoded['profession'][k], 'element': decoded['element'][k]}
+                k = k + 1
+            self._add(make_record(auction, stat_genes), auction, sort=False)
+        for index in self.range_indexes.values():
+            index.sort()
+
+    def add(self, auction):
+        '''
+        Add or replace a listing
+        '''
+        self._add(make_record(auction), auction, sort=True)
+
+    def _add(self, record, auction, sort):
+        # A listing replaced keeps its row, a new listing takes a freed row if there is one
+        row = self._rows.get(record['id'])
+        if row is not None:
+            self._unindex(row)
+        elif len(self._free_rows) > 0:
+            row = self._free_rows.pop()
+        else:
+            row = len(self.records)
+            self.records.append(None)
+            self.auctions.append(None)
+        self.records[row] = record
+        self.auctions[row] = auction
+        self._rows[record['id']] = row
+        for field, index in self.hash_indexes.items():
+            index.setdefault(record.get(field), set()).add(row)
+        for field, index in self.range_indexes.items():
+            value = record.get(field)
+            if value is not None:
+                if sort:
+                    insort(index, (value, row))
+                else:
+                    index.append((value, row))
+
+    def _unindex(self, row):
+        record = self.records[row]
+        for field, index in self.hash_indexes.items():
+            index[record.get(field)].discard(row)
+        for field, index in self.range_indexes.items():
+            value = record.get(field)
+            if value is not None:
+                del index[bisect_left(index, (value, row))]
+
+    def remove(self, auction_id):
+        '''
+        Remove a listing (its row is reused by the next listing added)
+        '''
+        row = self._rows.pop(str(auction_id), None)
+        if row is None:
+            return
+        self._unindex(row)
+        self.records[row] = None
+        self.auctions[row] = None
+        self._free_rows.append(row)
+
+    def apply(self, change):
+        '''
+        Apply a change of market.MarketSnapshot (usable as a listener)
+        '''
+        if change['type'] == 'closed':
+            self.remove(change['auction']['id'])
+        else:
+            self.add(change['auction'])
+
+    def select(self, predicate=None, now=None, order_by_price=False, limit=None):
+        '''
+        :param predicate: composition of Eq, In, Range, PriceBelow and Where, None for every listing
+        :param now: unix time of the prices, None for the current time
+        :param order_by_price: cheapest first
+        :param limit: maximum number of results, None for all
+        :return: list of (current price in wei, auction)
+        '''
+        if now is None:
+            now = time.time()
+        rows = self.all_rows() if predicate is None else predicate.rows(self, now)
+        results = [(record_price(self.records[row], now), row) for row in rows]
+        if order_by_price:
+            results.sort()
+        if limit is not None:
+            results = results[:limit]
+        return [(price, self.auctions[row]) for price, row in results]
+
+    def count(self, predicate=None, now=None):
+        if predicate is None:
+            return len(self)
+        return len(predicate.rows(self, time.time() if now is None else now))
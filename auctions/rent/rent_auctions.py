@@ -1,51 +1,84 @@
-import requests
-
-AUCTIONS_OPEN_GRAPHQL_QUERY = """
-                        query {
-                          assistingAuctions(skip: %d, first: %d, orderBy: startedAt, orderDirection: desc, where: {open: true}) {
-                            id
-                            seller {
-                                name
-                            }
-                            tokenId {
-                              id
-                              owner {
-                                owner
-                              }                        
-                              statGenes
-                              generation
-                              rarity
-                              mainClass
-                              subClass
-                              summons
-                              maxSummons
-                              summonerId {
-                                id
-                              }
-                              assistantId {
-                                id
-                              }
-                            }
-                            startingPrice
-                            endingPrice
-                            startedAt
-                            duration
-                            winner {
-                              id
-                              name
-                            }
-                            open
-                            
-                          }
-                          
-                        }
-                        """
-
-
-def get_open_auctions(graphql_address, skip=0, count=1000):
-
-    r = requests.post(graphql_address, json={'query': AUCTIONS_OPEN_GRAPHQL_QUERY % (skip, count)})
-    if r.status_code != 200:
-        raise Exception("HTTP error " + str(r.status_code) + ": " + r.text)
-    data = r.json()
-    return data['data']['assistingAuctions']
+from ..utils import utils as auction_utils
+
+AUCTION_FIELDS = [
+    'id',
+    ('seller', ['name']),
+    ('tokenId', ['id', ('owner', ['owner']), 'statGenes', 'generation', 'rarity', 'mainClass', 'subClass', 'summons',
+                 'maxSummons', ('summonerId', ['id']), ('assistantId', ['id'])]),
+    'startingPrice',
+    'endingPrice',
+    'startedAt',
+    'duration',
+    ('winner', ['id', 'name']),
+    'open',
+]
+
+AUCTIONS_PAGE_GRAPHQL_QUERY = auction_utils.build_query('assistingAuctions', 'AssistingAuction_filter', AUCTION_FIELDS)
+
+
+def page_query(fields=None):
+    '''
+    :param fields: fields to fetch (see auction_utils.build_query), None for AUCTION_FIELDS
+    :return: paged query of the rent auctions
+    '''
+    if fields is None:
+        return AUCTIONS_PAGE_GRAPHQL_QUERY
+    return auction_utils.build_query('assistingAuctions', 'AssistingAuction_filter', fields)
+
+
+def get_open_auctions(graphql_address, skip=0, count=1000, fields=None):
+    '''
+    Page of the open auctions, newest first
+    :param graphql_address:
+    :param skip:
+    :param count:
+    :param fields: fields to fetch (see auction_utils.build_query), None for AUCTION_FIELDS
+    :return: list of auctions
+    '''
+    data = auction_utils.post_graphql(graphql_address, page_query(fields),
+                                      {'first': count, 'skip': skip, 'where': {'open': True}})
+    return data['assistingAuctions']
+
+
+def iter_open_auctions(graphql_address, page_size=auction_utils.PAGE_SIZE, prefetch=True, fields=None):
+    '''
+    Iterate over all the open auctions, newest first, one page after the other (startedAt cursor)
+    :param graphql_address:
+    :param page_size:
+    :param prefetch: fetch the next page while the current one is consumed
+    :param fields: fields to fetch (see auction_utils.build_query), None for AUCTION_FIELDS
+    :return: generator of auctions (same format as get_open_auctions)
+    '''
+    return auction_utils.iter_auctions(graphql_address, page_query(fields), 'assistingAuctions', {'open': True},
+                                       page_size, prefetch)
+
+
+def iter_open_auctions_parallel(graphql_address, workers=auction_utils.WORKERS, page_size=auction_utils.PAGE_SIZE,
+                                stats=None, fields=None):
+    '''
+    Iterate over all the open auctions, newest first, with several pages requested at once on the pooled session.
+    The stream is deduplicated by auction id and the requests back off when the subgraph throttles
+    :param graphql_address:
+    :param workers: concurrent requests
+    :param page_size:
+    :param stats: dict filled with rows, pages, retries, seconds and rowsPerSecond
+    :param fields: fields to fetch (see auction_utils.build_query), None for AUCTION_FIELDS
+    :return: generator of auctions (same format as get_open_auctions)
+    '''
+    return auction_utils.iter_auctions_parallel(graphql_address, page_query(fields), 'assistingAuctions',
+                                                'AssistingAuction_filter', {'open': True}, workers, page_size, stats)
+
+
+def get_hero_open_auctions(graphql_address, hero_ids, fields=None, chunk_size=auction_utils.CHUNK_SIZE,
+                           workers=auction_utils.WORKERS):
+    '''
+    Open auctions of heroes. Large lists of heroes are split into chunks requested in parallel
+    :param graphql_address:
+    :param hero_ids:
+    :param fields: fields to fetch (see auction_utils.build_query), None for AUCTION_FIELDS
+    :param chunk_size: heroes per request
+    :param workers: concurrent requests
+    :return: list of auctions, newest first
+    '''
+    return auction_utils.fetch_chunked(graphql_address, page_query(fields), 'assistingAuctions', {'open': True},
+                                       'tokenId_in', [str(hero_id) for hero_id in hero_ids], chunk_size, workers)
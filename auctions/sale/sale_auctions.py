@@ -1,5 +1,6 @@
-import requests
-from web3 import Web3
+from rpc import client as rpc_client
+from rpc import transactions
+from ..utils import utils as auction_utils
 
 SALE_AUCTIONS_CONTRACT_ADDRESS = '0x13a65B9F8039E2c032Bc022171Dc05B30c3f2892'
 
@@ -69,187 +70,67 @@ ABI = """
         ]
         """
 
-AUCTIONS_OPEN_GRAPHQL_QUERY = """
-                        query {
-                          saleAuctions(skip: %d, first: %d, orderBy: startedAt, orderDirection: desc, where: {open: true}) {
-                            id
-                            seller {
-                                name
-                            }
-                            tokenId {
-                              id
-                              owner {
-                                owner
-                              }
-                              statGenes
-                              generation
-                              rarity
-                              mainClass
-                              subClass
-                              strength
-                              intelligence
-                              wisdom
-                              luck
-                              agility
-                              vitality
-                              endurance
-                              dexterity
-                              level
-                              summons
-                              maxSummons
-                              summonerId {
-                                id
-                              }
-                              assistantId {
-                                id
-                              }
-                            }
-                            startingPrice
-                            endingPrice
-                            startedAt
-                            duration
-                            winner {
-                              id
-                              name
-                            }
-                            open
-                            
-                          }
-                          
-                        }
-                        """
-
-AUCTIONS_TOKEN_IDS_GRAPHQL_QUERY = """
-                        query {
-                          saleAuctions(orderBy: startedAt, orderDirection: desc, where: {open: true, tokenId_in: %s }) {
-                            id
-                            seller {
-                                name
-                            }
-                            tokenId {
-                              id
-                              owner {
-                                owner
-                              }
-                              
-                              statGenes
-                              generation
-                              rarity
-                              mainClass
-                              subClass
-                              summons
-                              maxSummons
-                              summonerId {
-                                id
-                              }
-                              assistantId {
-                                id
-                              }
-                            }
-                            startingPrice
-                            endingPrice
-                            startedAt
-                            duration
-                            winner {
-                              id
-                              name
-                            }
-                            open
-
-                          }
-
-                        }
-                        """
+AUCTION_FIELDS = [
+    'id',
+    ('seller', ['name']),
+    ('tokenId', ['id', ('owner', ['owner']), 'statGenes', 'generation', 'rarity', 'mainClass', 'subClass', 'strength',
+                 'intelligence', 'wisdom', 'luck', 'agility', 'vitality', 'endurance', 'dexterity', 'level', 'summons',
+                 'maxSummons', ('summonerId', ['id']), ('assistantId', ['id'])]),
+    'startingPrice',
+    'endingPrice',
+    'startedAt',
+    'duration',
+    ('winner', ['id', 'name']),
+    'open',
+]
+
+AUCTIONS_PAGE_GRAPHQL_QUERY = auction_utils.build_query('saleAuctions', 'SaleAuction_filter', AUCTION_FIELDS)
+
+
+def page_query(fields=None):
+    '''
+    :param fields: fields to fetch (see auction_utils.build_query), None for AUCTION_FIELDS
+    :return: paged query of the sale auctions
+    '''
+    if fields is None:
+        return AUCTIONS_PAGE_GRAPHQL_QUERY
+    return auction_utils.build_query('saleAuctions', 'SaleAuction_filter', fields)
 
 
 def block_explorer_link(txid):
     return 'https://explorer.harmony.one/tx/' + str(txid)
 
 
-def bid_hero(token_id, bid_amount_wei, private_key, nonce, gas_price_gwei, tx_timeout_seconds, rpc_address, logger):
-    w3 = Web3(Web3.HTTPProvider(rpc_address))
-    account = w3.eth.account.privateKeyToAccount(private_key)
-    w3.eth.default_account = account.address
-
-    sales_auction_contract_address = Web3.toChecksumAddress(SALE_AUCTIONS_CONTRACT_ADDRESS)
-    sales_auction_contract = w3.eth.contract(sales_auction_contract_address, abi=ABI)
+def bid_hero(token_id, bid_amount_wei, private_key, nonce, gas_price_gwei, tx_timeout_seconds, rpc_address, logger, wait=True):
+    sales_auction_contract = rpc_client.get_contract(SALE_AUCTIONS_CONTRACT_ADDRESS, ABI, rpc_address)
 
     logger.info("Biding " + str(wei2ether(bid_amount_wei)) + " on hero id " + str(token_id))
-    tx = sales_auction_contract.functions.bid(token_id, bid_amount_wei).buildTransaction(
-        {'gasPrice': w3.toWei(gas_price_gwei, 'gwei'), 'nonce': nonce})
+    function_call = sales_auction_contract.functions.bid(token_id, bid_amount_wei)
+    return transactions.send(function_call, private_key, nonce, gas_price_gwei, tx_timeout_seconds, rpc_address, logger, wait)
 
-    logger.info("Signing transaction")
-    signed_tx = w3.eth.account.sign_transaction(tx, private_key=private_key)
-    logger.info("Sending transaction " + str(tx))
-    ret = w3.eth.send_raw_transaction(signed_tx.rawTransaction)
-    logger.info("Transaction successfully sent !")
-    logger.info("Waiting for transaction " + block_explorer_link(signed_tx.hash.hex()) + " to be mined")
-    tx_receipt = w3.eth.wait_for_transaction_receipt(transaction_hash=signed_tx.hash, timeout=tx_timeout_seconds,
-                                                     poll_latency=3)
-    logger.info("Transaction mined !")
-    logger.info(str(tx_receipt))
 
+def create_auction(token_id, starting_price_wei, ending_price_wei, duration, winner, private_key, nonce, gas_price_gwei, tx_timeout_seconds, rpc_address, logger, wait=True):
+    sales_auction_contract = rpc_client.get_contract(SALE_AUCTIONS_CONTRACT_ADDRESS, ABI, rpc_address)
 
-def create_auction(token_id, starting_price_wei, ending_price_wei, duration, winner, private_key, nonce, gas_price_gwei, tx_timeout_seconds, rpc_address, logger):
-    w3 = Web3(Web3.HTTPProvider(rpc_address))
-    account = w3.eth.account.privateKeyToAccount(private_key)
-    w3.eth.default_account = account.address
+    logger.info("Auctioning " + str(token_id) + " (starting price=" + str(wei2ether(starting_price_wei)) + ", ending price=" + str(wei2ether(ending_price_wei)) + ", duration=" + str(duration) + ", private sale buyer=" + str(winner) + ")")
+    function_call = sales_auction_contract.functions.createAuction(token_id, starting_price_wei, ending_price_wei, duration, winner)
+    return transactions.send(function_call, private_key, nonce, gas_price_gwei, tx_timeout_seconds, rpc_address, logger, wait)
 
-    sales_auction_contract_address = Web3.toChecksumAddress(SALE_AUCTIONS_CONTRACT_ADDRESS)
-    sales_auction_contract = w3.eth.contract(sales_auction_contract_address, abi=ABI)
 
-    logger.info("Auctioning " + str(token_id) + " (starting price=" + str(wei2ether(starting_price_wei)) + ", ending price=" + str(wei2ether(ending_price_wei)) + ", duration=" + str(duration) + ", private sale buyer=" + str(winner) + ")")
-    tx = sales_auction_contract.functions.createAuction(token_id, starting_price_wei, ending_price_wei, duration, winner).buildTransaction(
-        {'gasPrice': w3.toWei(gas_price_gwei, 'gwei'), 'nonce': nonce})
-
-    logger.info("Signing transaction")
-    signed_tx = w3.eth.account.sign_transaction(tx, private_key=private_key)
-    logger.info("Sending transaction " + str(tx))
-    ret = w3.eth.send_raw_transaction(signed_tx.rawTransaction)
-    logger.info("Transaction successfully sent !")
-    logger.info("Waiting for transaction " + block_explorer_link(signed_tx.hash.hex()) + " to be mined")
-    tx_receipt = w3.eth.wait_for_transaction_receipt(transaction_hash=signed_tx.hash, timeout=tx_timeout_seconds,
-                                                     poll_latency=3)
-    logger.info("Transaction mined !")
-    logger.info(str(tx_receipt))
-
-
-def cancel_auction(token_id, private_key, nonce, gas_price_gwei, tx_timeout_seconds, rpc_address, logger):
-    w3 = Web3(Web3.HTTPProvider(rpc_address))
-    account = w3.eth.account.privateKeyToAccount(private_key)
-    w3.eth.default_account = account.address
-
-    sales_auction_contract_address = Web3.toChecksumAddress(SALE_AUCTIONS_CONTRACT_ADDRESS)
-    sales_auction_contract = w3.eth.contract(sales_auction_contract_address, abi=ABI)
-
-    tx = sales_auction_contract.functions.cancelAuction(token_id).buildTransaction(
-        {'gasPrice': w3.toWei(gas_price_gwei, 'gwei'), 'nonce': nonce})
-
-    logger.info("Signing transaction")
-    signed_tx = w3.eth.account.sign_transaction(tx, private_key=private_key)
-    logger.info("Sending transaction " + str(tx))
-    ret = w3.eth.send_raw_transaction(signed_tx.rawTransaction)
-    logger.info("Transaction successfully sent !")
-    logger.info("Waiting for transaction " + block_explorer_link(signed_tx.hash.hex()) + " to be mined")
-    tx_receipt = w3.eth.wait_for_transaction_receipt(transaction_hash=signed_tx.hash, timeout=tx_timeout_seconds,
-                                                     poll_latency=3)
-    logger.info("Transaction mined !")
-    logger.info(str(tx_receipt))
+def cancel_auction(token_id, private_key, nonce, gas_price_gwei, tx_timeout_seconds, rpc_address, logger, wait=True):
+    sales_auction_contract = rpc_client.get_contract(SALE_AUCTIONS_CONTRACT_ADDRESS, ABI, rpc_address)
 
+    function_call = sales_auction_contract.functions.cancelAuction(token_id)
+    return transactions.send(function_call, private_key, nonce, gas_price_gwei, tx_timeout_seconds, rpc_address, logger, wait)
 
-def is_on_auction(token_id, rpc_address):
-    w3 = Web3(Web3.HTTPProvider(rpc_address))
 
-    sales_auction_contract_address = Web3.toChecksumAddress(SALE_AUCTIONS_CONTRACT_ADDRESS)
-    sales_auction_contract = w3.eth.contract(sales_auction_contract_address, abi=ABI)
+def is_on_auction(token_id, rpc_address):
+    sales_auction_contract = rpc_client.get_contract(SALE_AUCTIONS_CONTRACT_ADDRESS, ABI, rpc_address)
     return sales_auction_contract.functions.isOnAuction(token_id).call()
 
 
 def get_auction(token_id, rpc_address):
-    w3 = Web3(Web3.HTTPProvider(rpc_address))
-
-    sales_auction_contract_address = Web3.toChecksumAddress(SALE_AUCTIONS_CONTRACT_ADDRESS)
-    sales_auction_contract = w3.eth.contract(sales_auction_contract_address, abi=ABI)
+    sales_auction_contract = rpc_client.get_contract(SALE_AUCTIONS_CONTRACT_ADDRESS, ABI, rpc_address)
     result = sales_auction_contract.functions.getAuction(token_id).call()
     auction = {}
     auction['id'] = result[0]
@@ -262,27 +143,47 @@ def get_auction(token_id, rpc_address):
     return auction
 
 
-def get_open_auctions(graphql_address, skip=0, count=1000):
-
-    r = requests.post(graphql_address, json={'query': AUCTIONS_OPEN_GRAPHQL_QUERY % (skip, count)})
-
-    if r.status_code != 200:
-        raise Exception("HTTP error " + str(r.status_code) + ": " + r.text)
-    data = r.json()
-    return data['data']['saleAuctions']
-
-
-def get_hero_open_auctions(graphql_address, hero_ids):
-    str_hero_ids = "["
-    for id in hero_ids:
-        str_hero_ids = str_hero_ids + "\"" + str(id) + "\", "
-    str_hero_ids = str_hero_ids + "]"
-
-    r = requests.post(graphql_address, json={'query': AUCTIONS_TOKEN_IDS_GRAPHQL_QUERY % str_hero_ids})
-    if r.status_code != 200:
-        raise Exception("HTTP error " + str(r.status_code) + ": " + r.text)
-    data = r.json()
-    return data['data']['saleAuctions']
+def get_open_auctions(graphql_address, skip=0, count=1000, fields=None):
+    '''
+    Page of the open auctions, newest first
+    :param graphql_address:
+    :param skip:
+    :param count:
+    :param fields: fields to fetch (see auction_utils.build_query), None for AUCTION_FIELDS
+    :return: list of auctions
+    '''
+    data = auction_utils.post_graphql(graphql_address, page_query(fields),
+                                      {'first': count, 'skip': skip, 'where': {'open': True}})
+    return data['saleAuctions']
+
+
+def iter_open_auctions(graphql_address, page_size=auction_utils.PAGE_SIZE, prefetch=True, fields=None):
+    '''
+    Iterate over all the open auctions, newest first, without loading them all in memory.
+    Pages are requested with a startedAt cursor (instead of a deep skip) and the next page is fetched in the background
+    :param graphql_address:
+    :param page_size:
+    :param prefetch:
+    :param fields: fields to fetch (see auction_utils.build_query), None for AUCTION_FIELDS
+    :return: generator of auctions (same format as get_open_auctions)
+    '''
+    return auction_utils.iter_auctions(graphql_address, page_query(fields), 'saleAuctions', {'open': True},
+                                       page_size, prefetch)
+
+
+def get_hero_open_auctions(graphql_address, hero_ids, fields=None, chunk_size=auction_utils.CHUNK_SIZE,
+                           workers=auction_utils.WORKERS):
+    '''
+    Open auctions of heroes. Large lists of heroes are split into chunks requested in parallel
+    :param graphql_address:
+    :param hero_ids:
+    :param fields: fields to fetch (see auction_utils.build_query), None for AUCTION_FIELDS
+    :param chunk_size: heroes per request
+    :param workers: concurrent requests
+    :return: list of auctions, newest first
+    '''
+    return auction_utils.fetch_chunked(graphql_address, page_query(fields), 'saleAuctions', {'open': True}, 'tokenId_in',
+                                       [str(hero_id) for hero_id in hero_ids], chunk_size, workers)
 
 
 def wei2ether(wei):
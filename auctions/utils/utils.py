@@ -0,0 +1,287 @@
+import re
+import threading
+import time
+import requests
+from concurrent.futures import ThreadPoolExecutor
+from rpc import client as rpc_client
+
+PAGE_SIZE = 1000
+# Parallel fetch: concurrent page requests, and startedAt windows per worker (smaller windows balance the load)
+WORKERS = 4
+WINDOWS_PER_WORKER = 4
+# Retries with exponential backoff when the subgraph throttles (HTTP 429) or is unavailable
+THROTTLE_RETRIES = 5
+BACKOFF_SECONDS = 1
+THROTTLE_STATUS_CODES = (429, 502, 503, 504)
+# Values of a large _in filter (e.g. tokenId_in) sent per request
+CHUNK_SIZE = 100
+
+NAME_PATTERN = re.compile(r'^[A-Za-z_][A-Za-z0-9_]*$')
+# Fields the startedAt cursor of iter_auctions needs
+CURSOR_FIELDS = ['id', 'startedAt']
+
+BOUNDS_GRAPHQL_QUERY = """
+                        query ($where: %s) {
+                          %s(first: 1, orderBy: startedAt, orderDirection: %s, where: $where) {
+                            startedAt
+                          }
+                        }
+                        """
+
+_stats_lock = threading.Lock()
+
+
+def count(stats, name, n=1):
+    '''
+    Increment a counter of a stats dict (shared by the fetching threads)
+    '''
+    if stats is not None:
+        with _stats_lock:
+            stats[name] = stats.get(name, 0) + n
+
+
+def check_name(name):
+    if not NAME_PATTERN.match(name):
+        raise Exception("Invalid GraphQL name: " + str(name))
+    return name
+
+
+def render_fields(fields, indent='  '):
+    '''
+    :param fields: list of field names or of (field name, list of sub fields)
+    :param indent:
+    :return: GraphQL selection
+    '''
+    lines = []
+    for field in fields:
+        if isinstance(field, str):
+            lines.append(indent + check_name(field))
+        else:
+            name, sub_fields = field
+            lines.append(indent + check_name(name) + ' {')
+            lines.append(render_fields(sub_fields, indent + '  '))
+            lines.append(indent + '}')
+    return '\n'.join(lines)
+
+
+def build_query(entity, filter_type, fields, order_by='startedAt', order_direction='desc'):
+    '''
+    Build a paged auction query. Filter values are passed as variables ($first, $skip and $where), never formatted into
+    the query, and only the requested fields are fetched (plus id and startedAt, needed by the pagination cursor)
+    :param entity: e.g. saleAuctions
+    :param filter_type: e.g. SaleAuction_filter
+    :param fields: list of field names or of (field name, list of sub fields)
+    :param order_by:
+    :param order_direction: 'asc' or 'desc'
+    :return: query usable with post_graphql, iter_auctions, iter_auctions_parallel and fetch_chunked
+    '''
+    if order_direction not in ('asc', 'desc'):
+        raise Exception("Invalid order direction: " + str(order_direction))
+    fields = [field for field in CURSOR_FIELDS if field not in fields] + list(fields)
+    return ('query ($first: Int!, $skip: Int!, $where: ' + check_name(filter_type) + ') {\n' +
+            '  ' + check_name(entity) + '(first: $first, skip: $skip, orderBy: ' + check_name(order_by) +
+            ', orderDirection: ' + order_direction + ', where: $where) {\n' +
+            render_fields(fields, '    ') + '\n' +
+            '  }\n' +
+            '}\n')
+
+
+def post_graphql(graphql_address, query, variables=None, stats=None):
+    '''
+    Run a GraphQL query on the keep-alive session of the subgraph server, backing off when the server throttles
+    :param graphql_address:
+    :param query:
+    :param variables: dict of the query variables
+    :param stats: dict counting the retries, None to not count
+    :return: data of the response
+    '''
+    payload = {'query': query}
+    if variables is not None:
+        payload['variables'] = variables
+    for attempt in range(THROTTLE_RETRIES + 1):
+        try:
+            r = rpc_client.get_session(graphql_address).post(graphql_address, json=payload,
+                                                              timeout=rpc_client.REQUEST_TIMEOUT_SECONDS)
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+            if attempt == THROTTLE_RETRIES:
+                raise
+            r = None
+        if r is not None and r.status_code not in THROTTLE_STATUS_CODES:
+            break
+        if attempt == THROTTLE_RETRIES:
+            break
+        count(stats, 'retries')
+        retry_after = r.headers.get('Retry-After') if r is not None else None
+        delay = int(retry_after) if retry_after is not None and retry_after.isdigit() else BACKOFF_SECONDS * 2 ** attempt
+        time.sleep(delay)
+    if r.status_code != 200:
+        raise Exception("HTTP error " + str(r.status_code) + ": " + r.text)
+    data = r.json()
+    if data.get('errors'):
+        raise Exception("GraphQL error: " + str(data['errors']))
+    return data['data']
+
+
+def iter_auctions(graphql_address, query, entity, where, page_size=PAGE_SIZE, prefetch=True, stats=None):
+    '''
+    Iterate over the auctions matching where, newest first, paging with a startedAt cursor instead of a growing skip.
+    Each page asks for the auctions started at or before the last startedAt seen, skipping the ones already returned
+    with that exact startedAt. The next page is fetched in the background while the current one is consumed
+    :param graphql_address:
+    :param query: GraphQL query with the $first, $skip and $where variables, ordered by startedAt desc
+    :param entity: name of the queried entity in the response (e.g. saleAuctions)
+    :param where: filter of the auctions (without startedAt)
+    :param page_size:
+    :param prefetch: fetch the next page while the current one is consumed
+    :param stats: dict counting the pages and retries, None to not count
+    :return: generator of auctions
+    '''
+    def fetch(cursor):
+        started_at, skip = cursor
+        page_where = dict(where)
+        if started_at is not None:
+            page_where['startedAt_lte'] = started_at
+        page = post_graphql(graphql_address, query, {'first': page_size, 'skip': skip, 'where': page_where}, stats)[entity]
+        count(stats, 'pages')
+        return page
+
+    executor = ThreadPoolExecutor(max_workers=1) if prefetch else None
+    try:
+        cursor = (None, 0)
+        # ids already returned with the startedAt of the cursor, the only ones a later page can return again
+        seen_ids = set()
+        page = fetch(cursor)
+        while len(page) > 0:
+            started_at = cursor[0]
+            last_started_at = page[-1]['startedAt']
+            if last_started_at == started_at:
+                next_seen_ids = seen_ids | set(auction['id'] for auction in page)
+            else:
+                next_seen_ids = set(auction['id'] for auction in page if auction['startedAt'] == last_started_at)
+            next_cursor = (last_started_at, len(next_seen_ids))
+            if len(page) == page_size and next_cursor == cursor:
+                raise Exception("Pagination cursor did not advance at startedAt " + str(started_at))
+
+            future = None
+            if len(page) == page_size and executor is not None:
+                future = executor.submit(fetch, next_cursor)
+
+            for auction in page:
+                if auction['startedAt'] == started_at and auction['id'] in seen_ids:
+                    continue
+                yield auction
+
+            if len(page) < page_size:
+                break
+            cursor = next_cursor
+            seen_ids = next_seen_ids
+            page = future.result() if future is not None else fetch(cursor)
+    finally:
+        if executor is not None:
+            executor.shutdown(wait=False)
+
+
+def started_at_bounds(graphql_address, entity, filter_type, where, stats=None):
+    '''
+    :return: (oldest, newest) startedAt of the auctions matching where, None if there is none
+    '''
+    bounds = []
+    for direction in ('asc', 'desc'):
+        auctions = post_graphql(graphql_address, BOUNDS_GRAPHQL_QUERY % (filter_type, entity, direction), {'where': where},
+                                stats)[entity]
+        if len(auctions) == 0:
+            return None
+        bounds.append(int(auctions[0]['startedAt']))
+    return bounds[0], bounds[1]
+
+
+def iter_auctions_parallel(graphql_address, query, entity, filter_type, where, workers=WORKERS, page_size=PAGE_SIZE,
+                           stats=None):
+    '''
+    Iterate over the auctions matching where, newest first, fetching several pages at once.
+    The startedAt range of the auctions is split into windows, each paged with iter_auctions by one of the workers.
+    Windows are yielded in order as soon as they are complete, and auctions are deduplicated by id (an auction can
+    move between pages while they are fetched)
+    :param graphql_address:
+    :param query: GraphQL query with the $first, $skip and $where variables, ordered by startedAt desc
+    :param entity: name of the queried entity in the response (e.g. assistingAuctions)
+    :param filter_type: GraphQL type of the where filter (e.g. AssistingAuction_filter)
+    :param where: filter of the auctions (without startedAt)
+    :param workers: concurrent requests
+    :param page_size:
+    :param stats: dict filled with rows, pages, retries, seconds and rowsPerSecond, None to not report
+    :return: generator of auctions
+    '''
+    stats = {} if stats is None else stats
+    stats.update({'rows': 0, 'pages': 0, 'retries': 0, 'seconds': 0, 'rowsPerSecond': 0})
+    start = time.perf_counter()
+
+    bounds = started_at_bounds(graphql_address, entity, filter_type, where, stats)
+    if bounds is None:
+        return
+    oldest, newest = bounds
+    window_count = max(1, min(workers * WINDOWS_PER_WORKER, newest - oldest + 1))
+    # Windows (lower excluded, upper included), newest first
+    limits = [newest - (newest - oldest + 1) * i // window_count for i in range(window_count + 1)]
+    windows = [(limits[i + 1], limits[i]) for i in range(window_count)]
+
+    def fetch_window(window):
+        window_where = dict(where)
+        window_where['startedAt_gt'] = str(window[0])
+        window_where['startedAt_lte'] = str(window[1])
+        return list(iter_auctions(graphql_address, query, entity, window_where, page_size, False, stats))
+
+    executor = ThreadPoolExecutor(max_workers=workers)
+    futures = [executor.submit(fetch_window, window) for window in windows]
+    try:
+        seen_ids = set()
+        for future in futures:
+            for auction in future.result():
+                if auction['id'] in seen_ids:
+                    continue
+                seen_ids.add(auction['id'])
+                stats['rows'] = stats['rows'] + 1
+                yield auction
+            stats['seconds'] = time.perf_counter() - start
+            stats['rowsPerSecond'] = stats['rows'] / stats['seconds'] if stats['seconds'] > 0 else 0
+    finally:
+        for future in futures:
+            future.cancel()
+        executor.shutdown(wait=False)
+
+
+def fetch_chunked(graphql_address, query, entity, where, key, values, chunk_size=CHUNK_SIZE, workers=WORKERS,
+                  page_size=PAGE_SIZE, stats=None):
+    '''
+    Run a query filtering on a large list of values (e.g. tokenId_in) as several smaller requests run in parallel
+    :param graphql_address:
+    :param query: GraphQL query with the $first, $skip and $where variables, ordered by startedAt desc (see build_query)
+    :param entity: name of the queried entity in the response
+    :param where: other filters
+    :param key: filter receiving the values (e.g. tokenId_in)
+    :param values:
+    :param chunk_size: values per request
+    :param workers: concurrent requests
+    :param page_size:
+    :param stats: dict counting the pages and retries, None to not count
+    :return: list of auctions, newest first
+    '''
+    values = list(values)
+    chunks = [values[i:i + chunk_size] for i in range(0, len(values), chunk_size)]
+
+    def fetch_chunk(chunk):
+        chunk_where = dict(where)
+        chunk_where[key] = chunk
+        return list(iter_auctions(graphql_address, query, entity, chunk_where, page_size, False, stats))
+
+    if len(chunks) <= 1:
+        results = [fetch_chunk(chunk) for chunk in chunks]
+    else:
+        with ThreadPoolExecutor(max_workers=min(workers, len(chunks))) as executor:
+            results = list(executor.map(fetch_chunk, chunks))
+
+    auctions = {}
+    for chunk_auctions in results:
+        for auction in chunk_auctions:
+            auctions[auction['id']] = auction
+    return sorted(auctions.values(), key=lambda auction: int(auction['startedAt']), reverse=True)
@@ -1,4 +1,6 @@
-from web3 import Web3
+from rpc import client as rpc_client
+from rpc import async_client as rpc_async
+from . import metadata
 
 JEWEL = "0x72Cb10C6bfA5624dD07Ef608027E366bd690048F"
 DFKTEAR = "0x24eA0D436d3c2602fbfEfBe6a16bBc304C963D04"
@@ -83,36 +85,23 @@ def all_erc20():
 
 
 def symbol(token_address, rpc_address):
-    w3 = Web3(Web3.HTTPProvider(rpc_address))
-
-    contract_address = Web3.toChecksumAddress(token_address)
-    contract = w3.eth.contract(contract_address, abi=ABI)
-
-    return contract.functions.symbol().call()
+    return metadata.get_cache().get(token_address, ABI, 'symbol', rpc_address)
 
 
 def name(token_address, rpc_address):
-    w3 = Web3(Web3.HTTPProvider(rpc_address))
-
-    contract_address = Web3.toChecksumAddress(token_address)
-    contract = w3.eth.contract(contract_address, abi=ABI)
-
-    return contract.functions.name().call()
+    return metadata.get_cache().get(token_address, ABI, 'name', rpc_address)
 
 
 def decimals(token_address, rpc_address):
-    w3 = Web3(Web3.HTTPProvider(rpc_address))
-
-    contract_address = Web3.toChecksumAddress(token_address)
-    contract = w3.eth.contract(contract_address, abi=ABI)
-
-    return contract.functions.decimals().call()
+    return metadata.get_cache().get(token_address, ABI, 'decimals', rpc_address)
 
 
 def balance_of(address, token_address, rpc_address):
-    w3 = Web3(Web3.HTTPProvider(rpc_address))
-    contract_address = Web3.toChecksumAddress(token_address)
-    contract = w3.eth.contract(contract_address, abi=ABI)
+    contract = rpc_client.get_contract(token_address, ABI, rpc_address)
     result = contract.functions.balanceOf(address).call()
 
     return result
+
+
+async def balance_of_async(address, token_address, rpc_address):
+    return await rpc_async.call(token_address, ABI, 'balanceOf', [address], rpc_address)
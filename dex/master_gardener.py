@@ -1,4 +1,4 @@
-from web3 import Web3
+from rpc import client as rpc_client
 from .uniswap_v2_pair import UniswapV2Pair
 from .utils.utils import human_readable_user_info
 
@@ -89,19 +89,13 @@ ABI = '''
 
 
 def pool_length(rpc_address):
-    w3 = Web3(Web3.HTTPProvider(rpc_address))
-
-    contract_address = Web3.toChecksumAddress(CONTRACT_ADDRESS)
-    contract = w3.eth.contract(contract_address, abi=ABI)
+    contract = rpc_client.get_contract(CONTRACT_ADDRESS, ABI, rpc_address)
 
     return contract.functions.poolLength().call()
 
 
 def pool_info(pool_id, rpc_address):
-    w3 = Web3(Web3.HTTPProvider(rpc_address))
-
-    contract_address = Web3.toChecksumAddress(CONTRACT_ADDRESS)
-    contract = w3.eth.contract(contract_address, abi=ABI)
+    contract = rpc_client.get_contract(CONTRACT_ADDRESS, ABI, rpc_address)
 
     return contract.functions.poolInfo(pool_id).call()
 
@@ -113,19 +107,13 @@ def pool_id1(pool_address, rpc_address):
     :param rpc_address:
     :return:
     '''
-    w3 = Web3(Web3.HTTPProvider(rpc_address))
-
-    contract_address = Web3.toChecksumAddress(CONTRACT_ADDRESS)
-    contract = w3.eth.contract(contract_address, abi=ABI)
+    contract = rpc_client.get_contract(CONTRACT_ADDRESS, ABI, rpc_address)
 
     return contract.functions.poolId1(pool_address).call()
 
 
 def user_info(pool_id, user_address, rpc_address):
-    w3 = Web3(Web3.HTTPProvider(rpc_address))
-
-    contract_address = Web3.toChecksumAddress(CONTRACT_ADDRESS)
-    contract = w3.eth.contract(contract_address, abi=ABI)
+    contract = rpc_client.get_contract(CONTRACT_ADDRESS, ABI, rpc_address)
 
     return contract.functions.userInfo(pool_id, user_address).call()
 
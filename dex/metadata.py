@@ -0,0 +1,182 @@
+"""
+On-disk cache of immutable token and pair attributes (symbol, name, decimals, token0, token1).
+These attributes never change once a contract is deployed, so they are read from the chain once and then kept in a JSON
+file shared by every run. Entries are keyed by chain id (the same address can be another contract on another chain).
+Values read one at a time are written to the file at most every SAVE_DELAY_SECONDS, batches are written at once.
+The file holds a version stamp: a file written with another CACHE_VERSION is ignored.
+
+    metadata.prefetch_pairs(uniswap_v2_factory.all_pairs_many(rpc_server), rpc_server)
+    erc20.symbol(token_address, rpc_server)  # no RPC once cached
+"""
+
+import atexit
+import json
+import os
+import threading
+from rpc import client as rpc_client
+
+CACHE_VERSION = 2
+CACHE_PATH = os.path.join(os.path.expanduser('~'), '.cache', 'dfk', 'metadata.json')
+SAVE_DELAY_SECONDS = 5
+
+_lock = threading.Lock()
+_caches = {}
+_chain_ids = {}
+
+
+def get_chain_id(rpc_address):
+    '''
+    :return: chain id of the RPC server (read once per server)
+    '''
+    chain_id = _chain_ids.get(rpc_address)
+    if chain_id is None:
+        chain_id = rpc_client.get_web3(rpc_address).eth.chain_id
+        with _lock:
+            _chain_ids[rpc_address] = chain_id
+    return chain_id
+
+
+class MetadataCache:
+    def __init__(self, path=CACHE_PATH, version=CACHE_VERSION):
+        '''
+        :param path: JSON file, None to keep the cache in memory only
+        :param version: version stamp of the cache content
+        '''
+        self.path = path
+        self.version = version
+        self._lock = threading.Lock()
+        # chain id (str) -> contract address -> {function name -> value}
+        self.chains = {}
+        self._dirty = False
+        self._save_timer = None
+        if path is not None and os.path.exists(path):
+            try:
+                with open(path, 'r') as f:
+                    content = json.load(f)
+                if content.get('version') == version:
+                    self.chains = content['chains']
+            except (ValueError, KeyError, OSError):
+                self.chains = {}
+        if path is not None:
+            atexit.register(self.flush)
+
+    def lookup(self, chain_id, address, attribute):
+        '''
+        :return: cached value, None if not cached
+        '''
+        with self._lock:
+            return self.chains.get(str(chain_id), {}).get(rpc_client.checksum_address(address), {}).get(attribute)
+
+    def store(self, chain_id, values, save=True):
+        '''
+        Add values to the cache
+        :param chain_id:
+        :param values: list of (contract address, function name, value)
+        :param save: write the file now, otherwise within SAVE_DELAY_SECONDS
+        '''
+        with self._lock:
+            contracts = self.chains.setdefault(str(chain_id), {})
+            for address, attribute, value in values:
+                contracts.setdefault(rpc_client.checksum_address(address), {})[attribute] = value
+            self._dirty = True
+            if not save and self.path is not None and self._save_timer is None:
+                self._save_timer = threading.Timer(SAVE_DELAY_SECONDS, self.flush)
+                self._save_timer.daemon = True
+                self._save_timer.start()
+        if save:
+            self.flush()
+
+    def flush(self):
+        '''
+        Write the values not saved yet
+        '''
+        with self._lock:
+            if self._save_timer is not None:
+                self._save_timer.cancel()
+                self._save_timer = None
+            if self._dirty:
+                self.save()
+                self._dirty = False
+
+    def save(self):
+        if self.path is None:
+            return
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = self.path + '.' + str(os.getpid()) + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({'version': self.version, 'chains': self.chains}, f)
+        os.replace(tmp_path, self.path)
+
+    def get(self, address, abi, attribute, rpc_address):
+        '''
+        :param address: contract address
+        :param abi: ABI of the contract
+        :param attribute: view function without arguments returning an immutable value (e.g. 'symbol')
+        :param rpc_address:
+        :return: value, read from the chain only if not cached
+        '''
+        chain_id = get_chain_id(rpc_address)
+        value = self.lookup(chain_id, address, attribute)
+        if value is None:
+            value = getattr(rpc_client.get_contract(address, abi, rpc_address).functions, attribute)().call()
+            self.store(chain_id, [(address, attribute, value)], save=False)
+        return value
+
+    def prefetch(self, calls, rpc_address):
+        '''
+        Read the values not cached yet with batched calls
+        :param calls: list of (contract address, ABI, function name)
+        :param rpc_address:
+        :return: list of values in the order of calls
+        '''
+        chain_id = get_chain_id(rpc_address)
+        missing = [(address, abi, attribute, []) for address, abi, attribute in calls
+                   if self.lookup(chain_id, address, attribute) is None]
+        if len(missing) > 0:
+            results = rpc_client.multi_call(missing, rpc_address)
+            values = []
+            for (address, _, attribute, _), (result, error) in zip(missing, results):
+                if error is not None:
+                    raise Exception("Cannot read " + attribute + " of " + address + ": " + error)
+                values.append((address, attribute, result))
+            self.store(chain_id, values)
+        return [self.lookup(chain_id, address, attribute) for address, _, attribute in calls]
+
+    def clear(self):
+        with self._lock:
+            self.chains = {}
+            self.save()
+            self._dirty = False
+
+
+def get_cache(path=CACHE_PATH):
+    '''
+    Return the shared metadata cache of the file
+    :param path:
+    :return:
+    '''
+    cache = _caches.get(path)
+    if cache is None:
+        with _lock:
+            cache = _caches.setdefault(path, MetadataCache(path))
+    return cache
+
+
+def prefetch_pairs(pair_addresses, rpc_address, path=CACHE_PATH):
+    '''
+    Cache the attributes of liquidity pairs and of their tokens (batched calls for the values not cached yet)
+    :param pair_addresses:
+    :param rpc_address:
+    :param path: cache file
+    :return: list of (token0, token1) in the order of pair_addresses
+    '''
+    from . import erc20, uniswap_v2_pair
+
+    cache = get_cache(path)
+    values = cache.prefetch([(address, uniswap_v2_pair.ABI, attribute) for address in pair_addresses
+                             for attribute in ('symbol', 'decimals', 'token0', 'token1')], rpc_address)
+    tokens = [(values[4 * i + 2], values[4 * i + 3]) for i in range(len(pair_addresses))]
+    token_addresses = sorted(set(token for pair_tokens in tokens for token in pair_tokens))
+    cache.prefetch([(address, erc20.ABI, attribute) for address in token_addresses
+                    for attribute in ('symbol', 'name', 'decimals')], rpc_address)
+    return tokens
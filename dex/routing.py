@@ -0,0 +1,198 @@
+"""
+Swap routes over all the liquidity pairs of the factory.
+PairGraph loads every pair with its tokens and reserves (batched calls), then quotes routes in memory with the exact
+swap math of dex.utils.utils. Reserves are kept up to date from the Sync events of the pairs.
+
+    graph = routing.PairGraph(rpc_server)
+    graph.load()
+    route = graph.best_route(erc20.JEWEL, token_address, amount_in)
+    ...
+    graph.sync()  # apply the reserves changes since the last load or sync
+"""
+
+import threading
+from rpc import client as rpc_client
+from rpc import abi as rpc_abi
+from rpc import events as rpc_events
+from .utils import utils as dex_utils
+from . import metadata
+from . import uniswap_v2_factory
+from . import uniswap_v2_pair
+
+MAX_HOPS = 3
+# Largest number of blocks per eth_getLogs call
+SYNC_BLOCK_RANGE = 1024
+
+
+class PairGraph:
+    def __init__(self, rpc_address):
+        self.rpc_address = rpc_address
+        self._lock = threading.Lock()
+        # pair address -> [token0, token1, reserve0, reserve1]
+        self.pairs = {}
+        # token address -> list of (pair address, other token address)
+        self.adjacency = {}
+        self.last_block = None
+        self._sync_decoder = rpc_events.EventDecoder(
+            [entry for entry in rpc_abi.parse(uniswap_v2_pair.ABI) if entry.get('type') == 'event' and entry['name'] == 'Sync'][0])
+
+    def load(self, pair_addresses=None):
+        '''
+        Read the tokens and reserves of the pairs (batched calls) at the current block
+        :param pair_addresses: None for all the pairs of the factory
+        '''
+        if pair_addresses is None:
+            pair_addresses = uniswap_v2_factory.all_pairs_many(self.rpc_address)
+        pair_addresses = [rpc_client.checksum_address(address) for address in pair_addresses]
+        block = rpc_client.get_web3(self.rpc_address).eth.block_number
+
+        # Tokens come from the metadata cache, reserves from the chain
+        tokens = metadata.prefetch_pairs(pair_addresses, self.rpc_address)
+        results = rpc_client.multi_call([(address, uniswap_v2_pair.ABI, 'getReserves', []) for address in pair_addresses],
+                                        self.rpc_address, block_identifier=block)
+
+        pairs = {}
+        for address, (token0, token1), (reserves, error) in zip(pair_addresses, tokens, results):
+            if error is not None:
+                raise Exception("Cannot read reserves of pair " + address + ": " + error)
+            pairs[address] = [rpc_client.checksum_address(token0), rpc_client.checksum_address(token1), reserves[0],
+                              reserves[1]]
+
+        adjacency = {}
+        for address, (token0, token1, _, _) in pairs.items():
+            adjacency.setdefault(token0, []).append((address, token1))
+            adjacency.setdefault(token1, []).append((address, token0))
+
+        with self._lock:
+            self.pairs = pairs
+            self.adjacency = adjacency
+            self.last_block = block
+
+    def update_reserves(self, pair_address, reserve0, reserve1):
+        with self._lock:
+            pair = self.pairs.get(rpc_client.checksum_address(pair_address))
+            if pair is not None:
+                pair[2] = reserve0
+                pair[3] = reserve1
+
+    def sync(self, to_block=None):
+        '''
+        Apply the Sync events of the pairs emitted since the last load or sync (one eth_getLogs call per
+        SYNC_BLOCK_RANGE blocks)
+        :param to_block: None for the current block
+        :return: number of pairs updated
+        '''
+        w3 = rpc_client.get_web3(self.rpc_address)
+        if to_block is None:
+            to_block = w3.eth.block_number
+        with self._lock:
+            last_block = self.last_block
+            pair_addresses = list(self.pairs.keys())
+        if last_block is None or to_block <= last_block:
+            return 0
+
+        # Logs are in chain order: the last Sync of a pair holds its reserves
+        reserves = {}
+        for from_block in range(last_block + 1, to_block + 1, SYNC_BLOCK_RANGE):
+            logs = w3.eth.get_logs({'fromBlock': from_block, 'toBlock': min(from_block + SYNC_BLOCK_RANGE - 1, to_block),
+                                    'address': pair_addresses, 'topics': ['0x' + self._sync_decoder.topic.hex()]})
+            for log in logs:
+                if log.get('removed', False):
+                    continue
+                event = self._sync_decoder.decode(log)
+                reserves[rpc_client.checksum_address(event['address'])] = (event['args']['reserve0'],
+                                                                           event['args']['reserve1'])
+        with self._lock:
+            # A load or sync done meanwhile holds newer reserves
+            if self.last_block != last_block:
+                return 0
+            for address, (reserve0, reserve1) in reserves.items():
+                pair = self.pairs.get(address)
+                if pair is not None:
+                    pair[2] = reserve0
+                    pair[3] = reserve1
+            self.last_block = to_block
+        return len(reserves)
+
+    def reserves(self, pair_address, token_in):
+        '''
+        :return: (reserve of token_in, reserve of the other token) of the pair
+        '''
+        with self._lock:
+            return self.__reserves(pair_address, token_in)
+
+    def __reserves(self, pair_address, token_in):
+        token0, _, reserve0, reserve1 = self.pairs[pair_address]
+        return (reserve0, reserve1) if token_in == token0 else (reserve1, reserve0)
+
+    def quote(self, path, amount_in):
+        '''
+        :param path: token addresses, input token first
+        :param amount_in: wei
+        :return: amounts along the path (amount_in first), None if a pair of the path does not exist
+        '''
+        path = [rpc_client.checksum_address(token) for token in path]
+        amounts = [amount_in]
+        with self._lock:
+            for token_in, token_out in zip(path[:-1], path[1:]):
+                pair_address = self.__pair_address(token_in, token_out)
+                if pair_address is None:
+                    return None
+                reserve_in, reserve_out = self.__reserves(pair_address, token_in)
+                amounts.append(dex_utils.get_amount_out(amounts[-1], reserve_in, reserve_out))
+        return amounts
+
+    def pair_address(self, token_a, token_b):
+        with self._lock:
+            return self.__pair_address(token_a, token_b)
+
+    def __pair_address(self, token_a, token_b):
+        for pair_address, other in self.adjacency.get(token_a, []):
+            if other == token_b:
+                return pair_address
+        return None
+
+    def routes(self, token_in, token_out, amount_in, max_hops=MAX_HOPS):
+        '''
+        Every route from token_in to token_out of at most max_hops pairs, without going through a token twice
+        :param token_in:
+        :param token_out:
+        :param amount_in: wei
+        :param max_hops:
+        :return: list of routes, best output first. A route is a dict with path (token addresses, usable with
+        uniswap_v2_router swaps), pairs (pair addresses) and amounts (amount of each token along the path)
+        '''
+        token_in = rpc_client.checksum_address(token_in)
+        token_out = rpc_client.checksum_address(token_out)
+        routes = []
+
+        with self._lock:
+            # Depth-first search, amounts computed hop by hop
+            stack = [([token_in], [], [amount_in])]
+            while len(stack) > 0:
+                path, pairs, amounts = stack.pop()
+                token = path[-1]
+                for pair_address, other in self.adjacency.get(token, []):
+                    if other in path:
+                        continue
+                    reserve_in, reserve_out = self.__reserves(pair_address, token)
+                    if reserve_in <= 0 or reserve_out <= 0:
+                        continue
+                    amount_out = dex_utils.get_amount_out(amounts[-1], reserve_in, reserve_out)
+                    if amount_out <= 0:
+                        continue
+                    if other == token_out:
+                        routes.append({'path': path + [other], 'pairs': pairs + [pair_address],
+                                       'amounts': amounts + [amount_out]})
+                    elif len(pairs) + 1 < max_hops:
+                        stack.append((path + [other], pairs + [pair_address], amounts + [amount_out]))
+
+        routes.sort(key=lambda route: route['amounts'][-1], reverse=True)
+        return routes
+
+    def best_route(self, token_in, token_out, amount_in, max_hops=MAX_HOPS):
+        '''
+        :return: route with the largest output (see routes), None if there is no route
+        '''
+        routes = self.routes(token_in, token_out, amount_in, max_hops)
+        return routes[0] if len(routes) > 0 else None
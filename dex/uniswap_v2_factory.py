@@ -2,7 +2,7 @@
 https://docs.uniswap.org/protocol/V2/reference/smart-contracts/factory
 """
 
-from web3 import Web3
+from rpc import client as rpc_client
 
 CONTRACT_ADDRESS = '0x9014B937069918bd319f80e8B3BB4A2cf6FAA5F7'
 
@@ -25,10 +25,7 @@ ABI = """
 
 def all_pairs_length(rpc_address):
 
-    w3 = Web3(Web3.HTTPProvider(rpc_address))
-
-    contract_address = Web3.toChecksumAddress(CONTRACT_ADDRESS)
-    contract = w3.eth.contract(contract_address, abi=ABI)
+    contract = rpc_client.get_contract(CONTRACT_ADDRESS, ABI, rpc_address)
 
     return contract.functions.allPairsLength().call()
 
@@ -40,18 +37,27 @@ def all_pairs(index, rpc_address):
     :param rpc_address:
     :return:
     '''
-    w3 = Web3(Web3.HTTPProvider(rpc_address))
-
-    contract_address = Web3.toChecksumAddress(CONTRACT_ADDRESS)
-    contract = w3.eth.contract(contract_address, abi=ABI)
+    contract = rpc_client.get_contract(CONTRACT_ADDRESS, ABI, rpc_address)
 
     return contract.functions.allPairs(index).call()
 
 
-def get_pair(token_address_1, token_address_2, rpc_address):
-    w3 = Web3(Web3.HTTPProvider(rpc_address))
+def all_pairs_many(rpc_address):
+    '''
+    Return the addresses of all the liquidity pairs, read with batched allPairs calls
+    :param rpc_address:
+    :return: list of pair addresses
+    '''
+    count = all_pairs_length(rpc_address)
+    results = rpc_client.batch_call(CONTRACT_ADDRESS, ABI, 'allPairs', [[i] for i in range(count)], rpc_address)
+    for result, error in results:
+        if error is not None:
+            raise Exception("Cannot read pairs: " + error)
+
+    return [result for result, _ in results]
 
-    contract_address = Web3.toChecksumAddress(CONTRACT_ADDRESS)
-    contract = w3.eth.contract(contract_address, abi=ABI)
+
+def get_pair(token_address_1, token_address_2, rpc_address):
+    contract = rpc_client.get_contract(CONTRACT_ADDRESS, ABI, rpc_address)
 
     return contract.functions.getPair(token_address_1, token_address_2).call()
\ No newline at end of file
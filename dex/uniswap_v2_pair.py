@@ -3,8 +3,11 @@ Automated Market Making liquidity pair.
 https://docs.uniswap.org/protocol/V2/reference/smart-contracts/pair
 """
 
-from web3 import Web3
-from .utils.utils import swap_expected_amount1
+from rpc import client as rpc_client
+from rpc import transactions
+from rpc import async_client as rpc_async
+from .utils import utils as dex_utils
+from . import metadata
 
 ABI = '''
     [
@@ -49,82 +52,35 @@ def block_explorer_link(txid):
     return 'https://explorer.harmony.one/tx/' + str(txid)
 
 
-def swap(pool_address, amount0_out, amount1_out, to, private_key, nonce, gas_price_gwei, tx_timeout_seconds, rpc_address, logger):
-    w3 = Web3(Web3.HTTPProvider(rpc_address))
-    account = w3.eth.account.privateKeyToAccount(private_key)
-    w3.eth.default_account = account.address
+def swap(pool_address, amount0_out, amount1_out, to, private_key, nonce, gas_price_gwei, tx_timeout_seconds, rpc_address, logger, wait=True):
+    contract = rpc_client.get_contract(pool_address, ABI, rpc_address)
 
-    contract_address = Web3.toChecksumAddress(pool_address)
-    contract = w3.eth.contract(contract_address, abi=ABI)
-
-    tx = contract.functions.startQuestWithData(amount0_out, amount1_out, to, None).buildTransaction(
-        {'gasPrice': w3.toWei(gas_price_gwei, 'gwei'), 'nonce': nonce})
-
-    logger.debug("Signing transaction")
-    signed_tx = w3.eth.account.sign_transaction(tx, private_key=private_key)
-    logger.debug("Sending transaction " + str(tx))
-    ret = w3.eth.send_raw_transaction(signed_tx.rawTransaction)
-    logger.debug("Transaction successfully sent !")
-    logger.info(
-        "Waiting for transaction " + block_explorer_link(signed_tx.hash.hex()) + " to be mined")
-
-    tx_receipt = w3.eth.wait_for_transaction_receipt(transaction_hash=signed_tx.hash, timeout=tx_timeout_seconds,
-                                                     poll_latency=3)
-    logger.info("Transaction mined !")
-
-    return tx_receipt
+    function_call = contract.functions.swap(amount0_out, amount1_out, to, b'')
+    return transactions.send(function_call, private_key, nonce, gas_price_gwei, tx_timeout_seconds, rpc_address, logger, wait)
 
 
 def name(pool_address, rpc_address):
-    w3 = Web3(Web3.HTTPProvider(rpc_address))
-
-    contract_address = Web3.toChecksumAddress(pool_address)
-    contract = w3.eth.contract(contract_address, abi=ABI)
-
-    return contract.functions.symbol().call()
+    return metadata.get_cache().get(pool_address, ABI, 'name', rpc_address)
 
 
 def symbol(pool_address, rpc_address):
-    w3 = Web3(Web3.HTTPProvider(rpc_address))
-
-    contract_address = Web3.toChecksumAddress(pool_address)
-    contract = w3.eth.contract(contract_address, abi=ABI)
-
-    return contract.functions.symbol().call()
+    return metadata.get_cache().get(pool_address, ABI, 'symbol', rpc_address)
 
 
 def token_0(pool_address, rpc_address):
-    w3 = Web3(Web3.HTTPProvider(rpc_address))
-
-    contract_address = Web3.toChecksumAddress(pool_address)
-    contract = w3.eth.contract(contract_address, abi=ABI)
-
-    return contract.functions.token0().call()
+    return metadata.get_cache().get(pool_address, ABI, 'token0', rpc_address)
 
 
 def token_1(pool_address, rpc_address):
-    w3 = Web3(Web3.HTTPProvider(rpc_address))
-
-    contract_address = Web3.toChecksumAddress(pool_address)
-    contract = w3.eth.contract(contract_address, abi=ABI)
-
-    return contract.functions.token1().call()
+    return metadata.get_cache().get(pool_address, ABI, 'token1', rpc_address)
 
 
 def decimals(pool_address, rpc_address):
-    w3 = Web3(Web3.HTTPProvider(rpc_address))
-
-    contract_address = Web3.toChecksumAddress(pool_address)
-    contract = w3.eth.contract(contract_address, abi=ABI)
-
-    return contract.functions.decimals().call()
+    return metadata.get_cache().get(pool_address, ABI, 'decimals', rpc_address)
 
 
 def total_supply(pool_address, rpc_address):
-    w3 = Web3(Web3.HTTPProvider(rpc_address))
-
-    contract_address = Web3.toChecksumAddress(pool_address)
-    contract = w3.eth.contract(contract_address, abi=ABI)
+    contract = rpc_client.get_contract(pool_address, ABI, rpc_address)
 
     return contract.functions.totalSupply().call()
 
@@ -137,37 +93,33 @@ def get_reserves(pool_address, rpc_address):
     :param rpc_address:
     :return: reserve0, reserve1, blockTimestampLast
     '''
-    w3 = Web3(Web3.HTTPProvider(rpc_address))
-
-    contract_address = Web3.toChecksumAddress(pool_address)
-    contract = w3.eth.contract(contract_address, abi=ABI)
+    contract = rpc_client.get_contract(pool_address, ABI, rpc_address)
 
     return contract.functions.getReserves().call()
 
 
-def balance_of(pool_address, owner_address, rpc_address):
-    w3 = Web3(Web3.HTTPProvider(rpc_address))
+async def get_reserves_async(pool_address, rpc_address):
+    return await rpc_async.call(pool_address, ABI, 'getReserves', [], rpc_address)
+
 
-    contract_address = Web3.toChecksumAddress(pool_address)
-    contract = w3.eth.contract(contract_address, abi=ABI)
+def balance_of(pool_address, owner_address, rpc_address):
+    contract = rpc_client.get_contract(pool_address, ABI, rpc_address)
 
     return contract.functions.balanceOf(owner_address).call()
 
 
-def price_0_cumulative_last(pool_address, rpc_address):
-    w3 = Web3(Web3.HTTPProvider(rpc_address))
+async def balance_of_async(pool_address, owner_address, rpc_address):
+    return await rpc_async.call(pool_address, ABI, 'balanceOf', [owner_address], rpc_address)
 
-    contract_address = Web3.toChecksumAddress(pool_address)
-    contract = w3.eth.contract(contract_address, abi=ABI)
+
+def price_0_cumulative_last(pool_address, rpc_address):
+    contract = rpc_client.get_contract(pool_address, ABI, rpc_address)
 
     return contract.functions.price0CumulativeLast().call()
 
 
 def price_1_cumulative_last(pool_address, rpc_address):
-    w3 = Web3(Web3.HTTPProvider(rpc_address))
-
-    contract_address = Web3.toChecksumAddress(pool_address)
-    contract = w3.eth.contract(contract_address, abi=ABI)
+    contract = rpc_client.get_contract(pool_address, ABI, rpc_address)
 
     return contract.functions.price1CumulativeLast().call()
 
@@ -216,9 +168,34 @@ class UniswapV2Pair:
         return price_1_cumulative_last(self.address, self.rpc_address)
 
     def expected_amount1(self, amount0):
+        '''
+        Float estimate of token1 for amount0 of token0, without the fee (see dex_utils.swap_expected_amount1)
+        '''
         reserves = get_reserves(self.address, self.rpc_address)
-        return swap_expected_amount1(reserves[0], reserves[1], amount0)
+        return dex_utils.swap_expected_amount1(reserves[0], reserves[1], amount0)
 
     def expected_amount0(self, amount1):
         reserves = get_reserves(self.address, self.rpc_address)
-        return swap_expected_amount1(reserves[1], reserves[0], amount1)
\ No newline at end of file
+        return dex_utils.swap_expected_amount1(reserves[1], reserves[0], amount1)
+
+    def amount1_out(self, amount0):
+        '''
+        Exact amount of token1 received when swapping amount0 of token0, fee included (see dex_utils.get_amount_out)
+        '''
+        reserves = get_reserves(self.address, self.rpc_address)
+        return dex_utils.get_amount_out(amount0, reserves[0], reserves[1])
+
+    def amount0_out(self, amount1):
+        reserves = get_reserves(self.address, self.rpc_address)
+        return dex_utils.get_amount_out(amount1, reserves[1], reserves[0])
+
+    def amounts1_out(self, amounts0):
+        '''
+        Amounts of token1 received for many amounts of token0, with a single reserves call
+        '''
+        reserves = get_reserves(self.address, self.rpc_address)
+        return dex_utils.get_amounts_out_many(amounts0, reserves[0], reserves[1])
+
+    def amounts0_out(self, amounts1):
+        reserves = get_reserves(self.address, self.rpc_address)
+        return dex_utils.get_amounts_out_many(amounts1, reserves[1], reserves[0])
@@ -2,7 +2,8 @@
 https://docs.uniswap.org/protocol/V2/reference/smart-contracts/router-02
 """
 
-from web3 import Web3
+from rpc import client as rpc_client
+from rpc import transactions
 
 
 CONTRACT_ADDRESS = '0x24ad62502d1C652Cc7684081169D04896aC20f30'
@@ -48,51 +49,36 @@ def weth(rpc_address):
     :return:
     '''
 
-    w3 = Web3(Web3.HTTPProvider(rpc_address))
-
-    contract_address = Web3.toChecksumAddress(CONTRACT_ADDRESS)
-    contract = w3.eth.contract(contract_address, abi=ABI)
+    contract = rpc_client.get_contract(CONTRACT_ADDRESS, ABI, rpc_address)
 
     return contract.functions.WETH().call()
 
 
 def factory(rpc_address):
-    w3 = Web3(Web3.HTTPProvider(rpc_address))
-
-    contract_address = Web3.toChecksumAddress(CONTRACT_ADDRESS)
-    contract = w3.eth.contract(contract_address, abi=ABI)
+    contract = rpc_client.get_contract(CONTRACT_ADDRESS, ABI, rpc_address)
 
     return contract.functions.factory().call()
 
 
 def quote(amount_a, reserve_a, reserve_b, rpc_address):
-    w3 = Web3(Web3.HTTPProvider(rpc_address))
-
-    contract_address = Web3.toChecksumAddress(CONTRACT_ADDRESS)
-    contract = w3.eth.contract(contract_address, abi=ABI)
+    contract = rpc_client.get_contract(CONTRACT_ADDRESS, ABI, rpc_address)
 
     return contract.functions.quote(amount_a, reserve_a, reserve_b).call()
 
 
 def get_amount_in(amount_out, reserve_in, reserve_out, rpc_address):
-    w3 = Web3(Web3.HTTPProvider(rpc_address))
-
-    contract_address = Web3.toChecksumAddress(CONTRACT_ADDRESS)
-    contract = w3.eth.contract(contract_address, abi=ABI)
+    contract = rpc_client.get_contract(CONTRACT_ADDRESS, ABI, rpc_address)
 
     return contract.functions.getAmountIn(amount_out, reserve_in, reserve_out).call()
 
 
 def get_amount_out(amount_in, reserve_in, reserve_out, rpc_address):
-    w3 = Web3(Web3.HTTPProvider(rpc_address))
-
-    contract_address = Web3.toChecksumAddress(CONTRACT_ADDRESS)
-    contract = w3.eth.contract(contract_address, abi=ABI)
+    contract = rpc_client.get_contract(CONTRACT_ADDRESS, ABI, rpc_address)
 
     return contract.functions.getAmountOut(amount_in, reserve_in, reserve_out).call()
 
 
-def swap_exact_tokens_for_tokens(amount_in, amount_out_min, path, to, deadline, private_key, nonce, gas_price_gwei, tx_timeout_seconds, rpc_address, logger):
+def swap_exact_tokens_for_tokens(amount_in, amount_out_min, path, to, deadline, private_key, nonce, gas_price_gwei, tx_timeout_seconds, rpc_address, logger, wait=True):
     '''
     Swaps an exact amount of input tokens for as many output tokens as possible, along the route determined by the
     path. The first element of path is the input token, the last is the output token, and any intermediate elements
@@ -108,35 +94,17 @@ def swap_exact_tokens_for_tokens(amount_in, amount_out_min, path, to, deadline,
     :param tx_timeout_seconds:
     :param rpc_address:
     :param logger:
-    :return:
+    :param wait: False to return a receipts.PendingTransaction right after sending
+    :return: transaction receipt
     '''
 
-    w3 = Web3(Web3.HTTPProvider(rpc_address))
-    account = w3.eth.account.privateKeyToAccount(private_key)
-    w3.eth.default_account = account.address
-
-    contract_address = Web3.toChecksumAddress(CONTRACT_ADDRESS)
-    contract = w3.eth.contract(contract_address, abi=ABI)
-
-    tx = contract.functions.swapExactTokensForTokens(amount_in, amount_out_min, path, to, deadline).buildTransaction(
-        {'gasPrice': w3.toWei(gas_price_gwei, 'gwei'), 'nonce': nonce})
+    contract = rpc_client.get_contract(CONTRACT_ADDRESS, ABI, rpc_address)
 
-    logger.debug("Signing transaction")
-    signed_tx = w3.eth.account.sign_transaction(tx, private_key=private_key)
-    logger.debug("Sending transaction " + str(tx))
-    ret = w3.eth.send_raw_transaction(signed_tx.rawTransaction)
-    logger.debug("Transaction successfully sent !")
-    logger.info(
-        "Waiting for transaction " + block_explorer_link(signed_tx.hash.hex()) + " to be mined")
+    function_call = contract.functions.swapExactTokensForTokens(amount_in, amount_out_min, path, to, deadline)
+    return transactions.send(function_call, private_key, nonce, gas_price_gwei, tx_timeout_seconds, rpc_address, logger, wait)
 
-    tx_receipt = w3.eth.wait_for_transaction_receipt(transaction_hash=signed_tx.hash, timeout=tx_timeout_seconds,
-                                                     poll_latency=3)
-    logger.info("Transaction mined !")
 
-    return tx_receipt
-
-
-def swap_exact_tokens_for_eth(amount_in, amount_out_min, path, to, deadline, private_key, nonce, gas_price_gwei, tx_timeout_seconds, rpc_address, logger):
+def swap_exact_tokens_for_eth(amount_in, amount_out_min, path, to, deadline, private_key, nonce, gas_price_gwei, tx_timeout_seconds, rpc_address, logger, wait=True):
     '''
     Swaps an exact amount of tokens for as much ETH as possible, along the route determined by the path.
     The first element of path is the input token, the last must be WETH, and any intermediate elements represent
@@ -152,28 +120,10 @@ def swap_exact_tokens_for_eth(amount_in, amount_out_min, path, to, deadline, pri
     :param tx_timeout_seconds:
     :param rpc_address:
     :param logger:
-    :return:
+    :param wait: False to return a receipts.PendingTransaction right after sending
+    :return: transaction receipt
     '''
-    w3 = Web3(Web3.HTTPProvider(rpc_address))
-    account = w3.eth.account.privateKeyToAccount(private_key)
-    w3.eth.default_account = account.address
-
-    contract_address = Web3.toChecksumAddress(CONTRACT_ADDRESS)
-    contract = w3.eth.contract(contract_address, abi=ABI)
-
-    tx = contract.functions.swapExactTokensForETH(amount_in, amount_out_min, path, to, deadline).buildTransaction(
-        {'gasPrice': w3.toWei(gas_price_gwei, 'gwei'), 'nonce': nonce})
-
-    logger.debug("Signing transaction")
-    signed_tx = w3.eth.account.sign_transaction(tx, private_key=private_key)
-    logger.debug("Sending transaction " + str(tx))
-    ret = w3.eth.send_raw_transaction(signed_tx.rawTransaction)
-    logger.debug("Transaction successfully sent !")
-    logger.info(
-        "Waiting for transaction " + block_explorer_link(signed_tx.hash.hex()) + " to be mined")
-
-    tx_receipt = w3.eth.wait_for_transaction_receipt(transaction_hash=signed_tx.hash, timeout=tx_timeout_seconds,
-                                                     poll_latency=3)
-    logger.info("Transaction mined !")
+    contract = rpc_client.get_contract(CONTRACT_ADDRESS, ABI, rpc_address)
 
-    return tx_receipt
+    function_call = contract.functions.swapExactTokensForETH(amount_in, amount_out_min, path, to, deadline)
+    return transactions.send(function_call, private_key, nonce, gas_price_gwei, tx_timeout_seconds, rpc_address, logger, wait)
@@ -1,5 +1,119 @@
 
+# Uniswap V2 swap fee: 0.3% of the input amount
+FEE_NUMERATOR = 997
+FEE_DENOMINATOR = 1000
+
+
+def quote(amount_a, reserve_a, reserve_b):
+    '''
+    Same as UniswapV2Library.quote: amount of token B worth amount_a of token A at the current reserves (no fee)
+    :param amount_a: wei
+    :param reserve_a:
+    :param reserve_b:
+    :return: wei
+    '''
+    if amount_a <= 0:
+        raise Exception("Insufficient amount")
+    if reserve_a <= 0 or reserve_b <= 0:
+        raise Exception("Insufficient liquidity")
+    return amount_a * reserve_b // reserve_a
+
+
+def get_amount_out(amount_in, reserve_in, reserve_out):
+    '''
+    Same as UniswapV2Library.getAmountOut: amount received when swapping amount_in, fee included
+    :param amount_in: wei
+    :param reserve_in:
+    :param reserve_out:
+    :return: wei
+    '''
+    if amount_in <= 0:
+        raise Exception("Insufficient input amount")
+    if reserve_in <= 0 or reserve_out <= 0:
+        raise Exception("Insufficient liquidity")
+    amount_in_with_fee = amount_in * FEE_NUMERATOR
+    return amount_in_with_fee * reserve_out // (reserve_in * FEE_DENOMINATOR + amount_in_with_fee)
+
+
+def get_amount_in(amount_out, reserve_in, reserve_out):
+    '''
+    Same as UniswapV2Library.getAmountIn: amount to swap to receive amount_out, fee included
+    :param amount_out: wei
+    :param reserve_in:
+    :param reserve_out:
+    :return: wei
+    '''
+    if amount_out <= 0:
+        raise Exception("Insufficient output amount")
+    if reserve_in <= 0 or reserve_out <= amount_out:
+        raise Exception("Insufficient liquidity")
+    return reserve_in * amount_out * FEE_DENOMINATOR // ((reserve_out - amount_out) * FEE_NUMERATOR) + 1
+
+
+def get_amounts_out_many(amounts_in, reserve_in, reserve_out):
+    '''
+    get_amount_out for many trade sizes on the same reserves
+    :param amounts_in: list of wei amounts
+    :param reserve_in:
+    :param reserve_out:
+    :return: list of wei amounts
+    '''
+    if reserve_in <= 0 or reserve_out <= 0:
+        raise Exception("Insufficient liquidity")
+    if any(amount_in <= 0 for amount_in in amounts_in):
+        raise Exception("Insufficient input amount")
+    scaled_reserve_in = reserve_in * FEE_DENOMINATOR
+    return [a * reserve_out // (scaled_reserve_in + a) for a in [amount_in * FEE_NUMERATOR for amount_in in amounts_in]]
+
+
+def get_amounts_in_many(amounts_out, reserve_in, reserve_out):
+    '''
+    get_amount_in for many trade sizes on the same reserves
+    :param amounts_out: list of wei amounts
+    :param reserve_in:
+    :param reserve_out:
+    :return: list of wei amounts
+    '''
+    if any(amount_out <= 0 for amount_out in amounts_out):
+        raise Exception("Insufficient output amount")
+    if reserve_in <= 0 or any(reserve_out <= amount_out for amount_out in amounts_out):
+        raise Exception("Insufficient liquidity")
+    scaled_reserve_in = reserve_in * FEE_DENOMINATOR
+    return [scaled_reserve_in * amount_out // ((reserve_out - amount_out) * FEE_NUMERATOR) + 1 for amount_out in amounts_out]
+
+
+def get_amounts_out(amount_in, reserves):
+    '''
+    Same as UniswapV2Library.getAmountsOut, with the reserves of each hop given instead of read from the pairs
+    :param amount_in: wei
+    :param reserves: list of (reserve_in, reserve_out), one per pair of the path
+    :return: list of amounts, amount_in first
+    '''
+    amounts = [amount_in]
+    for reserve_in, reserve_out in reserves:
+        amounts.append(get_amount_out(amounts[-1], reserve_in, reserve_out))
+    return amounts
+
+
+def get_amounts_in(amount_out, reserves):
+    '''
+    Same as UniswapV2Library.getAmountsIn, with the reserves of each hop given instead of read from the pairs
+    :param amount_out: wei
+    :param reserves: list of (reserve_in, reserve_out), one per pair of the path
+    :return: list of amounts, amount_out last
+    '''
+    amounts = [amount_out]
+    for reserve_in, reserve_out in reversed(reserves):
+        amounts.insert(0, get_amount_in(amounts[0], reserve_in, reserve_out))
+    return amounts
+
+
 def swap_expected_amount1(reserve0, reserve1, amount0_wei=1):
+    '''
+    Float estimate of a swap, without the fee (average of the prices before and after the swap). See get_amount_out for
+    the exact amount received
+    :return: amount of token1 for amount0_wei of token0 (with the default amount, the price of token0 in token1)
+    '''
     p = reserve0 / reserve1
     amount1_wei = amount0_wei / p
     p2 = (reserve0 + amount0_wei) / (reserve1 - amount1_wei)
@@ -8,6 +8,7 @@ import dex.master_gardener as gardens
 import dex.uniswap_v2_pair as pool
 import dex.utils.utils as utils
 import dex.erc20 as erc20
+from dex import routing
 
 if __name__ == "__main__":
     log_format = '%(asctime)s|%(name)s|%(levelname)s: %(message)s'
@@ -39,6 +40,25 @@ if __name__ == "__main__":
     amount_token0 = erc20.wei2eth(w3, liquidity_pool.expected_amount0(erc20.eth2wei(w3, amount_token1)))
     logger.info(liquidity_pool_symbol + " " + liquidity_pool_token0 + "-" + liquidity_pool_token1 + " @ " + str(amount_token0) + " " + liquidity_pool_token0 + " per " + liquidity_pool_token1)
 
+    # Local swap math versus the router (on-chain)
+    reserves = liquidity_pool.reserves()
+    trade_sizes = [erc20.eth2wei(w3, amount) for amount in [0.01, 1, 100, 10000]]
+    local_amounts_out = utils.get_amounts_out_many(trade_sizes, reserves[0], reserves[1])
+    for amount_in, local_amount_out in zip(trade_sizes, local_amounts_out):
+        router_amount_out = market_place_router.get_amount_out(amount_in, reserves[0], reserves[1], rpc_server)
+        router_amount_in = market_place_router.get_amount_in(local_amount_out, reserves[0], reserves[1], rpc_server)
+        logger.info("Swap " + str(amount_in) + " wei: local " + str(local_amount_out) + ", router " + str(router_amount_out)
+                    + (" OK" if local_amount_out == router_amount_out
+                       and utils.get_amount_in(local_amount_out, reserves[0], reserves[1]) == router_amount_in else " MISMATCH"))
+
+    # Best route for a swap, quoted in memory over all the pairs
+    pair_graph = routing.PairGraph(rpc_server)
+    pair_graph.load()
+    route = pair_graph.best_route(erc20.JEWEL, erc20.DFKTEAR, erc20.eth2wei(w3, 10))
+    if route is not None:
+        logger.info("Best route JEWEL -> TEAR: " + " -> ".join(erc20.symbol(token, rpc_server) for token in route['path'])
+                    + " for " + str(erc20.wei2eth(w3, route['amounts'][-1])) + " TEAR")
+
     liquidity_pool_balance = liquidity_pool.balance_of(user_address)
     logger.info("LP user balance:\t" + str(erc20.wei2eth(w3, liquidity_pool_balance)))
 
@@ -60,5 +80,5 @@ if __name__ == "__main__":
     #private_key = None #set private key of to swap coin from
     #account_address = w3.eth.account.privateKeyToAccount(private_key).address
     #market_place_router.swap_exact_tokens_for_eth(erc20.eth2wei(w3, 1), 60, [erc20.JEWEL, market_place_router.weth(rpc_server)], account_address,
-    #                                 int(time.time() + 60), private_key, w3.eth.getTransactionCount(account_address),
+    #                                 int(time.time() + 60), private_key, None,
     #                                 w3.fromWei(w3.eth.gas_price, 'gwei'), 30, rpc_server, logger)
@@ -0,0 +1,96 @@
+"""
+Offline comparison of receipt decoding: processReceipt on contract events (one pass over the logs per event type)
+versus rpc.events (one pass, decoders indexed by topic0).
+"""
+
+import logging
+import sys
+import time
+import warnings
+from eth_abi import encode_abi, encode_single
+from hexbytes import HexBytes
+from web3 import Web3
+from eth_utils.abi import collapse_if_tuple
+from web3.datastructures import AttributeDict
+from rpc import abi as rpc_abi
+from rpc import events
+from quest import quest_core
+from dex import erc20
+
+RPC_SERVER = 'https://api.harmony.one'
+PLAYER = '0x2E7669F61eA77F02445A015FBdcFe2DE47083E02'
+RECEIPTS = 200
+
+
+def event_abi(abi, name):
+    return [entry for entry in rpc_abi.parse(abi) if entry.get('type') == 'event' and entry['name'] == name][0]
+
+
+def make_log(abi, name, values, log_index):
+    entry = event_abi(abi, name)
+    topics = [HexBytes(events.EventDecoder(entry).topic)]
+    data_types = []
+    data_values = []
+    for i, value in zip(entry['inputs'], values):
+        if i['indexed']:
+            topics.append(HexBytes(encode_single(collapse_if_tuple(i), value)))
+        else:
+            data_types.append(collapse_if_tuple(i))
+            data_values.append(value)
+    return AttributeDict({'address': Web3.toChecksumAddress(quest_core.CONTRACT_ADDRESS), 'topics': topics,
+                          'data': Web3.toHex(encode_abi(data_types, data_values)), 'logIndex': log_index,
+                          'transactionIndex': 0, 'transactionHash': HexBytes(b'\x01' * 32),
+                          'blockHash': HexBytes(b'\x02' * 32), 'blockNumber': 1, 'removed': False})
+
+
+def make_receipt():
+    logs = []
+    for hero_id in range(1, 4):
+        logs.append(make_log(quest_core.ABI, 'QuestReward', [7, PLAYER, hero_id, erc20.JEWEL, 2], len(logs)))
+        logs.append(make_log(erc20.ABI, 'Transfer', [quest_core.CONTRACT_ADDRESS, PLAYER, 2], len(logs)))
+        logs.append(make_log(quest_core.ABI, 'QuestXP', [7, PLAYER, hero_id, 24], len(logs)))
+        logs.append(make_log(quest_core.ABI, 'QuestSkillUp', [7, PLAYER, hero_id, 1, 10], len(logs)))
+    return AttributeDict({'logs': logs})
+
+
+def process_receipt(tx_receipt, contract):
+    return {'reward': contract.events.QuestReward().processReceipt(tx_receipt),
+            'xp': contract.events.QuestXP().processReceipt(tx_receipt)}
+
+
+def decode_receipt(tx_receipt):
+    decoded = events.group_by_name(events.decode_receipt(tx_receipt, ['QuestReward', 'QuestXP']))
+    return {'reward': decoded.get('QuestReward', []), 'xp': decoded.get('QuestXP', [])}
+
+
+if __name__ == "__main__":
+    log_format = '%(asctime)s|%(name)s|%(levelname)s: %(message)s'
+
+    logger = logging.getLogger("DFK-events-benchmark")
+    logger.setLevel(logging.DEBUG)
+    logging.basicConfig(level=logging.INFO, format=log_format, stream=sys.stdout)
+
+    # processReceipt warns about every log of another event
+    warnings.simplefilter('ignore')
+    tx_receipts = [make_receipt() for _ in range(RECEIPTS)]
+    contract = Web3(Web3.HTTPProvider(RPC_SERVER)).eth.contract(Web3.toChecksumAddress(quest_core.CONTRACT_ADDRESS),
+                                                                 abi=quest_core.ABI)
+
+    expected = process_receipt(tx_receipts[0], contract)
+    decoded = decode_receipt(tx_receipts[0])
+    assert [dict(e.args) for e in expected['reward']] == [dict(e.args) for e in decoded['reward']]
+    assert [dict(e.args) for e in expected['xp']] == [dict(e.args) for e in decoded['xp']]
+
+    start = time.perf_counter()
+    for tx_receipt in tx_receipts:
+        process_receipt(tx_receipt, contract)
+    process_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for tx_receipt in tx_receipts:
+        decode_receipt(tx_receipt)
+    decode_seconds = time.perf_counter() - start
+
+    logger.info("processReceipt:\t" + str(round(1e6 * process_seconds / RECEIPTS)) + " us per receipt")
+    logger.info("rpc.events:\t" + str(round(1e6 * decode_seconds / RECEIPTS)) + " us per receipt")
+    logger.info("Speedup:\t" + str(round(process_seconds / decode_seconds, 1)) + "x")
@@ -0,0 +1,232 @@
+"""
+Offline simulation of the gene science contract (mixGenes of genes/gene_science.py).
+The algorithm is the CryptoKitties gene science the contract derives from:
+- the random number is keccak256(blockhash, genes1, genes2, block number)
+- within each trait, every gene of each parent is swapped with the next (more dominant) one with a 1/4 chance
+- dominant genes of different parity may mutate (see ascend)
+- each gene of the offspring is then picked from one parent or the other with a 1/2 chance
+Use validate or validate_fixture to check the simulation against the chain before relying on it.
+"""
+
+import itertools
+import random
+from eth_utils import keccak
+from rpc import client as rpc_client
+from . import gene_science
+
+GENE_COUNT = 48
+TRAIT_COUNT = 12
+GENES_PER_TRAIT = 4
+
+# Outcomes of the 3 swaps (j = 3, 2, 1) of a trait with their probability
+__SWAPS = [(swaps, (0.25 if swaps[0] else 0.75) * (0.25 if swaps[1] else 0.75) * (0.25 if swaps[2] else 0.75))
+           for swaps in itertools.product((True, False), repeat=3)]
+
+
+def decode(genes):
+    '''
+    Split genes into 48 genes of 5 bits, index 0 being the least significant (the dominant gene of the last trait)
+    :param genes:
+    :return:
+    '''
+    return [(genes >> (5 * i)) & 0x1f for i in range(GENE_COUNT)]
+
+
+def encode(genes_array):
+    genes = 0
+    for i in range(GENE_COUNT - 1, -1, -1):
+        genes = (genes << 5) | genes_array[i]
+    return genes
+
+
+def random_number(block_hash, genes1, genes2, block_number):
+    '''
+    Random number used by mixGenes for a target block
+    :param block_hash: hash of the target block (bytes or hex string)
+    :param genes1:
+    :param genes2:
+    :param block_number: target block
+    :return:
+    '''
+    if type(block_hash) == str:
+        block_hash = bytes.fromhex(block_hash[2:] if block_hash.startswith('0x') else block_hash)
+    packed = block_hash.rjust(32, b'\0') + genes1.to_bytes(32, 'big') + genes2.to_bytes(32, 'big') \
+        + block_number.to_bytes(32, 'big')
+    return int.from_bytes(keccak(packed), 'big')
+
+
+def ascend(gene1, gene2, rand):
+    '''
+    Mutation of two dominant genes. Return 0 when there is no mutation
+    :param gene1:
+    :param gene2:
+    :param rand: random number between 0 and 7
+    :return:
+    '''
+    small = min(gene1, gene2)
+    big = max(gene1, gene2)
+    if big - small == 1 and small % 2 == 0:
+        max_rand = 1 if small < 23 else 0
+        if rand <= max_rand:
+            return small // 2 + 16
+    return 0
+
+
+def mix(genes1, genes2, random_n):
+    '''
+    Mix genes with a given random number
+    :param genes1:
+    :param genes2:
+    :param random_n: 256 bits random number (see random_number)
+    :return: offspring genes
+    '''
+    genes1_array = decode(genes1)
+    genes2_array = decode(genes2)
+    random_index = 0
+
+    for i in range(TRAIT_COUNT):
+        for j in range(3, 0, -1):
+            pos = i * GENES_PER_TRAIT + j
+            if (random_n >> random_index) & 0x3 == 0:
+                genes1_array[pos], genes1_array[pos - 1] = genes1_array[pos - 1], genes1_array[pos]
+            random_index = random_index + 2
+            if (random_n >> random_index) & 0x3 == 0:
+                genes2_array[pos], genes2_array[pos - 1] = genes2_array[pos - 1], genes2_array[pos]
+            random_index = random_index + 2
+
+    baby_array = [0] * GENE_COUNT
+    for pos in range(GENE_COUNT):
+        ascended = 0
+        if pos % GENES_PER_TRAIT == 0 and (genes1_array[pos] & 1) != (genes2_array[pos] & 1):
+            ascended = ascend(genes1_array[pos], genes2_array[pos], (random_n >> random_index) & 0x7)
+            random_index = random_index + 3
+
+        if ascended > 0:
+            baby_array[pos] = ascended
+        else:
+            baby_array[pos] = genes1_array[pos] if (random_n >> random_index) & 0x1 == 0 else genes2_array[pos]
+            random_index = random_index + 1
+
+    return encode(baby_array)
+
+
+def mix_at_block(genes1, genes2, block_number, block_hash):
+    '''
+    Local equivalent of gene_science.mix_genes
+    :param genes1:
+    :param genes2:
+    :param block_number: target block
+    :param block_hash: hash of the target block
+    :return: offspring genes
+    '''
+    return mix(genes1, genes2, random_number(block_hash, genes1, genes2, block_number))
+
+
+def sample(genes1, genes2, count, rng=random):
+    '''
+    Draw offspring genes, each with an independent random number
+    :param genes1:
+    :param genes2:
+    :param count: number of draws
+    :param rng: random generator (random.Random instance to seed the draws)
+    :return: list of offspring genes
+    '''
+    return [mix(genes1, genes2, rng.getrandbits(256)) for _ in range(count)]
+
+
+def sample_many(pairs, count, rng=random):
+    '''
+    Draw offspring genes for many pairs of parents
+    :param pairs: list of (genes1, genes2)
+    :param count: number of draws per pair
+    :param rng:
+    :return: list of list of offspring genes (in the order of pairs)
+    '''
+    return [sample(genes1, genes2, count, rng) for genes1, genes2 in pairs]
+
+
+def gene_distribution(genes1, genes2):
+    '''
+    Exact probability distribution of each gene of the offspring. The random bits used by each decision of mixGenes are
+    independent, so the distribution is computed by enumerating the swaps of each trait instead of sampling
+    :param genes1:
+    :param genes2:
+    :return: list of 48 dict gene value -> probability, index 0 being the least significant gene (as in decode)
+    '''
+    genes1_array = decode(genes1)
+    genes2_array = decode(genes2)
+
+    distribution = []
+    for i in range(TRAIT_COUNT):
+        trait1 = __swapped_trait_distribution(genes1_array[i * GENES_PER_TRAIT:(i + 1) * GENES_PER_TRAIT])
+        trait2 = __swapped_trait_distribution(genes2_array[i * GENES_PER_TRAIT:(i + 1) * GENES_PER_TRAIT])
+
+        for j in range(GENES_PER_TRAIT):
+            gene = {}
+            for gene1, p1 in trait1[j].items():
+                for gene2, p2 in trait2[j].items():
+                    p = p1 * p2
+                    if j == 0 and (gene1 & 1) != (gene2 & 1):
+                        ascended = ascend(gene1, gene2, 0)
+                        if ascended > 0:
+                            p_ascend = (2 if min(gene1, gene2) < 23 else 1) / 8
+                            gene[ascended] = gene.get(ascended, 0) + p * p_ascend
+                            p = p * (1 - p_ascend)
+                    gene[gene1] = gene.get(gene1, 0) + p / 2
+                    gene[gene2] = gene.get(gene2, 0) + p / 2
+            distribution.append(gene)
+
+    return distribution
+
+
+def dominant_distribution(genes1, genes2):
+    '''
+    Exact probability distribution of the dominant gene of each trait of the offspring
+    :param genes1:
+    :param genes2:
+    :return: list of 12 dict gene value -> probability, in the order of hero.utils.utils stat_traits/visual_traits
+    '''
+    distribution = gene_distribution(genes1, genes2)
+    return [distribution[(TRAIT_COUNT - 1 - t) * GENES_PER_TRAIT] for t in range(TRAIT_COUNT)]
+
+
+def __swapped_trait_distribution(trait):
+    # Distribution of the 4 genes of a trait after the swaps of mixGenes
+    result = [{}, {}, {}, {}]
+    for swaps, p in __SWAPS:
+        genes = list(trait)
+        for j, swap in zip((3, 2, 1), swaps):
+            if swap:
+                genes[j], genes[j - 1] = genes[j - 1], genes[j]
+        for j in range(GENES_PER_TRAIT):
+            result[j][genes[j]] = result[j].get(genes[j], 0) + p
+    return result
+
+
+def validate(genes1, genes2, block_number, rpc_address):
+    '''
+    Compare the simulation with the mixGenes contract. The target block must be one of the last 256 blocks
+    :param genes1:
+    :param genes2:
+    :param block_number: target block
+    :param rpc_address:
+    :return: match, local offspring genes, on-chain offspring genes
+    '''
+    block_hash = rpc_client.get_web3(rpc_address).eth.get_block(block_number).hash
+    local = mix_at_block(genes1, genes2, block_number, block_hash)
+    on_chain = gene_science.mix_genes(genes1, genes2, block_number, rpc_address)
+    return local == on_chain, local, on_chain
+
+
+def validate_fixture(records):
+    '''
+    Compare the simulation with recorded mixGenes results
+    :param records: list of dict with keys genes1, genes2, blockNumber, blockHash, offspring
+    :return: list of the records that do not match
+    '''
+    mismatches = []
+    for record in records:
+        local = mix_at_block(record['genes1'], record['genes2'], record['blockNumber'], record['blockHash'])
+        if local != record['offspring']:
+            mismatches.append(record)
+    return mismatches
@@ -1,4 +1,4 @@
-from web3 import Web3
+from rpc import client as rpc_client
 
 CONTRACT_ADDRESS = '0x6b696520997d3eaee602d348f380ca1a0f1252d5'
 
@@ -15,10 +15,7 @@ ABI = '''
 
 
 def mix_genes(genes1, genes2, block_number, rpc_address):
-    w3 = Web3(Web3.HTTPProvider(rpc_address))
-
-    contract_address = Web3.toChecksumAddress(CONTRACT_ADDRESS)
-    contract = w3.eth.contract(contract_address, abi=ABI)
+    contract = rpc_client.get_contract(CONTRACT_ADDRESS, ABI, rpc_address)
     return contract.functions.mixGenes(genes1, genes2, block_number).call()
 
 
@@ -0,0 +1,36 @@
+import logging
+import random
+import sys
+import time
+import hero.utils.utils as hero_utils
+
+
+if __name__ == "__main__":
+    log_format = '%(asctime)s|%(name)s|%(levelname)s: %(message)s'
+
+    logger = logging.getLogger("DFK-genes-benchmark")
+    logger.setLevel(logging.DEBUG)
+    logging.basicConfig(level=logging.INFO, format=log_format, stream=sys.stdout)
+
+    hero_count = 50000
+    genes_list = [random.getrandbits(240) for _ in range(hero_count)]
+
+    start = time.perf_counter()
+    stat_genes = [hero_utils.parse_stat_genes(genes) for genes in genes_list]
+    visual_genes = [hero_utils.parse_visual_genes(genes) for genes in genes_list]
+    legacy = time.perf_counter() - start
+    logger.info("parse_stat_genes + parse_visual_genes:\t" + str(round(legacy * 1000000 / hero_count, 2)) + " us per hero")
+
+    start = time.perf_counter()
+    stat_table = hero_utils.parse_stat_genes_many(genes_list)
+    visual_table = hero_utils.parse_visual_genes_many(genes_list)
+    batch = time.perf_counter() - start
+    logger.info("parse_stat_genes_many + parse_visual_genes_many:\t" + str(round(batch * 1000000 / hero_count, 2)) + " us per hero")
+    logger.info("Speedup:\t" + str(round(legacy / batch, 1)) + "x")
+
+    for i in range(hero_count):
+        if {key: column[i] for key, column in stat_table.items()} != stat_genes[i]:
+            raise Exception("Stat genes mismatch for " + str(genes_list[i]))
+        if {key: column[i] for key, column in visual_table.items()} != visual_genes[i]:
+            raise Exception("Visual genes mismatch for " + str(genes_list[i]))
+    logger.info("Results are identical")
@@ -1,10 +1,9 @@
 import logging
 from web3 import Web3
 import sys
-import time
 import hero.hero as heroes
 import hero.utils.utils as hero_utils
-import genes.gene_science as genes
+import genes.gene_mixer as gene_mixer
 
 
 if __name__ == "__main__":
@@ -21,13 +20,15 @@ if __name__ == "__main__":
     hero1 = heroes.get_hero(1, rpc_server)
     hero2 = heroes.get_hero(2, rpc_server)
 
-    bnum = w3.eth.block_number
-    for i in range(100):
-        offspring_stat_genes = genes.mix_genes(hero1['info']['statGenes'], hero2['info']['statGenes'], bnum, rpc_server)
-        offspring_visual_genes = genes.mix_genes(hero1['info']['visualGenes'], hero2['info']['visualGenes'], bnum, rpc_server)
+    bnum = w3.eth.block_number - 1
+    match, local, on_chain = gene_mixer.validate(hero1['info']['statGenes'], hero2['info']['statGenes'], bnum, rpc_server)
+    logger.info("Local simulation matches mixGenes: " + str(match))
+
+    # Exact probability of each class for the offspring
+    class_distribution = gene_mixer.dominant_distribution(hero1['info']['statGenes'], hero2['info']['statGenes'])[0]
+    for gene, probability in sorted(class_distribution.items(), key=lambda item: -item[1]):
+        logger.info(str(hero_utils.parse_class(gene)) + ":\t" + str(round(100 * probability, 2)) + "%")
+
+    for i, offspring_stat_genes in enumerate(gene_mixer.sample(hero1['info']['statGenes'], hero2['info']['statGenes'], 10)):
         stats = hero_utils.parse_stat_genes(offspring_stat_genes)
-        visual = hero_utils.parse_visual_genes(offspring_visual_genes)
-        logger.info("Iteration " + str(i) + "\n\tStats:\t" + str(stats) + "\n\tVisual:\t" + str(visual))
-        while w3.eth.block_number == bnum:
-            time.sleep(2)
-        bnum = w3.eth.block_number
+        logger.info("Sample " + str(i) + "\n\tStats:\t" + str(stats))
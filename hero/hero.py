@@ -1,5 +1,9 @@
-import copy
+import types
+from collections.abc import Mapping
 from web3 import Web3
+from rpc import client as rpc_client
+from rpc import transactions
+from rpc import async_client as rpc_async
 from .utils import utils as hero_utils
 
 CONTRACT_ADDRESS = '0x5f753dcdf9b1ad9aabc1346614d1f4746fd6ce5c'
@@ -63,14 +67,11 @@ def block_explorer_link(txid):
     return 'https://explorer.harmony.one/tx/' + str(txid)
 
 
-def transfer(hero_id, owner_private_key, owner_nonce, receiver_address, gas_price_gwei, rpc_address, logger):
+def transfer(hero_id, owner_private_key, owner_nonce, receiver_address, gas_price_gwei, rpc_address, logger, wait=True):
     """Transfer a hero from the owner to the receiver. USE AT YOUR OWN RISK !"""
-    w3 = Web3(Web3.HTTPProvider(rpc_address))
-    account = w3.eth.account.privateKeyToAccount(owner_private_key)
-    w3.eth.default_account = account.address
+    account = transactions.get_account(owner_private_key)
 
-    contract_address = Web3.toChecksumAddress(CONTRACT_ADDRESS)
-    contract = w3.eth.contract(contract_address, abi=ABI)
+    contract = rpc_client.get_contract(CONTRACT_ADDRESS, ABI, rpc_address)
 
     owner = contract.functions.ownerOf(hero_id).call()
     logger.info("Hero's owner " + str(owner))
@@ -78,45 +79,66 @@ def transfer(hero_id, owner_private_key, owner_nonce, receiver_address, gas_pric
     if owner != account.address:
         raise Exception("Owner mismatch")
 
-    tx = contract.functions.transferFrom(owner, receiver_address, hero_id).buildTransaction(
-        {'gasPrice': w3.toWei(gas_price_gwei, 'gwei'), 'nonce': owner_nonce})
-    logger.debug("Signing transaction")
-    signed_tx = w3.eth.account.sign_transaction(tx, private_key=owner_private_key)
-    logger.debug("Sending transaction " + str(tx))
-    ret = w3.eth.send_raw_transaction(signed_tx.rawTransaction)
-    logger.debug("Transaction successfully sent !")
-    logger.info("Waiting for transaction " + block_explorer_link(signed_tx.hash.hex()) + " to be mined")
-    tx_receipt = w3.eth.wait_for_transaction_receipt(transaction_hash=signed_tx.hash, timeout=24 * 3600,
-                                                     poll_latency=3)
-    logger.info("Transaction mined !")
-    logger.info(str(tx_receipt))
+    function_call = contract.functions.transferFrom(owner, receiver_address, hero_id)
+    return transactions.send(function_call, owner_private_key, owner_nonce, gas_price_gwei, 24 * 3600, rpc_address, logger, wait)
 
 
 def get_owner(hero_id, rpc_address):
-    w3 = Web3(Web3.HTTPProvider(rpc_address))
-
-    contract_address = Web3.toChecksumAddress(CONTRACT_ADDRESS)
-    contract = w3.eth.contract(contract_address, abi=ABI)
+    contract = rpc_client.get_contract(CONTRACT_ADDRESS, ABI, rpc_address)
 
     return str(contract.functions.ownerOf(hero_id).call())
 
 
-def get_users_heroes(user_address, rpc_address):
-    w3 = Web3(Web3.HTTPProvider(rpc_address))
+async def get_owner_async(hero_id, rpc_address):
+    return str(await rpc_async.call(CONTRACT_ADDRESS, ABI, 'ownerOf', [hero_id], rpc_address))
 
-    contract_address = Web3.toChecksumAddress(CONTRACT_ADDRESS)
-    contract = w3.eth.contract(contract_address, abi=ABI)
+
+def get_users_heroes(user_address, rpc_address):
+    contract = rpc_client.get_contract(CONTRACT_ADDRESS, ABI, rpc_address)
 
     return contract.functions.getUserHeroes(Web3.toChecksumAddress(user_address)).call()
 
 
+async def get_users_heroes_async(user_address, rpc_address):
+    return await rpc_async.call(CONTRACT_ADDRESS, ABI, 'getUserHeroes', [Web3.toChecksumAddress(user_address)], rpc_address)
+
+
 def get_hero(hero_id, rpc_address):
-    w3 = Web3(Web3.HTTPProvider(rpc_address))
+    contract_entry = rpc_client.call(CONTRACT_ADDRESS, ABI, 'getHero', [hero_id], rpc_address)
+
+    return parse_hero(contract_entry)
+
+
+async def get_hero_async(hero_id, rpc_address):
+    contract_entry = await rpc_async.call(CONTRACT_ADDRESS, ABI, 'getHero', [hero_id], rpc_address)
+
+    return parse_hero(contract_entry)
 
-    contract_address = Web3.toChecksumAddress(CONTRACT_ADDRESS)
-    contract = w3.eth.contract(contract_address, abi=ABI)
-    contract_entry = contract.functions.getHero(hero_id).call()
 
+def get_hero_many(hero_ids, rpc_address, batch_size=rpc_client.BATCH_SIZE):
+    '''
+    Fetch many heroes at once. getHero calls are packed batch_size at a time into JSON-RPC batch requests
+    :param hero_ids:
+    :param rpc_address:
+    :param batch_size: number of heroes per HTTP request
+    :return: heroes (dict hero id -> hero, same format as get_hero), failures (dict hero id -> error message)
+    '''
+    hero_ids = list(hero_ids)
+    results = rpc_client.batch_call(CONTRACT_ADDRESS, ABI, 'getHero', [[hero_id] for hero_id in hero_ids], rpc_address,
+                                    batch_size)
+
+    heroes = {}
+    failures = {}
+    for hero_id, (contract_entry, error) in zip(hero_ids, results):
+        if error is None:
+            heroes[hero_id] = parse_hero(contract_entry)
+        else:
+            failures[hero_id] = error
+
+    return heroes, failures
+
+
+def parse_hero(contract_entry):
     hero = {}
     tuple_index = 0
 
@@ -235,27 +257,92 @@ def get_hero(hero_id, rpc_address):
 
 
 def human_readable_hero(raw_hero, hero_male_first_names=None, hero_female_first_names=None, hero_last_names=None):
-    readable_hero = copy.deepcopy(raw_hero)
-
-    readable_hero['info']['rarity'] = hero_utils.parse_rarity(readable_hero['info']['rarity'])
-    readable_hero['info']['class'] = hero_utils.parse_class(readable_hero['info']['class'])
-    readable_hero['info']['subClass'] = hero_utils.parse_class(readable_hero['info']['subClass'])
-
-    # visualGenes
-    readable_hero['info']['visualGenes'] = hero_utils.parse_visual_genes(readable_hero['info']['visualGenes'])
-
-    # statsGenes
-    readable_hero['info']['statGenes'] = hero_utils.parse_stat_genes(readable_hero['info']['statGenes'])
-
-    # names
-    if readable_hero['info']['visualGenes']['gender'] == 'male':
-        if hero_male_first_names is not None:
-            readable_hero['info']['firstName'] = hero_male_first_names[readable_hero['info']['firstName']]
-    else:
-        if hero_female_first_names is not None:
-            readable_hero['info']['firstName'] = hero_female_first_names[readable_hero['info']['firstName']]
-
-    if hero_last_names is not None:
-        readable_hero['info']['lastName'] = hero_last_names[readable_hero['info']['lastName']]
-
-    return readable_hero
+    '''
+    Human readable copy of a hero: rarity, classes, genes and names decoded (genes through the caches of
+    parse_stat_genes_cached/parse_visual_genes_cached)
+    :param raw_hero: hero returned by get_hero
+    :param hero_male_first_names:
+    :param hero_female_first_names:
+    :param hero_last_names:
+    :return: dict
+    '''
+    return readable_hero_view(raw_hero, hero_male_first_names, hero_female_first_names, hero_last_names).to_dict()
+
+
+def readable_hero_view(raw_hero, hero_male_first_names=None, hero_female_first_names=None, hero_last_names=None):
+    '''
+    Read-only view of a hero in the human_readable_hero format. The raw hero is not copied: rarity, classes, genes and
+    names are decoded when they are accessed
+    :param raw_hero: hero returned by get_hero
+    :param hero_male_first_names:
+    :param hero_female_first_names:
+    :param hero_last_names:
+    :return: ReadableHero (read-only mapping, use to_dict to get plain dicts)
+    '''
+    return ReadableHero(raw_hero, hero_male_first_names, hero_female_first_names, hero_last_names)
+
+
+class ReadableHero(Mapping):
+    __slots__ = ('raw', 'info')
+
+    def __init__(self, raw_hero, hero_male_first_names=None, hero_female_first_names=None, hero_last_names=None):
+        self.raw = raw_hero
+        self.info = ReadableHeroInfo(raw_hero['info'], hero_male_first_names, hero_female_first_names, hero_last_names)
+
+    def __getitem__(self, key):
+        if key == 'info':
+            return self.info
+        value = self.raw[key]
+        return types.MappingProxyType(value) if isinstance(value, dict) else value
+
+    def __iter__(self):
+        return iter(self.raw)
+
+    def __len__(self):
+        return len(self.raw)
+
+    def to_dict(self):
+        '''
+        :return: the readable hero as plain dicts (e.g. for json.dumps)
+        '''
+        return {key: self.info.to_dict() if key == 'info' else dict(value) if isinstance(value, dict) else value
+                for key, value in self.raw.items()}
+
+
+class ReadableHeroInfo(Mapping):
+    __slots__ = ('raw', 'male_first_names', 'female_first_names', 'last_names')
+
+    def __init__(self, raw_info, hero_male_first_names=None, hero_female_first_names=None, hero_last_names=None):
+        self.raw = raw_info
+        self.male_first_names = hero_male_first_names
+        self.female_first_names = hero_female_first_names
+        self.last_names = hero_last_names
+
+    def __getitem__(self, key):
+        value = self.raw[key]
+        if key == 'rarity':
+            return hero_utils.parse_rarity(value)
+        if key == 'class' or key == 'subClass':
+            return hero_utils.parse_class(value)
+        if key == 'statGenes':
+            return hero_utils.parse_stat_genes_cached(value)
+        if key == 'visualGenes':
+            return hero_utils.parse_visual_genes_cached(value)
+        if key == 'firstName':
+            if self['visualGenes']['gender'] == 'male':
+                names = self.male_first_names
+            else:
+                names = self.female_first_names
+            return value if names is None else names[value]
+        if key == 'lastName':
+            return value if self.last_names is None else self.last_names[value]
+        return value
+
+    def __iter__(self):
+        return iter(self.raw)
+
+    def __len__(self):
+        return len(self.raw)
+
+    def to_dict(self):
+        return {key: dict(value) if isinstance(value, Mapping) else value for key, value in self.items()}
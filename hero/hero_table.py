@@ -0,0 +1,198 @@
+"""
+Compact in-memory representations of heroes, for holding a large number of them (e.g. a market scanner).
+- HeroRecord keeps the tuples returned by getHero as they are (no nested dict)
+- HeroTable stores heroes column by column in fixed-width arrays
+Both convert to the get_hero dict format or to the human_readable_hero format on demand.
+"""
+
+from array import array
+from rpc import client as rpc_client
+from .hero import parse_hero, human_readable_hero
+
+GENES = 'genes'
+ADDRESS = 'address'
+
+GENES_WIDTH = 32
+ADDRESS_WIDTH = 20
+
+# Sections and fields of a hero in the order of getHero, with their storage type (array typecode, GENES or ADDRESS)
+SCHEMA = [
+    ('summoningInfo', [('summonedTime', 'Q'), ('nextSummonTime', 'Q'), ('summonerId', 'Q'), ('assistantId', 'Q'),
+                       ('summons', 'I'), ('maxSummons', 'I')]),
+    ('info', [('statGenes', GENES), ('visualGenes', GENES), ('rarity', 'B'), ('shiny', 'B'), ('generation', 'H'),
+              ('firstName', 'I'), ('lastName', 'I'), ('shinyStyle', 'B'), ('class', 'B'), ('subClass', 'B')]),
+    ('state', [('staminaFullAt', 'Q'), ('hpFullAt', 'Q'), ('mpFullAt', 'Q'), ('level', 'H'), ('xp', 'Q'),
+               ('currentQuest', ADDRESS), ('sp', 'B'), ('status', 'B')]),
+    ('stats', [('strength', 'H'), ('intelligence', 'H'), ('wisdom', 'H'), ('luck', 'H'), ('agility', 'H'),
+               ('vitality', 'H'), ('endurance', 'H'), ('dexterity', 'H'), ('hp', 'H'), ('mp', 'H'), ('stamina', 'H')]),
+    ('primaryStatGrowth', [('strength', 'H'), ('intelligence', 'H'), ('wisdom', 'H'), ('luck', 'H'), ('agility', 'H'),
+                           ('vitality', 'H'), ('endurance', 'H'), ('dexterity', 'H'), ('hpSm', 'H'), ('hpRg', 'H'),
+                           ('hpLg', 'H'), ('mpSm', 'H'), ('mpRg', 'H'), ('mpLg', 'H')]),
+    ('secondaryStatGrowth', [('strength', 'H'), ('intelligence', 'H'), ('wisdom', 'H'), ('luck', 'H'), ('agility', 'H'),
+                             ('vitality', 'H'), ('endurance', 'H'), ('dexterity', 'H'), ('hpSm', 'H'), ('hpRg', 'H'),
+                             ('hpLg', 'H'), ('mpSm', 'H'), ('mpRg', 'H'), ('mpLg', 'H')]),
+    ('professions', [('mining', 'H'), ('gardening', 'H'), ('foraging', 'H'), ('fishing', 'H')]),
+]
+
+SECTIONS = [section for section, _ in SCHEMA]
+
+# (section, field) -> (section index, field index)
+FIELD_INDEX = {(section, field): (s, f) for s, (section, fields) in enumerate(SCHEMA) for f, (field, _) in enumerate(fields)}
+
+
+class HeroRecord:
+    __slots__ = ('id', 'sections')
+
+    def __init__(self, contract_entry):
+        '''
+        :param contract_entry: value returned by the getHero call
+        '''
+        self.id = contract_entry[0]
+        self.sections = tuple(contract_entry[1:])
+
+    @staticmethod
+    def from_hero(hero):
+        '''
+        Build a record from the get_hero dict format
+        :param hero:
+        :return:
+        '''
+        return HeroRecord([hero['id']] + [tuple(hero[section].values()) for section in SECTIONS])
+
+    def get(self, section, field):
+        s, f = FIELD_INDEX[(section, field)]
+        return self.sections[s][f]
+
+    def to_dict(self):
+        '''
+        :return: the hero in the get_hero dict format
+        '''
+        return parse_hero((self.id,) + self.sections)
+
+    def readable(self, hero_male_first_names=None, hero_female_first_names=None, hero_last_names=None):
+        '''
+        :return: the hero in the human_readable_hero format
+        '''
+        return human_readable_hero(self.to_dict(), hero_male_first_names, hero_female_first_names, hero_last_names)
+
+
+class HeroTable:
+    def __init__(self):
+        self.ids = array('Q')
+        self.columns = []
+        for section, fields in SCHEMA:
+            self.columns.append([bytearray() if kind in (GENES, ADDRESS) else array(kind) for _, kind in fields])
+        # Storage types of the sections having genes or address fields, None for the all-numeric ones
+        self.kinds = [[kind for _, kind in fields] if any(kind in (GENES, ADDRESS) for _, kind in fields) else None
+                      for _, fields in SCHEMA]
+        self.row_by_id = {}
+
+    def __len__(self):
+        return len(self.ids)
+
+    def append(self, contract_entry):
+        '''
+        Add a hero. A hero already in the table is overwritten in its row
+        :param contract_entry: value returned by the getHero call
+        :return: row of the hero
+        '''
+        row = self.row_by_id.get(contract_entry[0])
+        if row is not None:
+            self.__overwrite(row, contract_entry)
+            return row
+        row = len(self.ids)
+        for columns, kinds, values in zip(self.columns, self.kinds, contract_entry[1:]):
+            if kinds is None:
+                for column, value in zip(columns, values):
+                    column.append(value)
+                continue
+            for column, kind, value in zip(columns, kinds, values):
+                if kind == GENES:
+                    column += value.to_bytes(GENES_WIDTH, 'big')
+                elif kind == ADDRESS:
+                    column += bytes.fromhex(value[2:])
+                else:
+                    column.append(value)
+        self.ids.append(contract_entry[0])
+        self.row_by_id[contract_entry[0]] = row
+        return row
+
+    def __overwrite(self, row, contract_entry):
+        for columns, kinds, values in zip(self.columns, self.kinds, contract_entry[1:]):
+            if kinds is None:
+                for column, value in zip(columns, values):
+                    column[row] = value
+                continue
+            for column, kind, value in zip(columns, kinds, values):
+                if kind == GENES:
+                    column[row * GENES_WIDTH:(row + 1) * GENES_WIDTH] = value.to_bytes(GENES_WIDTH, 'big')
+                elif kind == ADDRESS:
+                    column[row * ADDRESS_WIDTH:(row + 1) * ADDRESS_WIDTH] = bytes.fromhex(value[2:])
+                else:
+                    column[row] = value
+
+    def append_hero(self, hero):
+        '''
+        Add a hero in the get_hero dict format
+        :param hero:
+        :return: row of the hero
+        '''
+        return self.append([hero['id']] + [tuple(hero[section].values()) for section in SECTIONS])
+
+    def extend(self, contract_entries):
+        for contract_entry in contract_entries:
+            self.append(contract_entry)
+
+    def row(self, hero_id):
+        return self.row_by_id[hero_id]
+
+    def get(self, row, section, field):
+        s, f = FIELD_INDEX[(section, field)]
+        return self.__value(row, s, f)
+
+    def column(self, section, field):
+        '''
+        Raw column of a field: an array for numeric fields, a bytearray of fixed-width values for genes and addresses
+        '''
+        s, f = FIELD_INDEX[(section, field)]
+        return self.columns[s][f]
+
+    def values(self, section, field):
+        '''
+        Values of a field for every hero, in row order
+        '''
+        s, f = FIELD_INDEX[(section, field)]
+        return [self.__value(row, s, f) for row in range(len(self.ids))]
+
+    def entry(self, row):
+        '''
+        :return: the hero at row in the getHero format
+        '''
+        return (self.ids[row],) + tuple(tuple(self.__value(row, s, f) for f in range(len(fields)))
+                                        for s, (_, fields) in enumerate(SCHEMA))
+
+    def record(self, row):
+        return HeroRecord(self.entry(row))
+
+    def to_dict(self, row):
+        '''
+        :return: the hero at row in the get_hero dict format
+        '''
+        return parse_hero(self.entry(row))
+
+    def readable(self, row, hero_male_first_names=None, hero_female_first_names=None, hero_last_names=None):
+        '''
+        :return: the hero at row in the human_readable_hero format
+        '''
+        return human_readable_hero(self.to_dict(row), hero_male_first_names, hero_female_first_names, hero_last_names)
+
+    def __value(self, row, s, f):
+        kind = SCHEMA[s][1][f][1]
+        column = self.columns[s][f]
+        if kind == GENES:
+            return int.from_bytes(column[row * GENES_WIDTH:(row + 1) * GENES_WIDTH], 'big')
+        if kind == ADDRESS:
+            return rpc_client.checksum_address('0x' + column[row * ADDRESS_WIDTH:(row + 1) * ADDRESS_WIDTH].hex())
+        if (s, f) == FIELD_INDEX[('info', 'shiny')]:
+            return bool(column[row])
+        return column[row]
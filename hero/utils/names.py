@@ -0,0 +1,127 @@
+"""
+Hero name tables (hero/femaleFirstName.json, hero/maleFirstName.json, hero/lastName.json).
+The source files are JSON arrays with Python-style \\xNN escapes. They are decoded once and cached in a binary file
+keyed by the hash of the source file. The binary file is memory-mapped, so loading is near-instant and the pages are
+shared by all the processes that load the same table.
+
+Binary format (native byte order): header (magic, version, count), count + 1 uint32 offsets, UTF-8 names
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import re
+import struct
+from collections.abc import Sequence
+
+NAMES_DIRECTORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CACHE_DIRECTORY = os.path.join(os.path.expanduser('~'), '.cache', 'dfk', 'names')
+
+FEMALE_FIRST_NAMES = 'femaleFirstName.json'
+MALE_FIRST_NAMES = 'maleFirstName.json'
+LAST_NAMES = 'lastName.json'
+
+MAGIC = b'DFKN'
+VERSION = 1
+HEADER = struct.Struct('=4sII')
+OFFSET = struct.Struct('=I')
+
+# A backslash is either escaped (kept for json) or starts a \xNN escape (rewritten as the JSON \u00NN escape)
+__ESCAPE = re.compile(r'\\(\\|x([0-9a-fA-F]{2}))')
+
+
+def decode_names(names_raw_string):
+    '''
+    Decode a name table in one pass over the string
+    :param names_raw_string: content of a name file
+    :return: list of names
+    '''
+    return json.loads(__ESCAPE.sub(__escape, names_raw_string))
+
+
+def __escape(match):
+    if match.group(2) is None:
+        return match.group(0)
+    return '\\u00' + match.group(2)
+
+
+class NameTable(Sequence):
+    '''
+    Read-only list of names backed by a buffer in the binary format (usually a memory-mapped cache file)
+    '''
+
+    def __init__(self, buffer):
+        magic, version, count = HEADER.unpack_from(buffer, 0)
+        if magic != MAGIC or version != VERSION:
+            raise Exception("Invalid name table")
+        self.buffer = buffer
+        self.count = count
+        self.offsets = memoryview(buffer)[HEADER.size:HEADER.size + OFFSET.size * (count + 1)].cast('I')
+        self.data_start = HEADER.size + OFFSET.size * (count + 1)
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self.count))]
+        if index < 0:
+            index = index + self.count
+        if index < 0 or index >= self.count:
+            raise IndexError("Name index out of range")
+        start = self.data_start + self.offsets[index]
+        end = self.data_start + self.offsets[index + 1]
+        return bytes(self.buffer[start:end]).decode('utf-8')
+
+
+def encode_table(names):
+    '''
+    :param names: list of names
+    :return: the names in the binary format
+    '''
+    data = [name.encode('utf-8') for name in names]
+    offsets = [0]
+    for name in data:
+        offsets.append(offsets[-1] + len(name))
+    return HEADER.pack(MAGIC, VERSION, len(names)) + struct.pack('=' + str(len(offsets)) + 'I', *offsets) + b''.join(data)
+
+
+def load_names(path, cache_directory=CACHE_DIRECTORY):
+    '''
+    Load a name table, from the binary cache when it matches the source file
+    :param path: name file (JSON with \\xNN escapes)
+    :param cache_directory: directory of the binary caches, None to disable the cache
+    :return: NameTable
+    '''
+    with open(path, 'rb') as f:
+        source = f.read()
+
+    if cache_directory is None:
+        return NameTable(encode_table(decode_names(source.decode('utf-8'))))
+
+    digest = hashlib.sha256(source).hexdigest()[:32]
+    cache_path = os.path.join(cache_directory, os.path.splitext(os.path.basename(path))[0] + '-' + digest + '.bin')
+
+    if not os.path.exists(cache_path):
+        os.makedirs(cache_directory, exist_ok=True)
+        # Write then rename so that concurrent workers never map a partial file
+        tmp_path = cache_path + '.' + str(os.getpid()) + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(encode_table(decode_names(source.decode('utf-8'))))
+        os.replace(tmp_path, cache_path)
+
+    with open(cache_path, 'rb') as f:
+        return NameTable(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+
+
+def load_hero_names(directory=NAMES_DIRECTORY, cache_directory=CACHE_DIRECTORY):
+    '''
+    Load the 3 hero name tables
+    :param directory: directory of the name files
+    :param cache_directory:
+    :return: male first names, female first names, last names (in the order of human_readable_hero parameters)
+    '''
+    return load_names(os.path.join(directory, MALE_FIRST_NAMES), cache_directory), \
+        load_names(os.path.join(directory, FEMALE_FIRST_NAMES), cache_directory), \
+        load_names(os.path.join(directory, LAST_NAMES), cache_directory)
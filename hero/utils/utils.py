@@ -1,8 +1,13 @@
 
-import json
+import types
+from functools import lru_cache
+from .names import decode_names
 
 FAIL_ON_NOT_FOUND = False
 
+# Number of decoded genes kept by parse_stat_genes_cached and parse_visual_genes_cached (each)
+GENES_CACHE_SIZE = 65536
+
 ALPHABET = '123456789abcdefghijkmnopqrstuvwx'
 
 rarity = {
@@ -169,6 +174,75 @@ def parse_visual_genes(genes):
     return visual_genes
 
 
+def parse_stat_genes_many(genes_list):
+    '''
+    Decode many stat genes at once. Equivalent to calling parse_stat_genes on each genes but the traits are extracted
+    with shifts and masks, one trait at a time over the whole list
+    :param genes_list: list of stat genes
+    :return: columnar table: dict key of parse_stat_genes -> list of values (in the order of genes_list)
+    '''
+    table = __decode_dominant_genes(genes_list, stat_traits)
+
+    table['class'] = [parse_class(v) for v in table['class']]
+    table['subClass'] = [parse_class(v) for v in table['subClass']]
+
+    table['profession'] = [parse_profession(v) for v in table['profession']]
+
+    table['statBoost1'] = [parse_stat(v) for v in table['statBoost1']]
+    table['statBoost2'] = [parse_stat(v) for v in table['statBoost2']]
+    table['statsUnknown1'] = [stats.get(v, None) for v in table['statsUnknown1']]
+    table['statsUnknown2'] = [stats.get(v, None) for v in table['statsUnknown2']]
+
+    table['element'] = [parse_element(v) for v in table['element']]
+
+    return table
+
+
+def parse_visual_genes_many(genes_list):
+    '''
+    Decode many visual genes at once. Equivalent to calling parse_visual_genes on each genes
+    :param genes_list: list of visual genes
+    :return: columnar table: dict key of parse_visual_genes -> list of values (in the order of genes_list)
+    '''
+    table = __decode_dominant_genes(genes_list, visual_traits)
+
+    table['gender'] = ['male' if v == 1 else 'female' for v in table['gender']]
+    return table
+
+
+@lru_cache(maxsize=GENES_CACHE_SIZE)
+def parse_stat_genes_cached(genes):
+    '''
+    Memoized equivalent of parse_stat_genes. The result is shared by every caller with the same genes, so it is read-only
+    :param genes: stat genes
+    :return: read-only mapping with the keys of parse_stat_genes
+    '''
+    table = parse_stat_genes_many([genes])
+    return types.MappingProxyType({key: column[0] for key, column in table.items()})
+
+
+@lru_cache(maxsize=GENES_CACHE_SIZE)
+def parse_visual_genes_cached(genes):
+    '''
+    Memoized equivalent of parse_visual_genes. The result is shared by every caller with the same genes, so it is read-only
+    :param genes: visual genes
+    :return: read-only mapping with the keys of parse_visual_genes
+    '''
+    table = parse_visual_genes_many([genes])
+    return types.MappingProxyType({key: column[0] for key, column in table.items()})
+
+
+def __decode_dominant_genes(genes_list, traits):
+    # Genes are 48 kai (5 bits each), 4 per trait, most significant first. The last kai of a trait is the dominant
+    # gene, which is the one kept by parse_stat_genes/parse_visual_genes.
+    genes_list = list(genes_list)
+    table = {'raw': genes_list}
+    for trait_index in range(len(traits)):
+        shift = 5 * (44 - 4 * trait_index)
+        table[traits[trait_index]] = [(genes >> shift) & 0x1f for genes in genes_list]
+    return table
+
+
 def __genesToKai(genes):
     BASE = len(ALPHABET)
 
@@ -192,17 +266,9 @@ def __kai2dec(kai):
 
 
 def parse_names(names_raw_string):
-    names_raw_string = names_raw_string\
-        .replace("\\xf3", "ó") \
-        .replace("\\xf2", "ò") \
-        .replace("\\xe9", "é") \
-        .replace("\\xe1", "á") \
-        .replace("\\xc9", "É") \
-        .replace("\\xed", "í") \
-        .replace("\\xfa", "ú") \
-        .replace("\\xec", "ì")
-
-    if "\\x" in names_raw_string:
-        raise Exception("Unhandled unicode found")
-
-    return json.loads(names_raw_string)
+    '''
+    Decode a name table (every \\xNN escape is handled). See names.load_names to load a name file through the binary cache
+    :param names_raw_string: content of a name file
+    :return: list of names
+    '''
+    return decode_names(names_raw_string)
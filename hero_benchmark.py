@@ -0,0 +1,86 @@
+import gc
+import logging
+import random
+import sys
+import time
+import tracemalloc
+from hero.hero import parse_hero
+from hero.hero_table import HeroRecord, HeroTable
+
+ZERO_ADDRESS = '0x0000000000000000000000000000000000000000'
+
+
+def random_entry(hero_id):
+    return (hero_id,
+            (random.getrandbits(31), random.getrandbits(31), random.getrandbits(20), random.getrandbits(20),
+             random.randint(0, 10), random.randint(0, 10)),
+            (random.getrandbits(240), random.getrandbits(240), random.randint(0, 4), random.random() < 0.01,
+             random.randint(0, 10), random.getrandbits(11), random.getrandbits(11), random.randint(0, 3),
+             random.randint(0, 27), random.randint(0, 27)),
+            (random.getrandbits(31), random.getrandbits(31), random.getrandbits(31), random.randint(1, 20),
+             random.getrandbits(12), ZERO_ADDRESS, random.randint(0, 5), 0),
+            tuple(random.randint(5, 300) for _ in range(11)),
+            tuple(random.randint(0, 9000) for _ in range(14)),
+            tuple(random.randint(0, 9000) for _ in range(14)),
+            tuple(random.randint(0, 2000) for _ in range(4)))
+
+
+def measure_memory(build):
+    gc.collect()
+    tracemalloc.start()
+    heroes = build()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return heroes, size
+
+
+def measure_time(build):
+    gc.collect()
+    start = time.perf_counter()
+    build()
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    log_format = '%(asctime)s|%(name)s|%(levelname)s: %(message)s'
+
+    logger = logging.getLogger("DFK-hero-benchmark")
+    logger.setLevel(logging.DEBUG)
+    logging.basicConfig(level=logging.INFO, format=log_format, stream=sys.stdout)
+
+    hero_count = 100000
+    seed = random.getrandbits(32)
+
+    def generate():
+        random.seed(seed)
+        return (random_entry(hero_id) for hero_id in range(1, hero_count + 1))
+
+    def build_table(entries):
+        table = HeroTable()
+        table.extend(entries)
+        return table
+
+    builds = [("parse_hero (dict)", lambda entries: [parse_hero(entry) for entry in entries]),
+              ("HeroRecord", lambda entries: [HeroRecord(entry) for entry in entries]),
+              ("HeroTable", build_table)]
+
+    # Retained memory: entries are generated while tracing so that each representation is charged for what it keeps
+    results = {}
+    for name, build in builds:
+        heroes, size = measure_memory(lambda: build(generate()))
+        results[name] = heroes
+        logger.info(name + ":\t" + str(round(size / hero_count)) + " bytes per hero")
+
+    # Construction time from already decoded entries
+    entries = list(generate())
+    for name, build in builds:
+        duration = measure_time(lambda: build(entries))
+        logger.info(name + ":\t" + str(round(duration * 1000000 / hero_count, 2)) + " us per hero")
+
+    dicts = results["parse_hero (dict)"]
+    records = results["HeroRecord"]
+    table = results["HeroTable"]
+    for i in range(0, hero_count, 97):
+        if records[i].to_dict() != dicts[i] or table.to_dict(i) != dicts[i]:
+            raise Exception("Hero mismatch for " + str(dicts[i]['id']))
+    logger.info("Conversions to the legacy dict are identical")
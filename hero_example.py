@@ -1,7 +1,7 @@
 import logging
 import json
 import sys
-import hero.utils.utils as hero_utils
+import hero.utils.names as hero_names
 import hero.hero as heroes
 
 
@@ -15,23 +15,18 @@ if __name__ == "__main__":
     rpc_server = 'https://api.harmony.one'
     logger.info("Using RPC server " + rpc_server)
 
-    with open('hero/femaleFirstName.json', 'r') as f:
-        female_first_names = hero_utils.parse_names(f.read())
-    logger.info("Female hero first name loaded")
-
-    with open('hero/maleFirstName.json', 'r') as f:
-        male_first_names = hero_utils.parse_names(f.read())
-    logger.info("Male hero first name loaded")
-
-    with open('hero/lastName.json', 'r') as f:
-        last_names = hero_utils.parse_names(f.read())
-    logger.info("Hero last name loaded")
+    male_first_names, female_first_names, last_names = hero_names.load_hero_names()
+    logger.info("Hero names loaded")
 
     # transfer(1, 'private key of the owner', 'next nonce of owner account', 'receiver address', 200, rpc_server, hero_abi_json, logger)
 
-    for i in range(1, 100):
+    hero_ids = range(1, 100)
+    raw_heroes, failures = heroes.get_hero_many(hero_ids, rpc_server)
+    for i in hero_ids:
         logger.info("Processing hero #"+str(i))
+        if i in failures:
+            logger.info("Failed to fetch hero #" + str(i) + ": " + failures[i])
+            continue
         owner = heroes.get_owner(i, rpc_server)
-        hero = heroes.get_hero(i, rpc_server)
-        readable_hero = heroes.human_readable_hero(hero, male_first_names, female_first_names, last_names)
+        readable_hero = heroes.human_readable_hero(raw_heroes[i], male_first_names, female_first_names, last_names)
         logger.info(json.dumps(readable_hero, indent=4, sort_keys=False) + "\n Owned by " + owner)
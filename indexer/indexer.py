@@ -0,0 +1,331 @@
+"""
+Historical event indexer writing contract events into a local SQLite database.
+Logs are read with eth_getLogs over block ranges that adapt to the node (halved on error or when a range returns too
+many logs, doubled when it returns few), decoded with rpc.events and written one range per database transaction,
+together with the last indexed block of the source. An interrupted run resumes from that block.
+
+Every event has its own table named after it, with the log position (blockNumber, logIndex, transactionHash, address)
+and one column per argument; indexed arguments are indexed in the database too. Integers that may not fit in 64 bits
+(e.g. uint256) are stored as zero-padded text, so that they compare and sort as numbers (see encode_uint).
+
+    db = indexer.Indexer('dfk.sqlite', rpc_server, indexer.default_sources(rpc_server), logger)
+    db.run(from_block=indexer.START_BLOCK)
+    sales = db.query('AuctionSuccessful', {'tokenId': hero_id})
+"""
+
+import sqlite3
+import threading
+import time
+from web3 import Web3
+from rpc import abi as rpc_abi
+from rpc import client as rpc_client
+from rpc import events as rpc_events
+
+BLOCK_RANGE = 1024
+MIN_BLOCK_RANGE = 1
+# A range returning more logs than this is split
+TARGET_LOGS_PER_RANGE = 5000
+# Blocks behind the head not indexed yet
+CONFIRMATIONS = 5
+RETRIES = 5
+RETRY_DELAY_SECONDS = 2
+START_BLOCK = 0
+UINT_DIGITS = 78
+
+LOG_COLUMNS = [('blockNumber', 'INTEGER'), ('logIndex', 'INTEGER'), ('transactionHash', 'TEXT'), ('address', 'TEXT')]
+ORDER_DIRECTIONS = ('ASC', 'DESC')
+
+
+def encode_uint(value):
+    '''
+    :return: integer as zero-padded text, ordered like the integer
+    '''
+    return str(value).zfill(UINT_DIGITS)
+
+
+def column_type(type_str):
+    '''
+    :param type_str: ABI type
+    :return: SQLite type of the column storing a value of this type
+    '''
+    if type_str.endswith(']') or type_str.startswith('('):
+        return 'TEXT'
+    if type_str.startswith('uint') and type_str[4:].isdigit() and int(type_str[4:]) < 64:
+        return 'INTEGER'
+    if type_str.startswith('int') and type_str[3:].isdigit() and int(type_str[3:]) <= 64:
+        return 'INTEGER'
+    if type_str == 'bool':
+        return 'INTEGER'
+    if type_str.startswith('bytes') and not type_str.endswith(']'):
+        return 'BLOB'
+    return 'TEXT'
+
+
+def encode_value(value, type_str):
+    '''
+    :return: value as stored in a column of type column_type(type_str)
+    '''
+    if value is None:
+        return None
+    if type_str.endswith(']') or type_str.startswith('('):
+        return str(value)
+    if type_str == 'address':
+        return rpc_client.checksum_address(value)
+    sql_type = column_type(type_str)
+    if sql_type == 'INTEGER':
+        return int(value)
+    if sql_type == 'BLOB':
+        return bytes(value)
+    if type_str.startswith('uint'):
+        return encode_uint(value)
+    return str(value)
+
+
+def decode_value(value, type_str):
+    '''
+    :return: value of a column, as decoded from the log
+    '''
+    if value is None or type_str.endswith(']') or type_str.startswith('('):
+        return value
+    if type_str.startswith('uint') or type_str.startswith('int'):
+        return int(value)
+    if type_str == 'bool':
+        return value != 0
+    return value
+
+
+class EventSource:
+    def __init__(self, name, abi, event_names, addresses=None):
+        '''
+        :param name: source name, key of its progress in the database
+        :param abi: ABI as a JSON string
+        :param event_names: events of the ABI to index
+        :param addresses: contract addresses emitting the events, None for any contract
+        '''
+        self.name = name
+        self.decoders = {}
+        for entry in rpc_abi.parse(abi):
+            if entry.get('type') == 'event' and entry['name'] in event_names:
+                decoder = rpc_events.EventDecoder(entry)
+                self.decoders[(decoder.topic, decoder.topic_count)] = (decoder, entry)
+        missing = set(event_names) - set(decoder.name for decoder, _ in self.decoders.values())
+        if len(missing) > 0:
+            raise Exception("Events not in ABI: " + str(sorted(missing)))
+        self.addresses = None if addresses is None else [rpc_client.checksum_address(a) for a in addresses]
+
+    def log_filter(self, from_block, to_block):
+        log_filter = {'fromBlock': from_block, 'toBlock': to_block,
+                      'topics': [sorted(set('0x' + topic.hex() for topic, _ in self.decoders.keys()))]}
+        if self.addresses is not None:
+            log_filter['address'] = self.addresses
+        return log_filter
+
+
+def default_sources(rpc_address, pair_addresses=None):
+    '''
+    Sources of hero summons, sale auctions, liquidity pair swaps, crystal openings and garden deposits/withdrawals
+    :param rpc_address:
+    :param pair_addresses: liquidity pairs whose swaps are indexed, None for all the pairs of the factory
+    :return: list of EventSource
+    '''
+    from hero import hero
+    from auctions.sale import sale_auctions
+    from dex import uniswap_v2_factory, uniswap_v2_pair, master_gardener
+    from summoning import crystals
+
+    if pair_addresses is None:
+        pair_addresses = uniswap_v2_factory.all_pairs_many(rpc_address)
+
+    return [
+        EventSource('hero', hero.ABI, ['HeroSummoned'], [hero.CONTRACT_ADDRESS]),
+        EventSource('saleAuctions', sale_auctions.ABI, ['AuctionCreated', 'AuctionSuccessful', 'AuctionCancelled'],
+                    [sale_auctions.SALE_AUCTIONS_CONTRACT_ADDRESS]),
+        EventSource('pairs', uniswap_v2_pair.ABI, ['Swap', 'Sync'], pair_addresses),
+        EventSource('crystals', crystals.ABI, ['CrystalOpen'], [crystals.CONTRACT_ADDRESS]),
+        EventSource('gardens', master_gardener.ABI, ['Deposit', 'Withdraw'], [master_gardener.CONTRACT_ADDRESS]),
+    ]
+
+
+class Indexer:
+    def __init__(self, database_path, rpc_address, sources, logger, block_range=BLOCK_RANGE):
+        '''
+        :param database_path: SQLite file (created if needed)
+        :param rpc_address:
+        :param sources: list of EventSource
+        :param logger:
+        :param block_range: largest number of blocks per eth_getLogs call
+        '''
+        self.rpc_address = rpc_address
+        self.sources = sources
+        self.logger = logger
+        self.max_block_range = block_range
+        self._lock = threading.Lock()
+        self.connection = sqlite3.connect(database_path, check_same_thread=False)
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        # event name -> list of (column, ABI type)
+        self.columns = {}
+        self.create_tables()
+
+    def close(self):
+        self.connection.close()
+
+    def create_tables(self):
+        with self._lock, self.connection:
+            self.connection.execute('CREATE TABLE IF NOT EXISTS sources (name TEXT PRIMARY KEY, lastBlock INTEGER)')
+            for source in self.sources:
+                for decoder, entry in source.decoders.values():
+                    table = decoder.name
+                    columns = [(i['name'], decoder.types[k]) for k, i in enumerate(entry['inputs'])]
+                    if table in self.columns:
+                        continue
+                    self.columns[table] = columns
+                    definitions = [c + ' ' + t for c, t in LOG_COLUMNS] + \
+                                  ['"' + c + '" ' + column_type(t) for c, t in columns]
+                    self.connection.execute('CREATE TABLE IF NOT EXISTS "' + table + '" (' + ', '.join(definitions) +
+                                            ', PRIMARY KEY (blockNumber, logIndex))')
+                    self.connection.execute('CREATE INDEX IF NOT EXISTS "' + table + '_address" ON "' + table +
+                                            '" (address, blockNumber)')
+                    for i in entry['inputs']:
+                        if i.get('indexed', False):
+                            self.connection.execute('CREATE INDEX IF NOT EXISTS "' + table + '_' + i['name'] + '" ON "' +
+                                                    table + '" ("' + i['name'] + '", blockNumber)')
+
+    def last_block(self, source_name):
+        '''
+        :return: last block indexed for the source, None if it was never indexed
+        '''
+        with self._lock:
+            row = self.connection.execute('SELECT lastBlock FROM sources WHERE name = ?', (source_name,)).fetchone()
+        return None if row is None else row[0]
+
+    def get_logs(self, source, from_block, to_block):
+        return rpc_client.get_web3(self.rpc_address).eth.get_logs(source.log_filter(from_block, to_block))
+
+    def store(self, source, logs, to_block):
+        '''
+        Decode logs and write them with the new progress of the source, in one database transaction
+        :return: number of events stored
+        '''
+        rows = {}
+        for log in logs:
+            topics = log['topics']
+            if len(topics) == 0 or log.get('removed', False):
+                continue
+            decoder_entry = source.decoders.get((bytes(topics[0]), len(topics)))
+            if decoder_entry is None:
+                continue
+            decoder = decoder_entry[0]
+            event = decoder.decode(log)
+            columns = self.columns[decoder.name]
+            rows.setdefault(decoder.name, []).append(
+                [event['blockNumber'], event['logIndex'], Web3.toHex(event['transactionHash']),
+                 rpc_client.checksum_address(event['address'])] +
+                [encode_value(event['args'][c], t) for c, t in columns])
+
+        with self._lock, self.connection:
+            for table, table_rows in rows.items():
+                placeholders = ', '.join(['?'] * len(table_rows[0]))
+                self.connection.executemany('INSERT OR REPLACE INTO "' + table + '" VALUES (' + placeholders + ')',
+                                            table_rows)
+            self.connection.execute('INSERT OR REPLACE INTO sources (name, lastBlock) VALUES (?, ?)',
+                                    (source.name, to_block))
+        return sum(len(table_rows) for table_rows in rows.values())
+
+    def index_source(self, source, from_block, to_block):
+        '''
+        Index the events of a source between two blocks (included), in adaptive block ranges
+        :return: number of events stored
+        '''
+        block_range = self.max_block_range
+        failures = 0
+        count = 0
+        block = from_block
+        while block <= to_block:
+            end = min(block + block_range - 1, to_block)
+            try:
+                logs = self.get_logs(source, block, end)
+            except Exception as e:
+                self.logger.debug("eth_getLogs failed on blocks " + str(block) + "-" + str(end) + ": " + str(e))
+                if block_range > MIN_BLOCK_RANGE:
+                    block_range = max(MIN_BLOCK_RANGE, block_range // 2)
+                else:
+                    failures = failures + 1
+                    if failures > RETRIES:
+                        raise
+                    time.sleep(RETRY_DELAY_SECONDS * failures)
+                continue
+            failures = 0
+            if len(logs) > TARGET_LOGS_PER_RANGE and block_range > MIN_BLOCK_RANGE:
+                block_range = max(MIN_BLOCK_RANGE, block_range // 2)
+                continue
+
+            count = count + self.store(source, logs, end)
+            block = end + 1
+            if len(logs) < TARGET_LOGS_PER_RANGE // 4:
+                block_range = min(self.max_block_range, block_range * 2)
+        return count
+
+    def run(self, from_block=START_BLOCK, to_block=None, confirmations=CONFIRMATIONS):
+        '''
+        Index every source from its last indexed block (or from_block the first time) to to_block
+        :param from_block: first block of sources never indexed
+        :param to_block: None for the current block minus confirmations
+        :param confirmations:
+        :return: dict source name -> number of events stored
+        '''
+        if to_block is None:
+            to_block = rpc_client.get_web3(self.rpc_address).eth.block_number - confirmations
+        counts = {}
+        for source in self.sources:
+            last_block = self.last_block(source.name)
+            start = from_block if last_block is None else last_block + 1
+            counts[source.name] = self.index_source(source, start, to_block) if start <= to_block else 0
+            self.logger.info("Indexed " + str(counts[source.name]) + " events of " + source.name + " up to block " +
+                             str(to_block))
+        return counts
+
+    def query(self, event, where=None, order_by='blockNumber, logIndex', limit=None):
+        '''
+        :param event: event name
+        :param where: dict column -> value (equality), None for all events
+        :param order_by: comma-separated columns, each optionally followed by ASC or DESC
+        :param limit:
+        :return: list of events as dicts (log position and arguments), values decoded
+        '''
+        columns = self.columns[event]
+        types = dict([(c, t) for c, t in LOG_COLUMNS] + columns)
+        sql = 'SELECT * FROM "' + event + '"'
+        params = []
+        for c in (where or {}).keys():
+            if c not in types:
+                raise Exception("Unknown column " + str(c) + " of event " + event)
+        if where is not None and len(where) > 0:
+            sql = sql + ' WHERE ' + ' AND '.join('"' + c + '" = ?' for c in where.keys())
+            for c, value in where.items():
+                if c in ('blockNumber', 'logIndex'):
+                    params.append(int(value))
+                elif c == 'address':
+                    params.append(rpc_client.checksum_address(value))
+                else:
+                    params.append(encode_value(value, types[c]))
+        sql = sql + ' ORDER BY ' + self.__order_by_clause(order_by, types)
+        if limit is not None:
+            sql = sql + ' LIMIT ' + str(int(limit))
+        with self._lock:
+            rows = self.connection.execute(sql, params).fetchall()
+        names = [c for c, _ in LOG_COLUMNS] + [c for c, _ in columns]
+        return [dict(zip(names, list(row[:len(LOG_COLUMNS)]) +
+                         [decode_value(value, t) for value, (_, t) in zip(row[len(LOG_COLUMNS):], columns)]))
+                for row in rows]
+
+    @staticmethod
+    def __order_by_clause(order_by, types):
+        # Only known columns and directions reach the SQL string
+        terms = []
+        for term in order_by.split(','):
+            words = term.split()
+            if len(words) == 0 or len(words) > 2 or words[0] not in types or \
+                    (len(words) == 2 and words[1].upper() not in ORDER_DIRECTIONS):
+                raise Exception("Invalid order_by: " + order_by)
+            terms.append('"' + words[0] + '"' + ('' if len(words) == 1 else ' ' + words[1].upper()))
+        return ', '.join(terms)
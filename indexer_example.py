@@ -0,0 +1,39 @@
+import logging
+import sys
+from web3 import Web3
+from indexer import indexer
+from dex import uniswap_v2_factory
+from dex import uniswap_v2_router
+import dex.erc20 as erc20
+
+if __name__ == "__main__":
+    log_format = '%(asctime)s|%(name)s|%(levelname)s: %(message)s'
+
+    logger = logging.getLogger("DFK-indexer")
+    logger.setLevel(logging.DEBUG)
+    logging.basicConfig(level=logging.INFO, format=log_format, stream=sys.stdout)
+
+    rpc_server = 'https://api.harmony.one'
+    logger.info("Using RPC server " + rpc_server)
+
+    w3 = Web3(Web3.HTTPProvider(rpc_server))
+    last_block = w3.eth.block_number
+
+    # Index the last 10000 blocks (the next runs resume from the last indexed block)
+    jewel_one_pair = uniswap_v2_factory.get_pair(erc20.JEWEL, uniswap_v2_router.weth(rpc_server), rpc_server)
+    sources = indexer.default_sources(rpc_server, pair_addresses=[jewel_one_pair])
+    db = indexer.Indexer('dfk_events.sqlite', rpc_server, sources, logger)
+    db.run(from_block=last_block - 10000)
+
+    for sale in db.query('AuctionSuccessful', order_by='blockNumber DESC', limit=5):
+        logger.info("Hero " + str(sale['tokenId']) + " sold for " + str(erc20.wei2eth(w3, sale['totalPrice'])) + " JEWEL")
+
+    for summon in db.query('HeroSummoned', order_by='blockNumber DESC', limit=5):
+        logger.info("Hero " + str(summon['heroId']) + " summoned from heroes " + str(summon['summonerId']) + " and "
+                    + str(summon['assistantId']))
+
+    for sync in db.query('Sync', {'address': jewel_one_pair}, order_by='blockNumber DESC', limit=1):
+        logger.info("JEWEL-ONE reserves at block " + str(sync['blockNumber']) + ": " + str(sync['reserve0']) + ", "
+                    + str(sync['reserve1']))
+
+    db.close()
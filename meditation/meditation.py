@@ -1,4 +1,6 @@
-from web3 import Web3
+from rpc import client as rpc_client
+from rpc import transactions
+from rpc import async_client as rpc_async
 
 CONTRACT_ADDRESS = '0x0594d86b2923076a2316eaea4e1ca286daa142c1'
 
@@ -46,33 +48,24 @@ def block_explorer_link(txid):
 
 
 def get_required_runes(level, rpc_address):
-    w3 = Web3(Web3.HTTPProvider(rpc_address))
-
-    contract_address = Web3.toChecksumAddress(CONTRACT_ADDRESS)
-    contract = w3.eth.contract(contract_address, abi=ABI)
+    contract = rpc_client.get_contract(CONTRACT_ADDRESS, ABI, rpc_address)
 
     return contract.functions._getRequiredRunes(level).call()
 
 
 def active_attunement_crystals(address, rpc_address):
-    w3 = Web3(Web3.HTTPProvider(rpc_address))
-
-    contract_address = Web3.toChecksumAddress(CONTRACT_ADDRESS)
-    contract = w3.eth.contract(contract_address, abi=ABI)
+    contract = rpc_client.get_contract(CONTRACT_ADDRESS, ABI, rpc_address)
 
     return contract.functions.activeAttunementCrystals(address).call()
 
 
 def add_attunement_crystal(address, rpc_address):
-    w3 = Web3(Web3.HTTPProvider(rpc_address))
-
-    contract_address = Web3.toChecksumAddress(CONTRACT_ADDRESS)
-    contract = w3.eth.contract(contract_address, abi=ABI)
+    contract = rpc_client.get_contract(CONTRACT_ADDRESS, ABI, rpc_address)
 
     return contract.functions.addAttunementCrystal(address).call()
 
 
-def start_meditation(hero_id, stat1, stat2, stat3, attunement_crystal_address, private_key, nonce, gas_price_gwei, tx_timeout_seconds, rpc_address, logger):
+def start_meditation(hero_id, stat1, stat2, stat3, attunement_crystal_address, private_key, nonce, gas_price_gwei, tx_timeout_seconds, rpc_address, logger, wait=True):
 
     if type(stat1) == str:
         stat1 = stat2id(stat1)
@@ -83,67 +76,27 @@ def start_meditation(hero_id, stat1, stat2, stat3, attunement_crystal_address, p
     if type(stat3) == str:
         stat3 = stat2id(stat3)
 
-    w3 = Web3(Web3.HTTPProvider(rpc_address))
-    account = w3.eth.account.privateKeyToAccount(private_key)
-    w3.eth.default_account = account.address
-
-    contract_address = Web3.toChecksumAddress(CONTRACT_ADDRESS)
-    contract = w3.eth.contract(contract_address, abi=ABI)
-
-    tx = contract.functions.startMeditation(hero_id, stat1, stat2, stat3, attunement_crystal_address).buildTransaction(
-        {'gasPrice': w3.toWei(gas_price_gwei, 'gwei'), 'nonce': nonce})
+    contract = rpc_client.get_contract(CONTRACT_ADDRESS, ABI, rpc_address)
 
-    logger.debug("Signing transaction")
-    signed_tx = w3.eth.account.sign_transaction(tx, private_key=private_key)
-    logger.debug("Sending transaction " + str(tx))
-    ret = w3.eth.send_raw_transaction(signed_tx.rawTransaction)
-    logger.debug("Transaction successfully sent !")
-    logger.info("Waiting for transaction " + block_explorer_link(signed_tx.hash.hex()) + " to be mined")
-    tx_receipt = w3.eth.wait_for_transaction_receipt(transaction_hash=signed_tx.hash, timeout=tx_timeout_seconds,
-                                                     poll_latency=3)
-    logger.info("Transaction mined !")
+    function_call = contract.functions.startMeditation(hero_id, stat1, stat2, stat3, attunement_crystal_address)
+    return transactions.send(function_call, private_key, nonce, gas_price_gwei, tx_timeout_seconds, rpc_address, logger, wait)
 
-    return tx_receipt
 
+def complete_meditation(hero_id, private_key, nonce, gas_price_gwei, tx_timeout_seconds, rpc_address, logger, wait=True):
+    contract = rpc_client.get_contract(CONTRACT_ADDRESS, ABI, rpc_address)
 
-def complete_meditation(hero_id, private_key, nonce, gas_price_gwei, tx_timeout_seconds, rpc_address, logger):
-    w3 = Web3(Web3.HTTPProvider(rpc_address))
-    account = w3.eth.account.privateKeyToAccount(private_key)
-    w3.eth.default_account = account.address
-
-    contract_address = Web3.toChecksumAddress(CONTRACT_ADDRESS)
-    contract = w3.eth.contract(contract_address, abi=ABI)
-
-    tx = contract.functions.completeMeditation(hero_id).buildTransaction(
-        {'gasPrice': w3.toWei(gas_price_gwei, 'gwei'), 'nonce': nonce})
-
-    logger.debug("Signing transaction")
-    signed_tx = w3.eth.account.sign_transaction(tx, private_key=private_key)
-    logger.debug("Sending transaction " + str(tx))
-    ret = w3.eth.send_raw_transaction(signed_tx.rawTransaction)
-    logger.debug("Transaction successfully sent !")
-    logger.info("Waiting for transaction " + block_explorer_link(signed_tx.hash.hex()) + " to be mined")
-    tx_receipt = w3.eth.wait_for_transaction_receipt(transaction_hash=signed_tx.hash, timeout=tx_timeout_seconds,
-                                                     poll_latency=3)
-    logger.info("Transaction mined !")
-
-    return tx_receipt
+    function_call = contract.functions.completeMeditation(hero_id)
+    return transactions.send(function_call, private_key, nonce, gas_price_gwei, tx_timeout_seconds, rpc_address, logger, wait)
 
 
 def get_active_meditations(address, rpc_address):
-    w3 = Web3(Web3.HTTPProvider(rpc_address))
-
-    contract_address = Web3.toChecksumAddress(CONTRACT_ADDRESS)
-    contract = w3.eth.contract(contract_address, abi=ABI)
+    contract = rpc_client.get_contract(CONTRACT_ADDRESS, ABI, rpc_address)
 
     return contract.functions.getActiveMeditations(address).call()
 
 
 def get_hero_meditation(hero_id, rpc_address):
-    w3 = Web3(Web3.HTTPProvider(rpc_address))
-
-    contract_address = Web3.toChecksumAddress(CONTRACT_ADDRESS)
-    contract = w3.eth.contract(contract_address, abi=ABI)
+    contract = rpc_client.get_contract(CONTRACT_ADDRESS, ABI, rpc_address)
 
     result = contract.functions.getHeroMeditation(hero_id).call()
     if result[0] == 0:
@@ -151,11 +104,15 @@ def get_hero_meditation(hero_id, rpc_address):
     return result
 
 
-def get_meditation(meditation_id, rpc_address):
-    w3 = Web3(Web3.HTTPProvider(rpc_address))
+async def get_hero_meditation_async(hero_id, rpc_address):
+    result = await rpc_async.call(CONTRACT_ADDRESS, ABI, 'getHeroMeditation', [hero_id], rpc_address)
+    if result[0] == 0:
+        return None
+    return result
 
-    contract_address = Web3.toChecksumAddress(CONTRACT_ADDRESS)
-    contract = w3.eth.contract(contract_address, abi=ABI)
+
+def get_meditation(meditation_id, rpc_address):
+    contract = rpc_client.get_contract(CONTRACT_ADDRESS, ABI, rpc_address)
 
     result = contract.functions.getMeditation(meditation_id).call()
     if result[0] == 0:
@@ -164,19 +121,13 @@ def get_meditation(meditation_id, rpc_address):
 
 
 def hero_to_meditation_id(hero_id, rpc_address):
-    w3 = Web3(Web3.HTTPProvider(rpc_address))
-
-    contract_address = Web3.toChecksumAddress(CONTRACT_ADDRESS)
-    contract = w3.eth.contract(contract_address, abi=ABI)
+    contract = rpc_client.get_contract(CONTRACT_ADDRESS, ABI, rpc_address)
 
     return contract.functions.heroToMeditation(hero_id).call()
 
 
 def profile_active_meditations(address, id, rpc_address):
-    w3 = Web3(Web3.HTTPProvider(rpc_address))
-
-    contract_address = Web3.toChecksumAddress(CONTRACT_ADDRESS)
-    contract = w3.eth.contract(contract_address, abi=ABI)
+    contract = rpc_client.get_contract(CONTRACT_ADDRESS, ABI, rpc_address)
 
     return contract.functions.profileActiveMeditations(address, id).call()
 
@@ -1,4 +1,6 @@
 from web3 import Web3
+from rpc import client as rpc_client
+from rpc import async_client as rpc_async
 
 CONTRACT_ADDRESS = '0xabD4741948374b1f5DD5Dd7599AC1f85A34cAcDD'
 
@@ -34,11 +36,20 @@ ABI = """
 
 
 def get_profile(address, rpc_address):
-    w3 = Web3(Web3.HTTPProvider(rpc_address))
-    contract_address = Web3.toChecksumAddress(CONTRACT_ADDRESS)
-    contract = w3.eth.contract(contract_address, abi=ABI)
+    contract = rpc_client.get_contract(CONTRACT_ADDRESS, ABI, rpc_address)
     contract_entry = contract.functions.getProfileByAddress(Web3.toChecksumAddress(address)).call()
 
+    return parse_profile(contract_entry)
+
+
+async def get_profile_async(address, rpc_address):
+    contract_entry = await rpc_async.call(CONTRACT_ADDRESS, ABI, 'getProfileByAddress', [Web3.toChecksumAddress(address)],
+                                          rpc_address)
+
+    return parse_profile(contract_entry)
+
+
+def parse_profile(contract_entry):
     profile = {}
     profile['id'] = contract_entry[0]
     profile['address'] = str(contract_entry[1])
@@ -0,0 +1,86 @@
+import logging
+import random
+import sys
+import time
+import hero.utils.utils as hero_utils
+import auctions.pricing as pricing
+import auctions.query as query
+
+
+CLASSES = ['Warrior', 'Knight', 'Thief', 'Archer', 'Priest', 'Wizard', 'Monk', 'Pirate']
+
+
+def make_auction(auction_id):
+    return {'id': str(auction_id), 'startingPrice': str(random.randint(10 ** 18, 10 ** 21)),
+            'endingPrice': str(random.randint(10 ** 18, 10 ** 21)), 'duration': '86400',
+            'startedAt': str(random.randint(0, 100000)),
+            'tokenId': {'id': str(auction_id + 1000), 'statGenes': str(random.getrandbits(240)),
+                        'generation': str(random.randint(0, 10)), 'rarity': str(random.choice([0, 0, 0, 1, 1, 2, 3, 4])),
+                        'mainClass': random.choice(CLASSES), 'subClass': random.choice(CLASSES),
+                        'level': str(random.randint(1, 20)), 'summons': '0', 'maxSummons': '10'}}
+
+
+def brute_force(auctions, max_price, now):
+    result = []
+    for auction in auctions:
+        hero = auction['tokenId']
+        if int(hero['generation']) <= 2 and hero['rarity'] == '4' and hero['mainClass'] == 'Wizard' and \
+                hero_utils.parse_stat_genes(int(hero['statGenes']))['profession'] == 'gardening':
+            price = pricing.get_current_price(auction, now)
+            if price <= max_price:
+                result.append(auction['id'])
+    return sorted(result)
+
+
+if __name__ == "__main__":
+    log_format = '%(asctime)s|%(name)s|%(levelname)s: %(message)s'
+
+    logger = logging.getLogger("DFK-query-benchmark")
+    logger.setLevel(logging.DEBUG)
+    logging.basicConfig(level=logging.INFO, format=log_format, stream=sys.stdout)
+
+    listing_count = 50000
+    now = 90000
+    max_price = 800 * 10 ** 18
+    listings = {i: make_auction(i) for i in range(listing_count)}
+
+    start = time.perf_counter()
+    engine = query.QueryEngine(listings.values())
+    logger.info("Indexing:\t" + str(round((time.perf_counter() - start) * 1000)) + " ms for " + str(listing_count) + " listings")
+
+    q = (query.Range('generation', 0, 2) & query.Eq('rarity', 'mythic') & query.Eq('mainClass', 'wizard') &
+         query.Eq('profession', 'gardening') & query.PriceBelow(max_price))
+
+    def check():
+        result = sorted(auction['id'] for _, auction in engine.select(q, now=now))
+        if result != brute_force(listings.values(), max_price, now):
+            raise Exception("Query result mismatch")
+        if engine.count(query.Range('level', None, None)) != len(listings):
+            raise Exception("Range index mismatch")
+
+    check()
+
+    # Listings replaced in a batch
+    for i in range(0, listing_count, 3):
+        listings[i] = make_auction(i)
+    engine.add_many([listings[i] for i in range(0, listing_count, 3)])
+    check()
+
+    # Market churn: rows of closed listings are reused, listings opened again are replaced
+    for i in range(listing_count, 2 * listing_count):
+        engine.apply({'type': 'closed', 'auction': listings.pop(i - listing_count)})
+        listings[i] = make_auction(i)
+        engine.apply({'type': 'opened', 'auction': listings[i]})
+        if i % 100 == 0:
+            listings[i] = make_auction(i)
+            engine.apply({'type': 'opened', 'auction': listings[i]})
+    check()
+    if len(engine.records) > listing_count:
+        raise Exception("Rows not reused: " + str(len(engine.records)))
+    logger.info("Results are identical")
+
+    runs = 200
+    start = time.perf_counter()
+    for _ in range(runs):
+        engine.select(q, now=now)
+    logger.info("Query:\t" + str(round((time.perf_counter() - start) * 1000000 / runs)) + " us over " + str(len(engine)) + " listings")
@@ -1,4 +1,7 @@
-from web3 import Web3
+from rpc import client as rpc_client
+from rpc import transactions
+from rpc import events as rpc_events
+from rpc import async_client as rpc_async
 
 CONTRACT_ADDRESS = '0x5100bd31b822371108a0f63dcfb6594b9919eaf4'
 
@@ -63,40 +66,16 @@ def block_explorer_link(txid):
     return 'https://explorer.harmony.one/tx/' + str(txid)
 
 
-def start_quest(quest_address, hero_ids, attempts, private_key, nonce, gas_price_gwei, tx_timeout_seconds, rpc_address, logger):
-    w3 = Web3(Web3.HTTPProvider(rpc_address))
-    account = w3.eth.account.privateKeyToAccount(private_key)
-    w3.eth.default_account = account.address
-
-    contract_address = Web3.toChecksumAddress(CONTRACT_ADDRESS)
-    contract = w3.eth.contract(contract_address, abi=ABI)
+def start_quest(quest_address, hero_ids, attempts, private_key, nonce, gas_price_gwei, tx_timeout_seconds, rpc_address, logger, wait=True):
+    contract = rpc_client.get_contract(CONTRACT_ADDRESS, ABI, rpc_address)
 
     #logger.info("Starting quest with hero ids " + str(hero_ids))
-    tx = contract.functions.startQuest(hero_ids, quest_address, attempts).buildTransaction(
-        {'gasPrice': w3.toWei(gas_price_gwei, 'gwei'), 'nonce': nonce})
-
-    logger.debug("Signing transaction")
-    signed_tx = w3.eth.account.sign_transaction(tx, private_key=private_key)
-    logger.debug("Sending transaction " + str(tx))
-    ret = w3.eth.send_raw_transaction(signed_tx.rawTransaction)
-    logger.debug("Transaction successfully sent !")
-    logger.info(
-        "Waiting for transaction " + block_explorer_link(signed_tx.hash.hex()) + " to be mined")
-
-    tx_receipt = w3.eth.wait_for_transaction_receipt(transaction_hash=signed_tx.hash, timeout=tx_timeout_seconds,
-                                                     poll_latency=3)
-    logger.info("Transaction mined !")
-
-    return tx_receipt
+    function_call = contract.functions.startQuest(hero_ids, quest_address, attempts)
+    return transactions.send(function_call, private_key, nonce, gas_price_gwei, tx_timeout_seconds, rpc_address, logger, wait)
 
 
-def start_quest_with_data(quest_address, data, hero_ids, attempts, private_key, nonce, gas_price_gwei, tx_timeout_seconds, rpc_address, logger):
-    w3 = Web3(Web3.HTTPProvider(rpc_address))
-    account = w3.eth.account.privateKeyToAccount(private_key)
-    w3.eth.default_account = account.address
-
-    contract_address = Web3.toChecksumAddress(CONTRACT_ADDRESS)
-    contract = w3.eth.contract(contract_address, abi=ABI)
+def start_quest_with_data(quest_address, data, hero_ids, attempts, private_key, nonce, gas_price_gwei, tx_timeout_seconds, rpc_address, logger, wait=True):
+    contract = rpc_client.get_contract(CONTRACT_ADDRESS, ABI, rpc_address)
 
     if type(data) != tuple:
         raise Exception("Quest data must be a tuple")
@@ -104,115 +83,50 @@ def start_quest_with_data(quest_address, data, hero_ids, attempts, private_key,
     if len(data) != 12:
         raise Exception("Invalid quest data length (expected 12 but was "+str(len(data))+")")
 
-    tx = contract.functions.startQuestWithData(hero_ids, quest_address, attempts, data).buildTransaction(
-        {'gasPrice': w3.toWei(gas_price_gwei, 'gwei'), 'nonce': nonce})
-
-    logger.debug("Signing transaction")
-    signed_tx = w3.eth.account.sign_transaction(tx, private_key=private_key)
-    logger.debug("Sending transaction " + str(tx))
-    ret = w3.eth.send_raw_transaction(signed_tx.rawTransaction)
-    logger.debug("Transaction successfully sent !")
-    logger.info(
-        "Waiting for transaction " + block_explorer_link(signed_tx.hash.hex()) + " to be mined")
-
-    tx_receipt = w3.eth.wait_for_transaction_receipt(transaction_hash=signed_tx.hash, timeout=tx_timeout_seconds,
-                                                     poll_latency=3)
-    logger.info("Transaction mined !")
-
-    return tx_receipt
+    function_call = contract.functions.startQuestWithData(hero_ids, quest_address, attempts, data)
+    return transactions.send(function_call, private_key, nonce, gas_price_gwei, tx_timeout_seconds, rpc_address, logger, wait)
 
 
-def complete_quest(hero_id, private_key, nonce, gas_price_gwei, tx_timeout_seconds, rpc_address, logger):
-    w3 = Web3(Web3.HTTPProvider(rpc_address))
-    account = w3.eth.account.privateKeyToAccount(private_key)
-    w3.eth.default_account = account.address
+def complete_quest(hero_id, private_key, nonce, gas_price_gwei, tx_timeout_seconds, rpc_address, logger, wait=True):
+    contract = rpc_client.get_contract(CONTRACT_ADDRESS, ABI, rpc_address)
 
-    contract_address = Web3.toChecksumAddress(CONTRACT_ADDRESS)
-    contract = w3.eth.contract(contract_address, abi=ABI)
-
-    tx = contract.functions.completeQuest(hero_id).buildTransaction(
-        {'gasPrice': w3.toWei(gas_price_gwei, 'gwei'), 'nonce': nonce})
-
-    logger.debug("Signing transaction")
-    signed_tx = w3.eth.account.sign_transaction(tx, private_key=private_key)
-    logger.debug("Sending transaction " + str(tx))
-    ret = w3.eth.send_raw_transaction(signed_tx.rawTransaction)
-    logger.debug("Transaction successfully sent !")
-    logger.info(
-        "Waiting for transaction " + block_explorer_link(signed_tx.hash.hex()) + " to be mined")
-    tx_receipt = w3.eth.wait_for_transaction_receipt(transaction_hash=signed_tx.hash, timeout=tx_timeout_seconds,
-                                                     poll_latency=3)
-    logger.info("Transaction mined !")
-
-    return tx_receipt
+    function_call = contract.functions.completeQuest(hero_id)
+    return transactions.send(function_call, private_key, nonce, gas_price_gwei, tx_timeout_seconds, rpc_address, logger, wait)
 
 
 def parse_complete_quest_receipt(tx_receipt, rpc_address):
-    w3 = Web3(Web3.HTTPProvider(rpc_address))
-
-    contract_address = Web3.toChecksumAddress(CONTRACT_ADDRESS)
-    contract = w3.eth.contract(contract_address, abi=ABI)
+    quest_events = rpc_events.group_by_name(rpc_events.decode_receipt(tx_receipt, ['QuestReward', 'QuestXP']))
 
     quest_result = {}
-
-    quest_reward = contract.events.QuestReward().processReceipt(tx_receipt)
-    quest_result['reward'] = quest_reward
-
-    quest_xp = contract.events.QuestXP().processReceipt(tx_receipt)
-    quest_result['xp'] = quest_xp
+    quest_result['reward'] = quest_events.get('QuestReward', [])
+    quest_result['xp'] = quest_events.get('QuestXP', [])
 
     return quest_result
 
 
-def cancel_quest(hero_id, private_key, nonce, gas_price_gwei, tx_timeout_seconds, rpc_address, logger):
-    w3 = Web3(Web3.HTTPProvider(rpc_address))
-    account = w3.eth.account.privateKeyToAccount(private_key)
-    w3.eth.default_account = account.address
-
-    contract_address = Web3.toChecksumAddress(CONTRACT_ADDRESS)
-    contract = w3.eth.contract(contract_address, abi=ABI)
-
-    tx = contract.functions.cancelQuest(hero_id).buildTransaction(
-        {'gasPrice': w3.toWei(gas_price_gwei, 'gwei'), 'nonce': nonce})
+def cancel_quest(hero_id, private_key, nonce, gas_price_gwei, tx_timeout_seconds, rpc_address, logger, wait=True):
+    contract = rpc_client.get_contract(CONTRACT_ADDRESS, ABI, rpc_address)
 
-    logger.debug("Signing transaction")
-    signed_tx = w3.eth.account.sign_transaction(tx, private_key=private_key)
-    logger.debug("Sending transaction " + str(tx))
-    ret = w3.eth.send_raw_transaction(signed_tx.rawTransaction)
-    logger.debug("Transaction successfully sent !")
-    logger.info(
-        "Waiting for transaction " + block_explorer_link(signed_tx.hash.hex()) + " to be mined")
-    tx_receipt = w3.eth.wait_for_transaction_receipt(transaction_hash=signed_tx.hash, timeout=tx_timeout_seconds,
-                                                     poll_latency=3)
-    logger.info("Transaction mined !")
-
-    return tx_receipt
+    function_call = contract.functions.cancelQuest(hero_id)
+    return transactions.send(function_call, private_key, nonce, gas_price_gwei, tx_timeout_seconds, rpc_address, logger, wait)
 
 
 def hero_to_quest_id(hero_id, rpc_address):
-    w3 = Web3(Web3.HTTPProvider(rpc_address))
-    contract_address = Web3.toChecksumAddress(CONTRACT_ADDRESS)
-    contract = w3.eth.contract(contract_address, abi=ABI)
+    contract = rpc_client.get_contract(CONTRACT_ADDRESS, ABI, rpc_address)
     result = contract.functions.heroToQuest(hero_id).call()
 
     return result
 
 
 def get_active_quest(address, rpc_address):
-    w3 = Web3(Web3.HTTPProvider(rpc_address))
-
-    contract_address = Web3.toChecksumAddress(CONTRACT_ADDRESS)
-    contract = w3.eth.contract(contract_address, abi=ABI)
+    contract = rpc_client.get_contract(CONTRACT_ADDRESS, ABI, rpc_address)
     result = contract.functions.getActiveQuests(address).call()
 
     return result
 
 
 def get_hero_quest(hero_id, rpc_address):
-    w3 = Web3(Web3.HTTPProvider(rpc_address))
-
-    contract_address = Web3.toChecksumAddress(CONTRACT_ADDRESS)
-    contract = w3.eth.contract(contract_address, abi=ABI)
+    contract = rpc_client.get_contract(CONTRACT_ADDRESS, ABI, rpc_address)
     result = contract.functions.getHeroQuest(hero_id).call()
 
     if result[0] <= 0:
@@ -221,11 +135,17 @@ def get_hero_quest(hero_id, rpc_address):
     return result
 
 
-def get_quest(quest_id, rpc_address):
-    w3 = Web3(Web3.HTTPProvider(rpc_address))
+async def get_hero_quest_async(hero_id, rpc_address):
+    result = await rpc_async.call(CONTRACT_ADDRESS, ABI, 'getHeroQuest', [hero_id], rpc_address)
+
+    if result[0] <= 0:
+        return None
+
+    return result
+
 
-    contract_address = Web3.toChecksumAddress(CONTRACT_ADDRESS)
-    contract = w3.eth.contract(contract_address, abi=ABI)
+def get_quest(quest_id, rpc_address):
+    contract = rpc_client.get_contract(CONTRACT_ADDRESS, ABI, rpc_address)
     result = contract.functions.getQuest(quest_id).call()
 
     if result[0] <= 0:
@@ -235,30 +155,25 @@ def get_quest(quest_id, rpc_address):
 
 
 def get_quest_data(quest_id, rpc_address):
-    w3 = Web3(Web3.HTTPProvider(rpc_address))
-
-    contract_address = Web3.toChecksumAddress(CONTRACT_ADDRESS)
-    contract = w3.eth.contract(contract_address, abi=ABI)
+    contract = rpc_client.get_contract(CONTRACT_ADDRESS, ABI, rpc_address)
     result = contract.functions.getQuestData(quest_id).call()
 
     return result
 
 
 def quest_address_to_type(quest_address, rpc_address):
-    w3 = Web3(Web3.HTTPProvider(rpc_address))
-
-    contract_address = Web3.toChecksumAddress(CONTRACT_ADDRESS)
-    contract = w3.eth.contract(contract_address, abi=ABI)
+    contract = rpc_client.get_contract(CONTRACT_ADDRESS, ABI, rpc_address)
     result = contract.functions.questAddressToType(quest_address).call()
 
     return result
 
 
 def get_current_stamina(hero_id, rpc_address):
-    w3 = Web3(Web3.HTTPProvider(rpc_address))
-
-    contract_address = Web3.toChecksumAddress(CONTRACT_ADDRESS)
-    contract = w3.eth.contract(contract_address, abi=ABI)
+    contract = rpc_client.get_contract(CONTRACT_ADDRESS, ABI, rpc_address)
     result = contract.functions.getCurrentStamina(hero_id).call()
 
     return result
+
+
+async def get_current_stamina_async(hero_id, rpc_address):
+    return await rpc_async.call(CONTRACT_ADDRESS, ABI, 'getCurrentStamina', [hero_id], rpc_address)
@@ -0,0 +1,288 @@
+"""
+Quest scheduler for a roster of heroes.
+Every pending action (complete a quest, start a quest when a hero has enough stamina, read the state of heroes) is kept
+in a priority queue ordered by time, so the scheduler sleeps until the next action is due instead of polling.
+Due actions are grouped: heroes ready together start in parties of up to party_size heroes, and all the transactions
+due at the same time are sent in one batch request (without waiting for them). The state of heroes is read with
+batched calls, once when the scheduler starts and then only for heroes whose transaction has been mined. Stamina is
+predicted by a stamina.StaminaModel and checked against the chain (one batched call) just before starting quests.
+"""
+
+import heapq
+import itertools
+import threading
+import time
+from rpc import client as rpc_client
+from rpc import transactions
+from . import quest_core
+from .stamina import StaminaModel
+
+MAX_PARTY_SIZE = 6
+STAMINA_PER_ATTEMPT = 5
+# completeAtTime is compared with the block time, which can be a few seconds behind
+COMPLETE_DELAY_SECONDS = 5
+RETRY_DELAY_SECONDS = 60
+
+COMPLETE = 'complete'
+START = 'start'
+REFRESH = 'refresh'
+# Pending state of a hero whose transaction has been sent and is not mined yet
+IN_FLIGHT = 'inFlight'
+
+
+class QuestScheduler:
+    def __init__(self, quest_address, hero_ids, attempts, private_key, gas_price_gwei, tx_timeout_seconds, rpc_address, logger,
+                 quest_data=None, party_size=MAX_PARTY_SIZE, group_window_seconds=0, stamina_per_attempt=STAMINA_PER_ATTEMPT,
+                 stamina_model=None):
+        '''
+        :param quest_address: quest contract (e.g. fishing.QUEST_CONTRACT_ADDRESS)
+        :param hero_ids: roster
+        :param attempts: attempts per quest
+        :param private_key: owner of the heroes
+        :param gas_price_gwei: None to use the gas strategy of rpc.transactions
+        :param tx_timeout_seconds:
+        :param rpc_address:
+        :param logger:
+        :param quest_data: tuple of 12 values for quests started with data (e.g. gardening), None otherwise
+        :param party_size: maximum number of heroes per quest
+        :param group_window_seconds: how long a ready hero may wait for other heroes to fill its party
+        :param stamina_per_attempt:
+        :param stamina_model: StaminaModel of the heroes, None for a new one
+        '''
+        self.quest_address = quest_address
+        self.hero_ids = list(hero_ids)
+        self.attempts = attempts
+        self.private_key = private_key
+        self.gas_price_gwei = gas_price_gwei
+        self.tx_timeout_seconds = tx_timeout_seconds
+        self.rpc_address = rpc_address
+        self.logger = logger
+        self.quest_data = quest_data
+        self.party_size = party_size
+        self.group_window_seconds = group_window_seconds
+        self.stamina_needed = attempts * stamina_per_attempt
+        self.stamina = StaminaModel() if stamina_model is None else stamina_model
+
+        self._condition = threading.Condition()
+        self._queue = []
+        self._sequence = itertools.count()
+        # hero id -> time since which a hero held back by the group window is ready
+        self._ready_since = {}
+        # hero id -> (when, sequence, action) of the only queued action of the hero, or IN_FLIGHT. Queue entries no
+        # longer matching the pending action of their heroes are stale and skipped
+        self._pending = {}
+
+    def schedule(self, when, action, hero_ids):
+        '''
+        Add an action to the queue. COMPLETE and START replace the queued action of the heroes. REFRESH is ignored for
+        heroes which already have a next action or a transaction in flight (unless it is a later REFRESH)
+        :param when: unix time
+        :param action: COMPLETE (hero_ids of the party), START (one hero) or REFRESH
+        :param hero_ids: tuple of hero ids
+        '''
+        with self._condition:
+            if action == REFRESH:
+                hero_ids = [hero_id for hero_id in hero_ids if not self.__has_next_action(hero_id, when)]
+            if len(hero_ids) > 0:
+                self.__push(when, action, hero_ids)
+                self._condition.notify()
+
+    def next_time(self):
+        with self._condition:
+            self.__drop_stale()
+            return self._queue[0][0] if len(self._queue) > 0 else None
+
+    def pending_action(self, hero_id):
+        '''
+        :return: queued action of a hero (COMPLETE, START or REFRESH), IN_FLIGHT, or None
+        '''
+        with self._condition:
+            pending = self._pending.get(hero_id)
+            return pending if pending is None or pending == IN_FLIGHT else pending[2]
+
+    def refresh(self, hero_ids=None):
+        '''
+        Read the quest and the stamina state of heroes (2 batched calls) and schedule their next action
+        :param hero_ids: None for the whole roster
+        '''
+        hero_ids = self.hero_ids if hero_ids is None else list(hero_ids)
+        args_list = [[hero_id] for hero_id in hero_ids]
+        quests = rpc_client.batch_call(quest_core.CONTRACT_ADDRESS, quest_core.ABI, 'getHeroQuest', args_list, self.rpc_address)
+        failures = self.stamina.load(hero_ids, self.rpc_address)
+        now = time.time()
+
+        completing = set()
+        for hero_id, (quest, error) in zip(hero_ids, quests):
+            error = error if error is not None else failures.get(hero_id)
+            if error is not None:
+                self.logger.warning("Cannot read hero " + str(hero_id) + ": " + str(error))
+                self.schedule(now + RETRY_DELAY_SECONDS, REFRESH, (hero_id,))
+            elif quest[0] > 0:
+                # Questing: the whole party is completed at once
+                if quest[0] not in completing:
+                    completing.add(quest[0])
+                    self.schedule(quest[6] + COMPLETE_DELAY_SECONDS, COMPLETE, quest[2])
+            else:
+                self.__schedule_start(hero_id, now)
+
+    def __schedule_start(self, hero_id, now):
+        ready_time = self.stamina.ready_time(hero_id, self.stamina_needed)
+        if ready_time is None:
+            self.logger.warning("Hero " + str(hero_id) + " does not have " + str(self.stamina_needed) + " stamina")
+        else:
+            self.schedule(max(now, ready_time), START, (hero_id,))
+
+    def run_pending(self, now=None):
+        '''
+        Run the due actions
+        :param now: unix time
+        :return: list of receipts.PendingTransaction sent
+        '''
+        now = time.time() if now is None else now
+
+        refreshes = self.__pop_due(now, REFRESH)
+        if len(refreshes) > 0:
+            self.refresh(sorted(set(hero_id for hero_ids in refreshes for hero_id in hero_ids)))
+
+        contract = rpc_client.get_contract(quest_core.CONTRACT_ADDRESS, quest_core.ABI, self.rpc_address)
+        completing = self.__pop_due(now, COMPLETE)
+        function_calls = [contract.functions.completeQuest(party[0]) for party in completing]
+        heroes = list(completing)
+
+        starting = self.__pop_ready(now)
+        if len(starting) > 0:
+            # Heroes whose stamina was mispredicted are reloaded and scheduled again
+            drifted = set(self.stamina.verify(starting, self.rpc_address, now))
+            for hero_id in drifted:
+                self.__schedule_start(hero_id, now)
+            starting = [hero_id for hero_id in starting if hero_id not in drifted]
+        for i in range(0, len(starting), self.party_size):
+            party = tuple(starting[i:i + self.party_size])
+            function_calls.append(self.__start_call(contract, party))
+            heroes.append(party)
+
+        if len(function_calls) == 0:
+            return []
+
+        self.logger.info("Sending " + str(len(function_calls)) + " transactions (" + str(len(completing)) + " completions)")
+        results = transactions.send_many(function_calls, self.private_key, self.gas_price_gwei, self.tx_timeout_seconds,
+                                         self.rpc_address, self.logger)
+        pending_transactions = []
+        for i, (party, (pending, error)) in enumerate(zip(heroes, results)):
+            if error is not None:
+                self.schedule(now + RETRY_DELAY_SECONDS, REFRESH, party)
+                continue
+            if i >= len(completing):
+                self.stamina.spend(party, self.stamina_needed, now)
+            with self._condition:
+                for hero_id in party:
+                    self._pending[hero_id] = IN_FLIGHT
+            # Once mined, read the heroes again to schedule their next action
+            pending.add_done_callback(lambda future, party=party: self.__on_mined(future, party))
+            pending_transactions.append(pending)
+        return pending_transactions
+
+    def run(self, stop_event=None):
+        '''
+        Run the scheduler until stop_event is set, sleeping until the next action is due
+        :param stop_event: threading.Event
+        '''
+        stop_event = threading.Event() if stop_event is None else stop_event
+        # The first read of the roster is an action like the others, retried if it fails
+        self.schedule(time.time(), REFRESH, self.hero_ids)
+        while not stop_event.is_set():
+            try:
+                self.run_pending()
+            except Exception as e:
+                self.logger.error("Scheduler error: " + str(e))
+                self.schedule(time.time() + RETRY_DELAY_SECONDS, REFRESH, self.hero_ids)
+            with self._condition:
+                next_time = self.next_time()
+                if next_time is None or next_time > time.time():
+                    # Also woken up by schedule (mined transactions)
+                    self._condition.wait(timeout=None if next_time is None else next_time - time.time())
+
+    def __on_mined(self, future, party):
+        with self._condition:
+            for hero_id in party:
+                if self._pending.get(hero_id) == IN_FLIGHT:
+                    del self._pending[hero_id]
+        error = future.exception()
+        if error is not None or future.result()['status'] != 1:
+            self.logger.error("Transaction for heroes " + str(list(party)) + " failed: " + str(error))
+            self.schedule(time.time() + RETRY_DELAY_SECONDS, REFRESH, party)
+        else:
+            self.schedule(time.time(), REFRESH, party)
+
+    def __start_call(self, contract, party):
+        if self.quest_data is not None:
+            return contract.functions.startQuestWithData(list(party), self.quest_address, self.attempts, self.quest_data)
+        return contract.functions.startQuest(list(party), self.quest_address, self.attempts)
+
+    def __has_next_action(self, hero_id, when):
+        pending = self._pending.get(hero_id)
+        if pending is None:
+            return False
+        return pending == IN_FLIGHT or pending[2] != REFRESH or pending[0] <= when
+
+    def __push(self, when, action, hero_ids):
+        entry = (when, next(self._sequence), action, tuple(hero_ids))
+        for hero_id in hero_ids:
+            self._pending[hero_id] = entry[:3]
+        heapq.heappush(self._queue, entry)
+
+    def __live_heroes(self, entry):
+        return tuple(hero_id for hero_id in entry[3] if self._pending.get(hero_id) == entry[:3])
+
+    def __drop_stale(self):
+        if any(len(self.__live_heroes(entry)) == 0 for entry in self._queue):
+            self._queue = [entry for entry in self._queue if len(self.__live_heroes(entry)) > 0]
+            heapq.heapify(self._queue)
+
+    def __take(self, entries):
+        # Remove entries from the queue, the heroes no longer have a queued action
+        taken = set(entries)
+        self._queue = [entry for entry in self._queue if entry not in taken]
+        heapq.heapify(self._queue)
+        for entry in entries:
+            for hero_id in self.__live_heroes(entry):
+                del self._pending[hero_id]
+
+    def __pop_due(self, now, action):
+        with self._condition:
+            self.__drop_stale()
+            due = sorted(entry for entry in self._queue if entry[0] <= now and entry[2] == action)
+            hero_ids = [self.__live_heroes(entry) for entry in due]
+            self.__take(due)
+            return hero_ids
+
+    def __pop_ready(self, now):
+        # Ready heroes start in full parties. The heroes left over wait for the heroes ready within
+        # group_window_seconds of the first of them, then start even if their party is not full
+        with self._condition:
+            self.__drop_stale()
+            starts = sorted(entry for entry in self._queue if entry[2] == START)
+            ready = [entry for entry in starts if entry[0] <= now]
+            if len(ready) == 0:
+                return []
+            taken = ready
+            held = []
+            left_count = len(ready) % self.party_size
+            if left_count > 0 and self.group_window_seconds > 0:
+                left = ready[-left_count:]
+                deadline = min(self._ready_since.setdefault(entry[3][0], entry[0]) for entry in left) + self.group_window_seconds
+                upcoming = [entry for entry in starts if now < entry[0] <= deadline]
+                if now < deadline and len(upcoming) > 0:
+                    taken = ready[:-left_count]
+                    held = left
+                    # Wake up when the party is full or at the deadline
+                    wake_time = upcoming[min(len(upcoming), self.party_size - left_count) - 1][0]
+                    if len(upcoming) < self.party_size - left_count:
+                        wake_time = deadline
+            hero_ids = [entry[3][0] for entry in taken]
+            self.__take(taken + held)
+            for entry in held:
+                self.__push(wake_time, START, entry[3])
+            for hero_id in hero_ids:
+                self._ready_since.pop(hero_id, None)
+            return hero_ids
@@ -0,0 +1,152 @@
+"""
+Local model of hero stamina, so that bots do not call getCurrentStamina to know if a hero can quest.
+A hero regains 1 stamina every SECONDS_PER_STAMINA seconds until state.staminaFullAt, so its stamina at any time follows
+from staminaFullAt and stats.stamina (read once with get_hero). The model is refreshed from the chain when a quest ends
+(the quest moves staminaFullAt) or when verify finds a hero whose predicted stamina differs from the chain.
+Heroes are stored column by column, so readiness of a whole roster is answered in one pass.
+"""
+
+import time
+from array import array
+from rpc import client as rpc_client
+from hero import hero as hero_core
+from . import quest_core
+
+SECONDS_PER_STAMINA = 1200
+
+
+def predict_stamina(stamina_full_at, max_stamina, now, seconds_per_stamina=SECONDS_PER_STAMINA):
+    '''
+    :param stamina_full_at: state.staminaFullAt of the hero
+    :param max_stamina: stats.stamina of the hero
+    :param now: unix time
+    :param seconds_per_stamina:
+    :return: stamina of the hero at time now
+    '''
+    if stamina_full_at <= now:
+        return max_stamina
+    missing = (stamina_full_at - int(now) + seconds_per_stamina - 1) // seconds_per_stamina
+    return max(0, max_stamina - missing)
+
+
+class StaminaModel:
+    def __init__(self, seconds_per_stamina=SECONDS_PER_STAMINA):
+        self.seconds_per_stamina = seconds_per_stamina
+        self.hero_ids = []
+        self._index = {}
+        self._full_at = array('Q')
+        self._max = array('H')
+
+    def __len__(self):
+        return len(self.hero_ids)
+
+    def __contains__(self, hero_id):
+        return hero_id in self._index
+
+    def seed(self, hero_id, stamina_full_at, max_stamina):
+        '''
+        Set the stamina state of a hero
+        :param hero_id:
+        :param stamina_full_at: state.staminaFullAt
+        :param max_stamina: stats.stamina
+        '''
+        i = self._index.get(hero_id)
+        if i is None:
+            self._index[hero_id] = len(self.hero_ids)
+            self.hero_ids.append(hero_id)
+            self._full_at.append(stamina_full_at)
+            self._max.append(max_stamina)
+        else:
+            self._full_at[i] = stamina_full_at
+            self._max[i] = max_stamina
+
+    def seed_hero(self, hero):
+        '''
+        :param hero: hero in the get_hero format
+        '''
+        self.seed(hero['id'], hero['state']['staminaFullAt'], hero['stats']['stamina'])
+
+    def load(self, hero_ids, rpc_address):
+        '''
+        Read heroes from the chain (batched getHero calls) and seed them
+        :param hero_ids:
+        :param rpc_address:
+        :return: failures (dict hero id -> error message)
+        '''
+        heroes, failures = hero_core.get_hero_many(hero_ids, rpc_address)
+        for hero in heroes.values():
+            self.seed_hero(hero)
+        return failures
+
+    def stamina(self, hero_id, now=None):
+        '''
+        :return: predicted stamina of the hero
+        '''
+        i = self._index[hero_id]
+        now = time.time() if now is None else now
+        return predict_stamina(self._full_at[i], self._max[i], now, self.seconds_per_stamina)
+
+    def full_time(self, hero_id):
+        '''
+        :return: time at which the hero is at full stamina
+        '''
+        return self._full_at[self._index[hero_id]]
+
+    def ready_time(self, hero_id, stamina):
+        '''
+        :param hero_id:
+        :param stamina: stamina needed
+        :return: time from which the hero has the stamina needed, None if the needed stamina is above the hero maximum
+        '''
+        i = self._index[hero_id]
+        if stamina > self._max[i]:
+            return None
+        return self._full_at[i] - (self._max[i] - stamina) * self.seconds_per_stamina
+
+    def ready_times(self, stamina):
+        '''
+        :param stamina: stamina needed
+        :return: for every hero (in the order of hero_ids), time from which it has the stamina needed (inf if never)
+        '''
+        seconds_per_stamina = self.seconds_per_stamina
+        return array('d', [full_at - (maximum - stamina) * seconds_per_stamina if maximum >= stamina else float('inf')
+                           for full_at, maximum in zip(self._full_at, self._max)])
+
+    def ready(self, stamina, now=None):
+        '''
+        :param stamina: stamina needed
+        :param now: unix time
+        :return: ids of the heroes having the stamina needed
+        '''
+        now = time.time() if now is None else now
+        return [hero_id for hero_id, ready_time in zip(self.hero_ids, self.ready_times(stamina)) if ready_time <= now]
+
+    def spend(self, hero_ids, stamina, now=None):
+        '''
+        Account for stamina used by a quest started at time now (staminaFullAt moves forward on chain the same way)
+        :param hero_ids:
+        :param stamina:
+        :param now: unix time
+        '''
+        now = int(time.time() if now is None else now)
+        for hero_id in hero_ids:
+            i = self._index[hero_id]
+            self._full_at[i] = max(self._full_at[i], now) + stamina * self.seconds_per_stamina
+
+    def verify(self, hero_ids, rpc_address, now=None):
+        '''
+        Compare predictions with getCurrentStamina (one batched call) and reload the heroes that drifted
+        :param hero_ids:
+        :param rpc_address:
+        :param now: unix time
+        :return: ids of the heroes reloaded
+        '''
+        hero_ids = list(hero_ids)
+        now = time.time() if now is None else now
+        results = rpc_client.batch_call(quest_core.CONTRACT_ADDRESS, quest_core.ABI, 'getCurrentStamina',
+                                        [[hero_id] for hero_id in hero_ids], rpc_address)
+        drifted = [hero_id for hero_id, (stamina, error) in zip(hero_ids, results)
+                   if error is None and stamina != self.stamina(hero_id, now)]
+        if len(drifted) > 0:
+            self.load(drifted, rpc_address)
+        return drifted
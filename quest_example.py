@@ -32,7 +32,7 @@ if __name__ == "__main__":
 
     quest_contract = fishing.QUEST_CONTRACT_ADDRESS  # foraging.CONTRACT_ADDRESS
     my_heroes_id = [1, 2, 3, 4]
-    quest.start_quest(quest_contract, my_heroes_id, 3, private_key, w3.eth.getTransactionCount(account_address), gas_price_gwei, tx_timeout)
+    quest.start_quest(quest_contract, my_heroes_id, 3, private_key, None, gas_price_gwei, tx_timeout)
     quest_info = quest_utils.human_readable_quest(quest.get_hero_quest(my_heroes_id[0]))
 
     logger.info(
@@ -40,7 +40,7 @@ if __name__ == "__main__":
     while time.time() < quest_info['completeAtTime']:
         time.sleep(2)
 
-    tx_receipt = quest.complete_quest(my_heroes_id[0], private_key, w3.eth.getTransactionCount(account_address), gas_price_gwei, tx_timeout)
+    tx_receipt = quest.complete_quest(my_heroes_id[0], private_key, None, gas_price_gwei, tx_timeout)
     quest_result = quest.parse_complete_quest_receipt(tx_receipt)
     logger.info("Rewards: " + str(quest_result))
 
@@ -49,7 +49,7 @@ if __name__ == "__main__":
     pool_id = 0  # See gardens.master_gardener
     quest_data = (pool_id, 0, 0, 0, 0, 0, '', '', ZERO_ADDRESS, ZERO_ADDRESS, ZERO_ADDRESS, ZERO_ADDRESS)
     my_gardener_heroes_id = [5]
-    quest.start_quest_with_data(gardening.QUEST_CONTRACT_ADDRESS, quest_data, my_gardener_heroes_id, 1, private_key, w3.eth.getTransactionCount(account_address), gas_price_gwei, tx_timeout)
+    quest.start_quest_with_data(gardening.QUEST_CONTRACT_ADDRESS, quest_data, my_gardener_heroes_id, 1, private_key, None, gas_price_gwei, tx_timeout)
     quest_info = quest_utils.human_readable_quest(quest.get_hero_quest(my_heroes_id[0]))
 
     logger.info(
@@ -57,5 +57,5 @@ if __name__ == "__main__":
     while time.time() < quest_info['completeAtTime']:
         time.sleep(2)
 
-    quest.complete_quest(my_gardener_heroes_id[0], private_key, w3.eth.getTransactionCount(account_address),
+    quest.complete_quest(my_gardener_heroes_id[0], private_key, None,
                                       gas_price_gwei, tx_timeout)
\ No newline at end of file
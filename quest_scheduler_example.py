@@ -0,0 +1,25 @@
+import logging
+import sys
+from quest import fishing
+from quest.scheduler import QuestScheduler
+
+if __name__ == "__main__":
+    log_format = '%(asctime)s|%(name)s|%(levelname)s: %(message)s'
+
+    logger = logging.getLogger("DFK-quest scheduler")
+    logger.setLevel(logging.DEBUG)
+    logging.basicConfig(level=logging.INFO, format=log_format, stream=sys.stdout)
+
+    rpc_server = 'https://api.harmony.one'
+    logger.info("Using RPC server " + rpc_server)
+
+    private_key = None  # set private key
+    gas_price_gwei = 15
+    tx_timeout = 30
+    hero_ids = []  # <your hero ids here>
+
+    # Fish with every hero: 3 attempts per quest, parties of up to 6 heroes. A hero ready alone waits up to 20 minutes
+    # for other heroes to fill its party
+    scheduler = QuestScheduler(fishing.QUEST_CONTRACT_ADDRESS, hero_ids, 3, private_key, gas_price_gwei, tx_timeout,
+                               rpc_server, logger, group_window_seconds=20 * 60)
+    scheduler.run()
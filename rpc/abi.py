@@ -0,0 +1,98 @@
+"""
+ABI handling done once per process.
+The ABI constants of the modules are JSON strings: they are decoded, and their selector tables computed, the first time
+they are needed and then reused.
+"""
+
+import functools
+import json
+from eth_abi import decode_abi, encode_abi
+from eth_utils import event_abi_to_log_topic, function_abi_to_4byte_selector
+from eth_utils.abi import collapse_if_tuple
+from web3._utils.abi import map_abi_data
+from web3._utils.normalizers import BASE_RETURN_NORMALIZERS
+
+
+@functools.lru_cache(maxsize=None)
+def parse(abi):
+    '''
+    Return the decoded ABI. The result is shared and must not be modified
+    :param abi: ABI as a JSON string
+    :return: list of ABI entries
+    '''
+    return json.loads(abi)
+
+
+@functools.lru_cache(maxsize=None)
+def functions(abi):
+    '''
+    Index the functions of the ABI by name (first declaration wins for overloaded names)
+    :param abi: ABI as a JSON string
+    :return: dict name -> function ABI entry
+    '''
+    result = {}
+    for entry in parse(abi):
+        if entry.get('type') == 'function':
+            result.setdefault(entry['name'], entry)
+    return result
+
+
+@functools.lru_cache(maxsize=None)
+def function_selectors(abi):
+    '''
+    Index the functions of the ABI by 4-byte selector
+    :param abi: ABI as a JSON string
+    :return: dict selector (bytes) -> function ABI entry
+    '''
+    return {function_abi_to_4byte_selector(entry): entry for entry in parse(abi) if entry.get('type') == 'function'}
+
+
+@functools.lru_cache(maxsize=None)
+def event_topics(abi):
+    '''
+    Index the events of the ABI by topic0
+    :param abi: ABI as a JSON string
+    :return: dict topic0 (bytes) -> event ABI entry
+    '''
+    return {event_abi_to_log_topic(entry): entry for entry in parse(abi) if entry.get('type') == 'event'}
+
+
+@functools.lru_cache(maxsize=None)
+def function_types(abi, name):
+    '''
+    Return the selector, input types and output types of a function
+    :param abi: ABI as a JSON string
+    :param name: function name
+    :return: selector (bytes), input types, output types
+    '''
+    entry = functions(abi)[name]
+    input_types = [collapse_if_tuple(i) for i in entry['inputs']]
+    output_types = [collapse_if_tuple(o) for o in entry['outputs']]
+    return function_abi_to_4byte_selector(entry), input_types, output_types
+
+
+def encode_call(abi, name, args):
+    '''
+    Encode the call data of a function from the selector table, without building a contract object
+    :param abi: ABI as a JSON string
+    :param name: function name
+    :param args: function arguments
+    :return: call data as an hex string
+    '''
+    selector, input_types, _ = function_types(abi, name)
+    return '0x' + (selector + encode_abi(input_types, args)).hex()
+
+
+def decode_result(abi, name, data):
+    '''
+    Decode the return data of a function the same way contract.functions.<name>(...).call() does
+    :param abi: ABI as a JSON string
+    :param name: function name
+    :param data: return data (bytes)
+    :return:
+    '''
+    _, _, output_types = function_types(abi, name)
+    result = map_abi_data(BASE_RETURN_NORMALIZERS, output_types, decode_abi(output_types, data))
+    if len(result) == 1:
+        return result[0]
+    return result
@@ -0,0 +1,126 @@
+"""
+Asyncio counterpart of rpc/client.py.
+Calls are sent over one aiohttp session per RPC address, with a bound on the number of requests in flight and an
+optional rate limit, so a single event loop can keep thousands of reads going without overloading the endpoint.
+"""
+
+import asyncio
+import aiohttp
+from . import abi as abi_cache
+from .client import checksum_address, REQUEST_TIMEOUT_SECONDS
+
+MAX_CONCURRENCY = 64
+
+_settings = {}
+_clients = {}
+
+
+class RateLimiter:
+    def __init__(self, requests_per_second):
+        self.interval = 1.0 / requests_per_second
+        self.next_time = 0
+        self.lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self.lock:
+            now = asyncio.get_running_loop().time()
+            wait = self.next_time - now
+            self.next_time = max(now, self.next_time) + self.interval
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+class AsyncClient:
+    def __init__(self, rpc_address, max_concurrency=MAX_CONCURRENCY, requests_per_second=None):
+        self.rpc_address = rpc_address
+        self.loop = asyncio.get_running_loop()
+        self.session = None
+        self.request_id = 0
+        self.set_limits(max_concurrency, requests_per_second)
+
+    def set_limits(self, max_concurrency, requests_per_second):
+        '''
+        Change the concurrency bound and the rate limit. Requests already in flight complete under the previous bound
+        '''
+        self.max_concurrency = max_concurrency
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        self.rate_limiter = RateLimiter(requests_per_second) if requests_per_second else None
+
+    def _session(self):
+        if self.session is None:
+            # Connections are bounded by the semaphore, so that the bound can change without a new session
+            self.session = aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=0),
+                                                 timeout=aiohttp.ClientTimeout(total=REQUEST_TIMEOUT_SECONDS))
+        return self.session
+
+    async def request(self, method, params):
+        self.request_id = self.request_id + 1
+        payload = {'jsonrpc': '2.0', 'id': self.request_id, 'method': method, 'params': params}
+        async with self.semaphore:
+            if self.rate_limiter is not None:
+                await self.rate_limiter.acquire()
+            async with self._session().post(self.rpc_address, json=payload) as r:
+                if r.status != 200:
+                    raise Exception("HTTP error " + str(r.status) + ": " + await r.text())
+                response = await r.json(content_type=None)
+
+        if 'error' in response:
+            raise Exception("RPC error: " + str(response['error']))
+        return response['result']
+
+    async def call(self, contract_address, abi, name, args, block_identifier='latest'):
+        if type(block_identifier) == int:
+            block_identifier = hex(block_identifier)
+        tx = {'to': checksum_address(contract_address), 'data': abi_cache.encode_call(abi, name, args)}
+        result = await self.request('eth_call', [tx, block_identifier])
+        return abi_cache.decode_result(abi, name, bytes.fromhex(result[2:]))
+
+    async def close(self):
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+
+def configure(rpc_address, max_concurrency=MAX_CONCURRENCY, requests_per_second=None):
+    '''
+    Set the concurrency bound and the rate limit of an RPC server, for its existing client and the ones created afterwards
+    :param rpc_address:
+    :param max_concurrency: maximum number of requests in flight
+    :param requests_per_second: maximum request rate (None for unlimited)
+    '''
+    _settings[rpc_address] = (max_concurrency, requests_per_second)
+    client = _clients.get(rpc_address)
+    if client is not None:
+        client.set_limits(max_concurrency, requests_per_second)
+
+
+def get_client(rpc_address):
+    '''
+    Return the async client of the RPC server bound to the running event loop
+    :param rpc_address:
+    :return:
+    '''
+    client = _clients.get(rpc_address)
+    if client is None or client.loop is not asyncio.get_running_loop():
+        max_concurrency, requests_per_second = _settings.get(rpc_address, (MAX_CONCURRENCY, None))
+        client = AsyncClient(rpc_address, max_concurrency, requests_per_second)
+        _clients[rpc_address] = client
+    return client
+
+
+async def call(contract_address, abi, name, args, rpc_address, block_identifier='latest'):
+    '''
+    Async version of rpc_client.call
+    '''
+    return await get_client(rpc_address).call(contract_address, abi, name, args, block_identifier)
+
+
+async def close():
+    '''
+    Close the sessions opened by the running event loop
+    '''
+    loop = asyncio.get_running_loop()
+    for rpc_address, client in list(_clients.items()):
+        if client.loop is loop:
+            await client.close()
+            del _clients[rpc_address]
@@ -0,0 +1,200 @@
+"""
+Process-wide registry of Web3 clients and contract objects.
+One client is kept per RPC address, backed by a keep-alive connection pool, so helpers stop paying for a new
+TCP/TLS handshake and a new contract object on every call.
+"""
+
+import functools
+import threading
+import requests
+from web3 import Web3
+from . import abi as abi_cache
+
+POOL_CONNECTIONS = 10
+POOL_MAXSIZE = 32
+BATCH_SIZE = 100
+REQUEST_TIMEOUT_SECONDS = 30
+
+_lock = threading.Lock()
+_sessions = {}
+_clients = {}
+_factories = {}
+_contracts = {}
+
+
+def _new_session():
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+def get_session(rpc_address):
+    '''
+    Return the keep-alive HTTP session of the RPC server
+    :param rpc_address:
+    :return:
+    '''
+    session = _sessions.get(rpc_address)
+    if session is None:
+        with _lock:
+            session = _sessions.get(rpc_address)
+            if session is None:
+                session = _new_session()
+                _sessions[rpc_address] = session
+    return session
+
+
+def get_web3(rpc_address):
+    '''
+    Return the shared Web3 client of the RPC server
+    :param rpc_address:
+    :return:
+    '''
+    w3 = _clients.get(rpc_address)
+    if w3 is None:
+        # The session is taken before the lock, which is not reentrant
+        session = get_session(rpc_address)
+        with _lock:
+            w3 = _clients.get(rpc_address)
+            if w3 is None:
+                w3 = Web3(Web3.HTTPProvider(rpc_address, session=session))
+                _clients[rpc_address] = w3
+    return w3
+
+
+def get_contract_factory(abi, rpc_address):
+    '''
+    Return the shared contract factory of the ABI. The ABI is decoded and validated only once per RPC server
+    :param abi:
+    :param rpc_address:
+    :return:
+    '''
+    key = (rpc_address, abi)
+    factory = _factories.get(key)
+    if factory is None:
+        factory = get_web3(rpc_address).eth.contract(abi=abi_cache.parse(abi))
+        with _lock:
+            factory = _factories.setdefault(key, factory)
+    return factory
+
+
+def get_contract(contract_address, abi, rpc_address):
+    '''
+    Return the shared contract object at contract_address
+    :param contract_address:
+    :param abi:
+    :param rpc_address:
+    :return:
+    '''
+    key = (rpc_address, contract_address, abi)
+    contract = _contracts.get(key)
+    if contract is None:
+        contract = get_contract_factory(abi, rpc_address)(address=Web3.toChecksumAddress(contract_address))
+        with _lock:
+            contract = _contracts.setdefault(key, contract)
+    return contract
+
+
+def call(contract_address, abi, name, args, rpc_address, block_identifier='latest'):
+    '''
+    Call a view function with call data encoded from the ABI selector table (no contract object involved).
+    Returns the same value as contract.functions.<name>(*args).call()
+    :param contract_address:
+    :param abi:
+    :param name: function name
+    :param args: function arguments
+    :param rpc_address:
+    :param block_identifier:
+    :return:
+    '''
+    tx = {'to': checksum_address(contract_address), 'data': abi_cache.encode_call(abi, name, args)}
+    return abi_cache.decode_result(abi, name, get_web3(rpc_address).eth.call(tx, block_identifier))
+
+
+def batch_request(calls, rpc_address):
+    '''
+    Send several JSON-RPC calls in a single HTTP request
+    :param calls: list of (method, params)
+    :param rpc_address:
+    :return: list of (result, error) in the order of calls. error is None on success
+    '''
+    payload = [{'jsonrpc': '2.0', 'id': i, 'method': method, 'params': params} for i, (method, params) in enumerate(calls)]
+    r = get_session(rpc_address).post(rpc_address, json=payload, timeout=REQUEST_TIMEOUT_SECONDS)
+    if r.status_code != 200:
+        raise Exception("HTTP error " + str(r.status_code) + ": " + r.text)
+    responses = r.json()
+    if type(responses) != list:
+        raise Exception("Batch request rejected: " + str(responses))
+
+    results = [(None, "No response")] * len(calls)
+    for response in responses:
+        if 'error' in response:
+            results[response['id']] = (None, str(response['error']))
+        else:
+            results[response['id']] = (response.get('result'), None)
+    return results
+
+
+def batch_call(contract_address, abi, name, args_list, rpc_address, batch_size=BATCH_SIZE, block_identifier='latest'):
+    '''
+    Call a view function once per arguments in args_list, packing up to batch_size eth_call per HTTP request
+    :param contract_address:
+    :param abi:
+    :param name: function name
+    :param args_list: list of function arguments
+    :param rpc_address:
+    :param batch_size:
+    :param block_identifier:
+    :return: list of (result, error) in the order of args_list. error is None on success
+    '''
+    return multi_call([(contract_address, abi, name, args) for args in args_list], rpc_address, batch_size, block_identifier)
+
+
+def multi_call(calls, rpc_address, batch_size=BATCH_SIZE, block_identifier='latest'):
+    '''
+    Call view functions of any contracts, packing up to batch_size eth_call per HTTP request
+    :param calls: list of (contract address, ABI, function name, function arguments)
+    :param rpc_address:
+    :param batch_size:
+    :param block_identifier:
+    :return: list of (result, error) in the order of calls. error is None on success
+    '''
+    if type(block_identifier) == int:
+        block_identifier = hex(block_identifier)
+    results = []
+    for i in range(0, len(calls), batch_size):
+        chunk = calls[i:i + batch_size]
+        eth_calls = [('eth_call', [{'to': checksum_address(contract_address), 'data': abi_cache.encode_call(abi, name, args)},
+                                   block_identifier]) for contract_address, abi, name, args in chunk]
+        try:
+            responses = batch_request(eth_calls, rpc_address)
+        except Exception as e:
+            results.extend([(None, str(e))] * len(chunk))
+            continue
+
+        for (_, abi, name, _), (result, error) in zip(chunk, responses):
+            if error is None:
+                try:
+                    result = abi_cache.decode_result(abi, name, bytes.fromhex(result[2:]))
+                except Exception as e:
+                    result, error = None, "Decoding error: " + str(e)
+            results.append((result, error))
+    return results
+
+
+@functools.lru_cache(maxsize=4096)
+def checksum_address(address):
+    return Web3.toChecksumAddress(address)
+
+
+def clear():
+    '''
+    Drop every cached client and contract (e.g. after a fork or to force new connections)
+    '''
+    with _lock:
+        _sessions.clear()
+        _clients.clear()
+        _factories.clear()
+        _contracts.clear()
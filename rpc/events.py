@@ -0,0 +1,222 @@
+"""
+Decoding of contract events from transaction receipts, without contract objects.
+The events of every contract of this package are indexed once by (topic0, number of topics), with their decoders
+precomputed. A receipt is then decoded in a single pass over its logs. The number of topics tells apart events with the
+same signature but different indexed arguments (e.g. ERC20 and ERC721 Transfer).
+Decoded events have the format of contract.events.<name>().processReceipt(...) (AttributeDict with args, event,
+logIndex, transactionIndex, transactionHash, address, blockHash and blockNumber).
+
+    for event in events.decode_receipt(tx_receipt, ['QuestReward']):
+        print(event.args.itemQuantity)
+"""
+
+import importlib
+import threading
+from eth_abi.decoding import ContextFramesBytesIO, TupleDecoder
+from eth_abi.registry import registry
+from eth_utils import event_abi_to_log_topic
+from eth_utils.abi import collapse_if_tuple
+from hexbytes import HexBytes
+from web3._utils.abi import map_abi_data
+from web3._utils.normalizers import BASE_RETURN_NORMALIZERS
+from web3.datastructures import AttributeDict
+from . import abi as rpc_abi
+from . import client as rpc_client
+
+# Modules whose ABI events are decoded by default
+PACKAGE_MODULES = ['hero.hero', 'quest.quest_core', 'quest.wishing_well', 'summoning.summoning', 'summoning.crystals',
+                   'profile.profile', 'meditation.meditation', 'dex.master_gardener', 'dex.uniswap_v2_factory',
+                   'dex.uniswap_v2_pair', 'dex.erc20', 'auctions.sale.sale_auctions']
+
+_lock = threading.Lock()
+_decoders = {}
+_registered = set()
+_defaults_loaded = False
+
+
+def _word_decoder(type_str):
+    '''
+    :return: function decoding a 32-byte word of a static elementary type, None for other types
+    '''
+    if '[' in type_str:
+        return None
+    if type_str.startswith('uint'):
+        return lambda word: int.from_bytes(word, 'big')
+    if type_str.startswith('int'):
+        return lambda word: int.from_bytes(word, 'big', signed=True)
+    if type_str == 'address':
+        return lambda word: '0x' + bytes(word[12:]).hex()
+    if type_str == 'bool':
+        return lambda word: word[31] != 0
+    if type_str.startswith('bytes') and type_str != 'bytes':
+        size = int(type_str[5:])
+        return lambda word: bytes(word[:size])
+    return None
+
+
+class EventDecoder:
+    def __init__(self, event_abi):
+        '''
+        :param event_abi: event ABI entry
+        '''
+        self.name = event_abi['name']
+        self.topic = event_abi_to_log_topic(event_abi)
+        inputs = event_abi['inputs']
+        self.names = [i['name'] for i in inputs]
+        self.topic_count = 1 + sum(1 for i in inputs if i.get('indexed', False))
+
+        # Indexed arguments: (position, word decoder or None when the topic is a hash)
+        self.indexed = []
+        data_types = []
+        self.data_positions = []
+        for position, i in enumerate(inputs):
+            type_str = collapse_if_tuple(i)
+            if i.get('indexed', False):
+                self.indexed.append((position, _word_decoder(type_str)))
+            else:
+                data_types.append(type_str)
+                self.data_positions.append(position)
+        self.data_types = data_types
+        # Data made of static elementary types only is decoded word by word, other data by eth_abi
+        self.word_decoders = [_word_decoder(t) for t in data_types]
+        if any(decoder is None for decoder in self.word_decoders):
+            self.word_decoders = None
+            self.data_decoder = TupleDecoder(decoders=[registry.get_decoder(t) for t in data_types])
+
+        # Addresses are checksummed like web3 does. Only nested types need the generic normalizers. Indexed arguments
+        # of other types than static elementary ones are only a hash in their topic
+        types = [collapse_if_tuple(i) for i in inputs]
+        for position, decoder in self.indexed:
+            if decoder is None:
+                types[position] = 'bytes32'
+        self.addresses = [position for position, t in enumerate(types) if t == 'address']
+        self.normalize = any(('address' in t and t != 'address') for t in types)
+        self.types = types
+
+    def decode(self, log):
+        '''
+        :param log: log of a transaction receipt
+        :return: AttributeDict in the format of processReceipt
+        '''
+        values = [None] * len(self.names)
+        topics = log['topics']
+        for (position, decoder), topic in zip(self.indexed, topics[1:]):
+            topic = HexBytes(topic)
+            values[position] = topic if decoder is None else decoder(topic)
+        if len(self.data_types) > 0:
+            data = log['data']
+            data = HexBytes(data) if isinstance(data, str) else data
+            if self.word_decoders is not None:
+                decoded = [decoder(data[32 * k:32 * k + 32]) for k, decoder in enumerate(self.word_decoders)]
+            else:
+                decoded = self.data_decoder(ContextFramesBytesIO(data))
+            for position, value in zip(self.data_positions, decoded):
+                values[position] = value
+        for position in self.addresses:
+            values[position] = rpc_client.checksum_address(values[position])
+        if self.normalize:
+            values = map_abi_data(BASE_RETURN_NORMALIZERS, self.types, values)
+
+        return AttributeDict({
+            'args': AttributeDict(dict(zip(self.names, values))),
+            'event': self.name,
+            'logIndex': log['logIndex'],
+            'transactionIndex': log['transactionIndex'],
+            'transactionHash': log['transactionHash'],
+            'address': log['address'],
+            'blockHash': log['blockHash'],
+            'blockNumber': log['blockNumber'],
+        })
+
+
+def register(abi):
+    '''
+    Decode the events of an ABI. Events already known (same topic0 and number of topics) are kept
+    :param abi: ABI as a JSON string
+    '''
+    with _lock:
+        if abi in _registered:
+            return
+        for entry in rpc_abi.parse(abi):
+            if entry.get('type') == 'event':
+                decoder = EventDecoder(entry)
+                _decoders.setdefault((decoder.topic, decoder.topic_count), decoder)
+        _registered.add(abi)
+
+
+def register_package():
+    '''
+    Decode the events of every contract of this package (done once, on the first decode)
+    '''
+    global _defaults_loaded
+    for module_name in PACKAGE_MODULES:
+        register(importlib.import_module(module_name).ABI)
+    _defaults_loaded = True
+
+
+def get_decoder(log):
+    '''
+    :param log: log of a transaction receipt
+    :return: EventDecoder of the log, None if the event is unknown
+    '''
+    if not _defaults_loaded:
+        register_package()
+    topics = log['topics']
+    if len(topics) == 0:
+        return None
+    return _decoders.get((HexBytes(topics[0]), len(topics)))
+
+
+def decode_log(log):
+    '''
+    :param log: log of a transaction receipt
+    :return: decoded event, None if the event is unknown
+    '''
+    decoder = get_decoder(log)
+    if decoder is None:
+        return None
+    return decoder.decode(log)
+
+
+def decode_receipt(tx_receipt, names=None, address=None):
+    '''
+    Decode the events of a receipt in one pass over its logs
+    :param tx_receipt:
+    :param names: event names to decode, None for all known events
+    :param address: only decode the events emitted by this contract, None for all contracts
+    :return: list of decoded events, in log order
+    '''
+    if not _defaults_loaded:
+        register_package()
+    names = None if names is None else set(names)
+    address = None if address is None else rpc_client.checksum_address(address)
+    events = []
+    for log in tx_receipt['logs']:
+        topics = log['topics']
+        if len(topics) == 0:
+            continue
+        decoder = _decoders.get((HexBytes(topics[0]), len(topics)))
+        if decoder is None or (names is not None and decoder.name not in names):
+            continue
+        if address is not None and rpc_client.checksum_address(log['address']) != address:
+            continue
+        events.append(decoder.decode(log))
+    return events
+
+
+def decode_receipts(tx_receipts, names=None, address=None):
+    '''
+    :return: list of decoded events per receipt
+    '''
+    return [decode_receipt(tx_receipt, names, address) for tx_receipt in tx_receipts]
+
+
+def group_by_name(events):
+    '''
+    :param events: decoded events
+    :return: dict event name -> list of events
+    '''
+    result = {}
+    for event in events:
+        result.setdefault(event['event'], []).append(event)
+    return result
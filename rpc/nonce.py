@@ -0,0 +1,208 @@
+"""
+Local nonce allocation, so that several transactions of the same account can be in flight at once.
+The nonce is read from the chain once, then handed out locally. Nonces of transactions that failed before being sent
+(build or sign errors) are reused. On "nonce too low", or when a transaction may have reached the node (e.g. a send that
+timed out), the manager resyncs with the chain instead. Nonces of mined transactions are forgotten (see watch).
+A NonceManager can be shared by threads and by asyncio tasks (no call blocks once the first sync is done).
+
+    nonces = nonce.get_nonce_manager(account_address, rpc_address)
+    with nonces.reserve() as n:
+        quest_core.start_quest(quest_address, hero_ids, 1, private_key, n, gas_price_gwei, 30, rpc_address, logger, wait=False)
+"""
+
+import heapq
+import threading
+import time
+from contextlib import contextmanager
+from . import client as rpc_client
+
+# Seconds after which a sent transaction still not seen by the node is considered dropped (see resync)
+DROPPED_AFTER_SECONDS = 120
+
+_lock = threading.Lock()
+_managers = {}
+
+
+def is_nonce_too_low(error):
+    '''
+    :param error: exception raised when sending a transaction
+    :return: True if the node rejected the transaction because its nonce is already used
+    '''
+    message = str(error).lower()
+    return 'nonce too low' in message or 'nonce is too low' in message
+
+
+def mark_not_sent(error):
+    '''
+    Tag an exception raised before the transaction was sent (build or sign failure): reserve releases its nonce
+    :param error:
+    :return: error
+    '''
+    error.transaction_not_sent = True
+    return error
+
+
+def is_not_sent(error):
+    '''
+    :return: True if the exception was raised before the transaction was sent (see mark_not_sent)
+    '''
+    return getattr(error, 'transaction_not_sent', False)
+
+
+class NonceManager:
+    def __init__(self, address, rpc_address, dropped_after=DROPPED_AFTER_SECONDS):
+        self.address = rpc_client.checksum_address(address)
+        self.rpc_address = rpc_address
+        self.dropped_after = dropped_after
+        self._lock = threading.Lock()
+        self._next = None
+        # nonces handed out and not released: nonce -> allocation time
+        self._outstanding = {}
+        # nonces to hand out again before _next (heap)
+        self._free = []
+        # nonces of transactions which may have reached the node (see mark_unknown)
+        self._unknown = set()
+        # monotonic time from which allocate resyncs first, None when no unknown nonce is left
+        self._resync_at = None
+
+    def chain_nonce(self):
+        '''
+        :return: nonce of the next transaction of the account according to the node (pending transactions included)
+        '''
+        return rpc_client.get_web3(self.rpc_address).eth.get_transaction_count(self.address, 'pending')
+
+    def allocate(self):
+        '''
+        Hand out a nonce. The first call reads the nonce from the chain, the next ones are local
+        :return:
+        '''
+        if self._next is None or (self._resync_at is not None and time.monotonic() >= self._resync_at):
+            self.resync()
+        with self._lock:
+            if len(self._free) > 0:
+                nonce = heapq.heappop(self._free)
+            else:
+                nonce = self._next
+                self._next = self._next + 1
+            self._outstanding[nonce] = time.monotonic()
+            return nonce
+
+    def release(self, nonce):
+        '''
+        Give back a nonce whose transaction was not sent, it is handed out again before any new nonce
+        :param nonce:
+        '''
+        with self._lock:
+            if self._outstanding.pop(nonce, None) is not None:
+                heapq.heappush(self._free, nonce)
+
+    def mark_unknown(self, nonce):
+        '''
+        Keep a nonce whose transaction may have reached the node (e.g. the send timed out): it is not handed out again
+        unless resync finds it dropped. The next allocation resyncs, and allocations keep resyncing once dropped_after
+        has passed until the nonce is used or dropped
+        :param nonce:
+        '''
+        with self._lock:
+            if nonce in self._outstanding:
+                self._unknown.add(nonce)
+                self._resync_at = time.monotonic()
+
+    def confirm(self, nonce):
+        '''
+        Forget a nonce whose transaction was mined, with every nonce below it (they are used too)
+        :param nonce:
+        '''
+        with self._lock:
+            for n in [n for n in self._outstanding.keys() if n <= nonce]:
+                del self._outstanding[n]
+            self._unknown = set(n for n in self._unknown if n > nonce)
+            if len(self._unknown) == 0:
+                self._resync_at = None
+            if any(n <= nonce for n in self._free):
+                self._free = [n for n in self._free if n > nonce]
+                heapq.heapify(self._free)
+            if self._next is not None and self._next <= nonce:
+                self._next = nonce + 1
+
+    def watch(self, nonce, pending):
+        '''
+        Confirm the nonce once its transaction is mined
+        :param nonce:
+        :param pending: receipts.PendingTransaction of the transaction
+        '''
+        pending.add_done_callback(lambda future: self.confirm(nonce) if future.exception() is None else None)
+
+    def resync(self):
+        '''
+        Align with the chain:
+        - nonces below the chain nonce are used and forgotten
+        - the next nonce moves forward if the account sent transactions without this manager
+        - nonces handed out for more than dropped_after seconds and still above the chain nonce belong to dropped
+          transactions (the node never received them or evicted them); they are handed out again to fill the gap
+        :return: chain nonce
+        '''
+        chain_nonce = self.chain_nonce()
+        now = time.monotonic()
+        with self._lock:
+            if self._next is None or chain_nonce > self._next:
+                self._next = chain_nonce
+            for nonce in list(self._outstanding.keys()):
+                if nonce < chain_nonce:
+                    del self._outstanding[nonce]
+                elif now - self._outstanding[nonce] > self.dropped_after:
+                    del self._outstanding[nonce]
+                    self._free.append(nonce)
+            self._free = [nonce for nonce in set(self._free) if nonce >= chain_nonce]
+            heapq.heapify(self._free)
+            # Unknown nonces still handed out are checked again once they can be considered dropped
+            self._unknown = set(nonce for nonce in self._unknown if nonce in self._outstanding)
+            if len(self._unknown) > 0:
+                self._resync_at = min(self._outstanding[nonce] for nonce in self._unknown) + self.dropped_after
+            else:
+                self._resync_at = None
+        return chain_nonce
+
+    def gaps(self):
+        '''
+        :return: nonces handed out again before new ones (released or dropped), lowest first
+        '''
+        with self._lock:
+            return sorted(self._free)
+
+    @contextmanager
+    def reserve(self):
+        '''
+        Context manager handing out a nonce. If the block raises:
+        - before the transaction was sent (see mark_not_sent), the nonce is released
+        - on "nonce too low", the manager resyncs with the chain
+        - otherwise the transaction may have reached the node: the nonce stays handed out (see mark_unknown)
+        '''
+        nonce = self.allocate()
+        try:
+            yield nonce
+        except Exception as e:
+            if is_nonce_too_low(e):
+                with self._lock:
+                    self._outstanding.pop(nonce, None)
+                self.resync()
+            elif is_not_sent(e):
+                self.release(nonce)
+            else:
+                self.mark_unknown(nonce)
+            raise
+
+
+def get_nonce_manager(address, rpc_address):
+    '''
+    Return the shared nonce manager of the account
+    :param address:
+    :param rpc_address:
+    :return:
+    '''
+    key = (rpc_address, rpc_client.checksum_address(address))
+    manager = _managers.get(key)
+    if manager is None:
+        with _lock:
+            manager = _managers.setdefault(key, NonceManager(address, rpc_address))
+    return manager
@@ -0,0 +1,138 @@
+"""
+Background resolution of transaction receipts.
+A single watcher thread per RPC server polls the receipts of every pending transaction with one JSON-RPC batch request
+per poll, so many transactions can be in flight without a blocking wait_for_transaction_receipt per transaction.
+"""
+
+import threading
+import time
+from concurrent.futures import Future
+from web3 import Web3
+from web3.datastructures import AttributeDict
+from web3.exceptions import TimeExhausted
+from web3._utils.method_formatters import receipt_formatter
+from . import client as rpc_client
+
+POLL_INTERVAL_SECONDS = 2
+
+_lock = threading.Lock()
+_watchers = {}
+
+
+class PendingTransaction(Future):
+    '''
+    Future of a transaction receipt. result() returns the receipt in the format of wait_for_transaction_receipt and
+    raises TimeExhausted when the transaction is not mined before the deadline.
+    Use asyncio.wrap_future to await it from a coroutine
+    '''
+
+    def __init__(self, tx_hash, deadline):
+        super().__init__()
+        self.tx_hash = tx_hash
+        self.deadline = deadline
+
+
+class ReceiptWatcher:
+    def __init__(self, rpc_address, poll_interval=POLL_INTERVAL_SECONDS, batch_size=rpc_client.BATCH_SIZE):
+        self.rpc_address = rpc_address
+        self.poll_interval = poll_interval
+        self.batch_size = batch_size
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._thread = None
+
+    def watch(self, tx_hash, timeout):
+        '''
+        Start watching a sent transaction
+        :param tx_hash: hash of the transaction (bytes or hex string)
+        :param timeout: seconds before the transaction is considered lost
+        :return: PendingTransaction
+        '''
+        if type(tx_hash) != str:
+            tx_hash = Web3.toHex(tx_hash)
+        with self._lock:
+            pending = self._pending.get(tx_hash)
+            if pending is None:
+                pending = PendingTransaction(tx_hash, time.monotonic() + timeout)
+                self._pending[tx_hash] = pending
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="receipt-watcher", daemon=True)
+                self._thread.start()
+        return pending
+
+    def pending_count(self):
+        with self._lock:
+            return len(self._pending)
+
+    def poll(self):
+        '''
+        Fetch the receipts of all the pending transactions (one batch request per batch_size transactions)
+        and resolve the mined or expired ones
+        '''
+        with self._lock:
+            pending = list(self._pending.values())
+
+        for i in range(0, len(pending), self.batch_size):
+            chunk = pending[i:i + self.batch_size]
+            try:
+                responses = rpc_client.batch_request(
+                    [('eth_getTransactionReceipt', [tx.tx_hash]) for tx in chunk], self.rpc_address)
+            except Exception:
+                # Network errors are retried on the next poll, until the deadline of each transaction
+                responses = [(None, None)] * len(chunk)
+
+            now = time.monotonic()
+            for tx, (result, error) in zip(chunk, responses):
+                if result is not None:
+                    try:
+                        receipt = AttributeDict.recursive(receipt_formatter(result))
+                    except Exception as e:
+                        self._resolve(tx, exception=e)
+                        continue
+                    self._resolve(tx, result=receipt)
+                elif now > tx.deadline:
+                    self._resolve(tx, exception=TimeExhausted(
+                        "Transaction " + tx.tx_hash + " is not in the chain after the timeout"))
+
+    def _resolve(self, tx, result=None, exception=None):
+        with self._lock:
+            if self._pending.pop(tx.tx_hash, None) is None:
+                # Already resolved by a concurrent poll
+                return
+        if exception is not None:
+            tx.set_exception(exception)
+        else:
+            tx.set_result(result)
+
+    def _run(self):
+        while True:
+            time.sleep(self.poll_interval)
+            self.poll()
+            with self._lock:
+                if len(self._pending) == 0:
+                    self._thread = None
+                    return
+
+
+def get_watcher(rpc_address):
+    '''
+    Return the shared receipt watcher of the RPC server
+    :param rpc_address:
+    :return:
+    '''
+    watcher = _watchers.get(rpc_address)
+    if watcher is None:
+        with _lock:
+            watcher = _watchers.setdefault(rpc_address, ReceiptWatcher(rpc_address))
+    return watcher
+
+
+def watch(tx_hash, timeout, rpc_address):
+    '''
+    Watch a sent transaction with the shared watcher of the RPC server
+    :param tx_hash:
+    :param timeout: seconds
+    :param rpc_address:
+    :return: PendingTransaction
+    '''
+    return get_watcher(rpc_address).watch(tx_hash, timeout)
@@ -0,0 +1,352 @@
+"""
+Single path for sending contract transactions: build, sign, send and wait for the receipt.
+- accounts are derived once per private key
+- the chain id is read once per RPC server and set in the transaction template, with the sender, nonce and gas price
+- the gas price comes from a gas strategy (fixed by default, see NodeGasPrice and set_gas_strategy)
+- sending is retried on transient network errors and every step is timed (see get_metrics)
+- send_many sends several transactions in one JSON-RPC batch request
+"""
+
+import functools
+import threading
+import time
+import requests
+from eth_account import Account
+from web3 import Web3
+from . import client as rpc_client
+from . import nonce as nonce_manager
+from . import receipts
+
+RETRIES = 3
+RETRY_DELAY_SECONDS = 1
+
+_lock = threading.Lock()
+_chain_ids = {}
+_gas_strategy = None
+
+
+def block_explorer_link(txid):
+    return 'https://explorer.harmony.one/tx/' + str(txid)
+
+
+@functools.lru_cache(maxsize=64)
+def get_account(private_key):
+    '''
+    Return the local account of the private key (the key derivation is done once per key)
+    :param private_key:
+    :return:
+    '''
+    return Account.from_key(private_key)
+
+
+def get_chain_id(rpc_address):
+    chain_id = _chain_ids.get(rpc_address)
+    if chain_id is None:
+        chain_id = rpc_client.get_web3(rpc_address).eth.chain_id
+        with _lock:
+            _chain_ids[rpc_address] = chain_id
+    return chain_id
+
+
+class FixedGasPrice:
+    def __init__(self, gas_price_gwei):
+        self.gas_price_wei = Web3.toWei(gas_price_gwei, 'gwei')
+
+    def __call__(self, rpc_address):
+        return self.gas_price_wei
+
+
+class NodeGasPrice:
+    '''
+    Gas price suggested by the node (eth_gasPrice) times multiplier, capped at max_gas_price_gwei.
+    The node is asked at most once every ttl seconds
+    '''
+
+    def __init__(self, multiplier=1.0, max_gas_price_gwei=None, ttl=15):
+        self.multiplier = multiplier
+        self.max_gas_price_wei = None if max_gas_price_gwei is None else Web3.toWei(max_gas_price_gwei, 'gwei')
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._prices = {}
+
+    def __call__(self, rpc_address):
+        with self._lock:
+            cached = self._prices.get(rpc_address)
+        if cached is None or time.monotonic() - cached[1] > self.ttl:
+            price = int(rpc_client.get_web3(rpc_address).eth.gas_price * self.multiplier)
+            cached = (price, time.monotonic())
+            with self._lock:
+                self._prices[rpc_address] = cached
+        price = cached[0]
+        if self.max_gas_price_wei is not None:
+            price = min(price, self.max_gas_price_wei)
+        return price
+
+
+def set_gas_strategy(strategy):
+    '''
+    Set the gas strategy used when a transaction is sent without gas price (gas_price_gwei=None)
+    :param strategy: callable rpc_address -> gas price in wei (e.g. NodeGasPrice()), None to reset
+    '''
+    global _gas_strategy
+    _gas_strategy = strategy
+
+
+def gas_price(gas_price_gwei, rpc_address, gas_strategy=None):
+    '''
+    :return: gas price in wei: from gas_strategy if given, else gas_price_gwei, else the strategy of set_gas_strategy,
+    else the price suggested by the node
+    '''
+    if gas_strategy is not None:
+        return gas_strategy(rpc_address)
+    if gas_price_gwei is not None:
+        return Web3.toWei(gas_price_gwei, 'gwei')
+    if _gas_strategy is not None:
+        return _gas_strategy(rpc_address)
+    return rpc_client.get_web3(rpc_address).eth.gas_price
+
+
+class Metrics:
+    '''
+    Durations of the steps (build, sign, send, wait) and counters (sent, retries, failed) of all the transactions
+    '''
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.steps = {}
+        self.counters = {}
+
+    def record(self, step, seconds):
+        with self._lock:
+            count, total, maximum = self.steps.get(step, (0, 0.0, 0.0))
+            self.steps[step] = (count + 1, total + seconds, max(maximum, seconds))
+
+    def count(self, name, n=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def snapshot(self):
+        with self._lock:
+            snapshot = dict(self.counters)
+            for step, (count, total, maximum) in self.steps.items():
+                snapshot[step] = {'count': count, 'totalSeconds': total, 'averageSeconds': total / count,
+                                  'maxSeconds': maximum}
+            return snapshot
+
+    def reset(self):
+        with self._lock:
+            self.steps.clear()
+            self.counters.clear()
+
+
+metrics = Metrics()
+
+
+def get_metrics():
+    return metrics.snapshot()
+
+
+def build_transaction(function_call, private_key, nonce, gas_price_gwei, rpc_address, gas_strategy=None, gas=None, value=None):
+    '''
+    :param function_call: contract function with its arguments, e.g. contract.functions.completeQuest(hero_id)
+    :param private_key:
+    :param nonce:
+    :param gas_price_gwei: None to use the gas strategy
+    :param rpc_address:
+    :param gas_strategy:
+    :param gas: gas limit, None to estimate it
+    :param value: wei sent with the transaction
+    :return: transaction ready to be signed
+    '''
+    template = {'from': get_account(private_key).address, 'chainId': get_chain_id(rpc_address),
+                'gasPrice': gas_price(gas_price_gwei, rpc_address, gas_strategy), 'nonce': nonce}
+    if gas is not None:
+        template['gas'] = gas
+    if value is not None:
+        template['value'] = value
+    return function_call.buildTransaction(template)
+
+
+def sign_transaction(tx, private_key):
+    return get_account(private_key).sign_transaction(tx)
+
+
+def is_transient(error):
+    '''
+    :return: True if sending can be retried (connection error, timeout, server error)
+    '''
+    if isinstance(error, (requests.exceptions.ConnectionError, requests.exceptions.Timeout)):
+        return True
+    if isinstance(error, requests.exceptions.HTTPError) and error.response is not None:
+        return error.response.status_code >= 500
+    return False
+
+
+def is_already_known(error):
+    '''
+    :return: True if the node already has the transaction (e.g. a retried send that reached the node)
+    '''
+    message = str(error).lower()
+    return 'already known' in message or 'already imported' in message or 'known transaction' in message
+
+
+def send_raw_transaction(signed_tx, rpc_address):
+    '''
+    Send a signed transaction, retrying on transient errors
+    :param signed_tx:
+    :param rpc_address:
+    :return: transaction hash
+    '''
+    w3 = rpc_client.get_web3(rpc_address)
+    for attempt in range(RETRIES + 1):
+        try:
+            return w3.eth.send_raw_transaction(signed_tx.rawTransaction)
+        except Exception as e:
+            if is_already_known(e):
+                return signed_tx.hash
+            if attempt == RETRIES or not is_transient(e):
+                raise
+            metrics.count('retries')
+            time.sleep(RETRY_DELAY_SECONDS * (attempt + 1))
+
+
+def submit(function_call, private_key, nonce, gas_price_gwei, tx_timeout_seconds, rpc_address, logger, gas_strategy=None, gas=None, value=None):
+    '''
+    Build, sign and send a transaction without waiting for it
+    :return: receipts.PendingTransaction
+    '''
+    try:
+        try:
+            start = time.perf_counter()
+            tx = build_transaction(function_call, private_key, nonce, gas_price_gwei, rpc_address, gas_strategy, gas, value)
+            metrics.record('build', time.perf_counter() - start)
+
+            logger.debug("Signing transaction")
+            start = time.perf_counter()
+            signed_tx = sign_transaction(tx, private_key)
+            metrics.record('sign', time.perf_counter() - start)
+        except Exception as e:
+            nonce_manager.mark_not_sent(e)
+            raise
+
+        logger.debug("Sending transaction " + str(tx))
+        start = time.perf_counter()
+        send_raw_transaction(signed_tx, rpc_address)
+        metrics.record('send', time.perf_counter() - start)
+    except Exception:
+        metrics.count('failed')
+        raise
+    metrics.count('sent')
+    logger.debug("Transaction successfully sent !")
+
+    return receipts.watch(signed_tx.hash, tx_timeout_seconds, rpc_address)
+
+
+def send(function_call, private_key, nonce, gas_price_gwei, tx_timeout_seconds, rpc_address, logger, wait=True, gas_strategy=None, gas=None, value=None):
+    '''
+    Send a contract transaction
+    :param function_call: contract function with its arguments, e.g. contract.functions.completeQuest(hero_id)
+    :param private_key:
+    :param nonce: None to take the next nonce of the account from its shared NonceManager
+    :param gas_price_gwei: None to use the gas strategy
+    :param tx_timeout_seconds:
+    :param rpc_address:
+    :param logger:
+    :param wait: False to return a receipts.PendingTransaction right after sending
+    :param gas_strategy: callable rpc_address -> gas price in wei, overrides gas_price_gwei
+    :param gas: gas limit, None to estimate it
+    :param value: wei sent with the transaction
+    :return: transaction receipt (or PendingTransaction when wait is False)
+    '''
+    if nonce is None:
+        nonces = nonce_manager.get_nonce_manager(get_account(private_key).address, rpc_address)
+        with nonces.reserve() as reserved_nonce:
+            pending = submit(function_call, private_key, reserved_nonce, gas_price_gwei, tx_timeout_seconds, rpc_address,
+                             logger, gas_strategy, gas, value)
+        nonces.watch(reserved_nonce, pending)
+    else:
+        pending = submit(function_call, private_key, nonce, gas_price_gwei, tx_timeout_seconds, rpc_address, logger,
+                         gas_strategy, gas, value)
+
+    if not wait:
+        return pending
+
+    logger.info("Waiting for transaction " + block_explorer_link(pending.tx_hash) + " to be mined")
+    start = time.perf_counter()
+    tx_receipt = pending.result()
+    metrics.record('wait', time.perf_counter() - start)
+    logger.info("Transaction mined !")
+    logger.debug(str(tx_receipt))
+
+    return tx_receipt
+
+
+def send_many(function_calls, private_key, gas_price_gwei, tx_timeout_seconds, rpc_address, logger, nonces=None, gas_strategy=None):
+    '''
+    Send several transactions of the same account in a single JSON-RPC batch request
+    :param function_calls: list of contract functions with their arguments
+    :param private_key:
+    :param gas_price_gwei: None to use the gas strategy
+    :param tx_timeout_seconds:
+    :param rpc_address:
+    :param logger:
+    :param nonces: list of nonces (one per function call), None to take them from the NonceManager of the account
+    :param gas_strategy:
+    :return: list of (PendingTransaction, error) in the order of function_calls. error is None on success
+    '''
+    manager = None
+    if nonces is None:
+        manager = nonce_manager.get_nonce_manager(get_account(private_key).address, rpc_address)
+        nonces = [manager.allocate() for _ in function_calls]
+
+    signed_txs = []
+    for function_call, n in zip(function_calls, nonces):
+        try:
+            start = time.perf_counter()
+            tx = build_transaction(function_call, private_key, n, gas_price_gwei, rpc_address, gas_strategy)
+            metrics.record('build', time.perf_counter() - start)
+            start = time.perf_counter()
+            signed_txs.append((sign_transaction(tx, private_key), None))
+            metrics.record('sign', time.perf_counter() - start)
+        except Exception as e:
+            signed_txs.append((None, str(e)))
+
+    to_send = [signed_tx for signed_tx, error in signed_txs if error is None]
+    start = time.perf_counter()
+    # When the batch request itself fails, the transactions may have reached the node
+    maybe_sent = False
+    try:
+        responses = iter(rpc_client.batch_request(
+            [('eth_sendRawTransaction', [Web3.toHex(signed_tx.rawTransaction)]) for signed_tx in to_send], rpc_address)) \
+            if len(to_send) > 0 else iter([])
+    except Exception as e:
+        maybe_sent = True
+        responses = iter([(None, str(e))] * len(to_send))
+    metrics.record('send', time.perf_counter() - start)
+
+    results = []
+    for (signed_tx, error), n in zip(signed_txs, nonces):
+        may_be_sent = False
+        if error is None:
+            may_be_sent = maybe_sent
+            _, error = next(responses)
+            if error is not None and is_already_known(error):
+                error = None
+        if error is None:
+            metrics.count('sent')
+            pending = receipts.watch(signed_tx.hash, tx_timeout_seconds, rpc_address)
+            if manager is not None:
+                manager.watch(n, pending)
+            results.append((pending, None))
+        else:
+            metrics.count('failed')
+            logger.error("Transaction with nonce " + str(n) + " not sent: " + error)
+            if manager is not None:
+                if nonce_manager.is_nonce_too_low(error):
+                    manager.resync()
+                elif may_be_sent:
+                    manager.mark_unknown(n)
+                else:
+                    manager.release(n)
+            results.append((None, error))
+    return results
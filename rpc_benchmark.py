@@ -0,0 +1,60 @@
+import logging
+import sys
+import time
+from web3 import Web3
+import hero.hero as heroes
+from rpc import client as rpc_client
+from rpc import abi as abi_cache
+
+
+def per_call_us(fn, iterations):
+    start = time.perf_counter()
+    for i in range(iterations):
+        fn(i)
+    return (time.perf_counter() - start) * 1000000 / iterations
+
+
+def legacy_get_hero_call_data(hero_id):
+    # What every helper used to do before sending the eth_call
+    w3 = Web3(Web3.HTTPProvider(rpc_server))
+    contract_address = Web3.toChecksumAddress(heroes.CONTRACT_ADDRESS)
+    contract = w3.eth.contract(contract_address, abi=heroes.ABI)
+    return contract.functions.getHero(hero_id)._encode_transaction_data()
+
+
+def cached_get_hero_call_data(hero_id):
+    contract = rpc_client.get_contract(heroes.CONTRACT_ADDRESS, heroes.ABI, rpc_server)
+    return contract.functions.getHero(hero_id)._encode_transaction_data()
+
+
+def selector_table_get_hero_call_data(hero_id):
+    return abi_cache.encode_call(heroes.ABI, 'getHero', [hero_id])
+
+
+if __name__ == "__main__":
+    log_format = '%(asctime)s|%(name)s|%(levelname)s: %(message)s'
+
+    logger = logging.getLogger("DFK-rpc-benchmark")
+    logger.setLevel(logging.DEBUG)
+    logging.basicConfig(level=logging.INFO, format=log_format, stream=sys.stdout)
+
+    # No request is sent: only the client side cost of preparing a get_hero call is measured
+    rpc_server = 'https://api.harmony.one'
+    iterations = 2000
+
+    start = time.perf_counter()
+    abi_cache.parse(heroes.ABI)
+    abi_cache.function_selectors(heroes.ABI)
+    logger.info("Hero ABI parsed once in " + str(round((time.perf_counter() - start) * 1000, 3)) + " ms")
+
+    if not legacy_get_hero_call_data(1) == cached_get_hero_call_data(1) == selector_table_get_hero_call_data(1):
+        raise Exception("Call data mismatch")
+
+    legacy = per_call_us(legacy_get_hero_call_data, iterations // 20)
+    logger.info("Per call (new client, ABI parsed every call):\t" + str(round(legacy, 1)) + " us")
+    cached = per_call_us(cached_get_hero_call_data, iterations)
+    logger.info("Per call (shared client, ABI parsed once):\t" + str(round(cached, 1)) + " us")
+    selector_table = per_call_us(selector_table_get_hero_call_data, iterations)
+    logger.info("Per call (selector table):\t" + str(round(selector_table, 1)) + " us")
+    logger.info("Speedup:\t" + str(round(legacy / cached, 1)) + "x (shared client), "
+                + str(round(legacy / selector_table, 1)) + "x (selector table)")
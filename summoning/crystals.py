@@ -1,4 +1,6 @@
 from web3 import Web3
+from rpc import client as rpc_client
+from rpc import transactions
 
 CONTRACT_ADDRESS = '0xa2D001C829328aa06a2DB2740c05ceE1bFA3c6bb'
 
@@ -35,43 +37,23 @@ ABI = """
 
 
 def get_user_crystal_ids(user_address, rpc_address):
-    w3 = Web3(Web3.HTTPProvider(rpc_address))
-
-    contract_address = Web3.toChecksumAddress(CONTRACT_ADDRESS)
-    contract = w3.eth.contract(contract_address, abi=ABI)
+    contract = rpc_client.get_contract(CONTRACT_ADDRESS, ABI, rpc_address)
 
     return contract.functions.getUserCrystals(Web3.toChecksumAddress(user_address)).call()
 
 
-def open_crystal(crystal_id, owner_private_key, owner_nonce, gas_price_gwei, rpc_address, contract_abi, logger):
-    w3 = Web3(Web3.HTTPProvider(rpc_address))
-    account = w3.eth.account.privateKeyToAccount(owner_private_key)
-
-    contract_address = Web3.toChecksumAddress(CONTRACT_ADDRESS)
-    contract = w3.eth.contract(contract_address, abi=ABI)
-
-    fast_open_crystal(crystal_id, account.address, owner_private_key, owner_nonce, gas_price_gwei, contract, w3, logger)
-
-
-def fast_open_crystal(crystal_id, owner_address, owner_private_key, owner_nonce, gas_price_gwei, contract, w3, logger):
-    w3.eth.default_account = owner_address
-    tx = contract.functions.open(crystal_id).buildTransaction(
-        {'gasPrice': w3.toWei(gas_price_gwei, 'gwei'), 'nonce': owner_nonce})
-    logger.debug("Signing transaction")
-    signed_tx = w3.eth.account.sign_transaction(tx, private_key=owner_private_key)
-    logger.debug("Sending transaction " + str(tx))
-    ret = w3.eth.send_raw_transaction(signed_tx.rawTransaction)
-    logger.debug("Transaction successfully sent !")
-    logger.info(
-        "Waiting for transaction https://explorer.harmony.one/tx/" + str(signed_tx.hash.hex()) + " to be mined")
-    tx_receipt = w3.eth.wait_for_transaction_receipt(transaction_hash=signed_tx.hash, timeout=24 * 3600,
-                                                     poll_latency=3)
-    logger.info("Transaction mined !")
-    logger.info(str(tx_receipt))
-
-
-
+def open_crystal(crystal_id, owner_private_key, owner_nonce, gas_price_gwei, rpc_address, contract_abi, logger, wait=True):
+    w3 = rpc_client.get_web3(rpc_address)
+    account = transactions.get_account(owner_private_key)
 
+    contract = rpc_client.get_contract(CONTRACT_ADDRESS, ABI, rpc_address)
 
+    return fast_open_crystal(crystal_id, account.address, owner_private_key, owner_nonce, gas_price_gwei, contract, w3, logger, wait)
 
 
+def fast_open_crystal(crystal_id, owner_address, owner_private_key, owner_nonce, gas_price_gwei, contract, w3, logger, wait=True):
+    # The transaction is sent from the account of the private key, which must own the crystal
+    if Web3.toChecksumAddress(owner_address) != transactions.get_account(owner_private_key).address:
+        raise Exception("Private key is not the key of " + str(owner_address))
+    function_call = contract.functions.open(crystal_id)
+    return transactions.send(function_call, owner_private_key, owner_nonce, gas_price_gwei, 24 * 3600, w3.provider.endpoint_uri, logger, wait)